@@ -36,7 +36,7 @@ class HeartbeatCommand(Command):
         """Get the command name."""
         return heartbeater_cmd_name
 
-    def execute(self, source: str, round: int, time: Optional[str] = None, **kwargs) -> None:
+    def execute(self, source: str, round: int, time: Optional[str] = None, *digest: str, **kwargs) -> None:
         """
         Execute the command.
 
@@ -44,9 +44,10 @@ class HeartbeatCommand(Command):
             source: The source of the command.
             round: The round of the command.
             time: The time of the command.
+            *digest: The nodes recently seen by the source (``addr=age``).
             **kwargs: The command arguments.
 
         """
         if time is None:
             raise ValueError("Time is required")
-        self.__heartbeat.beat(source, time=float(time))
+        self.__heartbeat.beat(source, time=float(time), digest=digest)
@@ -18,8 +18,6 @@
 
 """StopLearning command."""
 
-import contextlib
-
 from p2pfl.communication.commands.command import Command
 from p2pfl.learning.aggregators.aggregator import Aggregator
 from p2pfl.learning.frameworks.learner import Learner
@@ -56,9 +54,7 @@ class StopLearningCommand(Command):
         self.learner.interrupt_fit()
         # Aggregator
         self.aggregator.clear()
-        # State
+        # State (wake up the vote aggregation)
+        self.state.train_set_votes.interrupt()
         self.state.clear()
         logger.experiment_finished(self.state.addr)
-        # Try to free wait locks
-        with contextlib.suppress(Exception):
-            self.state.wait_votes_ready_lock.release()
@@ -18,8 +18,6 @@
 
 """VoteTrainSetCommand."""
 
-import contextlib
-
 from p2pfl.communication.commands.command import Command
 from p2pfl.management.logger import logger
 from p2pfl.node_state import NodeState
@@ -58,13 +56,8 @@ class VoteTrainSetCommand(Command):
                 tmp_votes = {}
                 for i in range(0, len(votes), 2):
                     tmp_votes[votes[i]] = int(votes[i + 1])
-                # set votes
-                self.state.train_set_votes_lock.acquire()
-                self.state.train_set_votes[source] = tmp_votes
-                self.state.train_set_votes_lock.release()
-                # Communicate to the training process that a vote has been received
-                with contextlib.suppress(Exception):
-                    self.state.wait_votes_ready_lock.release()
+                # set votes (wakes up the training process)
+                self.state.train_set_votes.add_vote(source, tmp_votes)
             else:
                 logger.error(
                     self.state.addr,
@@ -0,0 +1,125 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Protocol agnostic helpers for concurrent (fan-out) broadcasts."""
+
+import datetime
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Optional, Sequence
+
+import numpy as np
+
+from p2pfl.management.logger import logger
+from p2pfl.settings import Settings
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_worker = threading.local()
+
+
+def _mark_worker() -> None:
+    _worker.active = True
+
+
+def get_broadcast_executor() -> ThreadPoolExecutor:
+    """Get the process-wide executor used to send broadcasts concurrently (``Settings.BROADCAST_WORKERS`` threads)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Settings.BROADCAST_WORKERS, thread_name_prefix="broadcast", initializer=_mark_worker)
+        return _executor
+
+
+def in_broadcast_worker() -> bool:
+    """
+    Check if the caller runs in a broadcast worker.
+
+    Nested broadcasts (e.g. a command executed by an in-memory send that broadcasts again) must be sent inline, waiting for
+    other workers could exhaust the executor.
+    """
+    return getattr(_worker, "active", False)
+
+
+class BroadcastLatency:
+    """
+    Per-peer latencies of the last broadcasts of a node.
+
+    Percentiles are periodically reported as system metrics (``broadcast_latency_p50``, ``_p90`` and ``_p99``).
+
+    Args:
+        node: Address of the node.
+        window: Number of latencies kept.
+        report_period: Period (seconds) to report the percentiles.
+
+    """
+
+    def __init__(self, node: str, window: Optional[int] = None, report_period: Optional[float] = None) -> None:
+        """Initialize the latency tracker."""
+        if window is None:
+            window = Settings.BROADCAST_LATENCY_WINDOW
+        if report_period is None:
+            report_period = Settings.BROADCAST_LATENCY_REPORT_PERIOD
+        self.node = node
+        self.report_period = report_period
+        self.__latencies: Deque[float] = deque(maxlen=window)
+        self.__lock = threading.Lock()
+        self.__last_report = time.monotonic()
+
+    def add(self, latency: float) -> None:
+        """
+        Add the latency of a peer.
+
+        Args:
+            latency: Time (seconds) since the beginning of the broadcast until the peer answered.
+
+        """
+        with self.__lock:
+            self.__latencies.append(latency)
+
+    def percentiles(self, qs: Sequence[float] = (50, 90, 99)) -> Dict[str, float]:
+        """
+        Get the latency percentiles.
+
+        Args:
+            qs: Percentiles to compute.
+
+        Returns:
+            Dict with the percentiles (``p50``, ``p90``...). Empty if there are no latencies.
+
+        """
+        with self.__lock:
+            latencies = np.fromiter(self.__latencies, dtype=np.float64, count=len(self.__latencies))
+        if latencies.size == 0:
+            return {}
+        return {f"p{q:g}": float(v) for q, v in zip(qs, np.percentile(latencies, qs))}
+
+    def report(self) -> None:
+        """Report the percentiles if the report period has elapsed."""
+        now = time.monotonic()
+        if now - self.__last_report < self.report_period:
+            return
+        self.__last_report = now
+        timestamp = datetime.datetime.now()
+        for name, value in self.percentiles().items():
+            logger.log_system_metric(self.node, f"broadcast_latency_{name}", value, timestamp)
+
+    def __len__(self) -> int:
+        """Get the number of latencies kept."""
+        return len(self.__latencies)
@@ -32,7 +32,7 @@ class Client(ABC):
     """
 
     @abstractmethod
-    def build_message(self, cmd: str, args: Optional[List[str]] = None, round: Optional[int] = None) -> Any:
+    def build_message(self, cmd: str, args: Optional[List[str]] = None, round: Optional[int] = None, ttl: Optional[int] = None) -> Any:
         """
         Build a message to send to the neighbors.
 
@@ -40,6 +40,7 @@ class Client(ABC):
             cmd: Command of the message.
             args: Arguments of the message.
             round: Round of the message.
+            ttl: Time to live of the message (``Settings.TTL`` by default).
 
         Returns:
             Message to send.
@@ -87,3 +88,13 @@ class Client(ABC):
     ) -> None:
         """Broadcast a message."""
         pass
+
+    def get_message_size(self, msg: Any) -> int:
+        """
+        Get the size (bytes) of a message, used to limit the bandwidth.
+
+        Args:
+            msg: Message.
+
+        """
+        return 0
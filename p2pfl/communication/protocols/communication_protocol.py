@@ -19,7 +19,7 @@
 """Communication protocol."""
 
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, List, Mapping, Optional, Union
 
 from p2pfl.communication.commands.command import Command
 
@@ -147,7 +147,7 @@ class CommunicationProtocol(ABC):
         pass
 
     @abstractmethod
-    def get_neighbors(self, only_direct: bool = False) -> Dict[str, Any]:
+    def get_neighbors(self, only_direct: bool = False) -> Mapping[str, Any]:
         """
         Get the neighbors.
 
@@ -157,6 +157,19 @@ class CommunicationProtocol(ABC):
         """
         pass
 
+    def get_neighbor_encodings(self, nei: str) -> List[str]:
+        """
+        Get the model encodings advertised by a neighbor in the handshake.
+
+        Args:
+            nei: The neighbor.
+
+        Returns:
+            The encodings (empty if unknown, so models are sent with the default pickle encoding).
+
+        """
+        return []
+
     @abstractmethod
     def get_address(self) -> str:
         """
@@ -182,6 +195,7 @@ class CommunicationProtocol(ABC):
         model_fn: Callable[[str], Any],
         period: Optional[float] = None,
         create_connection: bool = False,
+        gap_fn: Optional[Callable[[str], int]] = None,
     ) -> None:
         """
         Gossip model weights.
@@ -193,6 +207,7 @@ class CommunicationProtocol(ABC):
             model_fn: The model function.
             period: The period.
             create_connection: The create connection flag.
+            gap_fn: The function to get the contributors a neighbor would get from the model.
 
         """
         pass
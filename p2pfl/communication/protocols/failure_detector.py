@@ -0,0 +1,177 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Phi accrual failure detector."""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from p2pfl.settings import Settings
+
+
+class _History:
+    """Arrival history of a node."""
+
+    def __init__(self, window: int, first_interval: float, timestamp: float) -> None:
+        self.intervals: Deque[float] = deque([first_interval], maxlen=window)
+        self.total = first_interval
+        self.squares = first_interval**2
+        self.last = timestamp
+
+    def add(self, interval: float) -> None:
+        if len(self.intervals) == self.intervals.maxlen:
+            dropped = self.intervals[0]
+            self.total -= dropped
+            self.squares -= dropped**2
+        self.intervals.append(interval)
+        self.total += interval
+        self.squares += interval**2
+
+
+class PhiAccrualFailureDetector:
+    """
+    Phi accrual failure detector (Hayashibara et al.).
+
+    Instead of a fixed timeout, the suspicion of a node (phi) grows with the time elapsed since its last heartbeat
+    compared to the distribution (normal) of its previous heartbeat intervals. A node is considered dead when its phi
+    exceeds the threshold, so the timeout adapts to the period and jitter of each link.
+
+    Args:
+        threshold: Phi threshold (``Settings.HEARTBEAT_PHI_THRESHOLD`` by default).
+        window: Number of intervals kept per node (``Settings.HEARTBEAT_PHI_WINDOW`` by default).
+        acceptable_pause: Pause (seconds) added to the mean interval (by default, the difference between the heartbeat
+            timeout and period).
+        min_std: Minimum standard deviation (seconds) of the intervals (by default, a quarter of the heartbeat period).
+
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        window: Optional[int] = None,
+        acceptable_pause: Optional[float] = None,
+        min_std: Optional[float] = None,
+    ) -> None:
+        """Initialize the failure detector."""
+        self.threshold = threshold if threshold is not None else Settings.HEARTBEAT_PHI_THRESHOLD
+        self.window = window if window is not None else Settings.HEARTBEAT_PHI_WINDOW
+        self.acceptable_pause = (
+            acceptable_pause if acceptable_pause is not None else max(Settings.HEARTBEAT_TIMEOUT - Settings.HEARTBEAT_PERIOD, 0.0)
+        )
+        self.min_std = min_std if min_std is not None else Settings.HEARTBEAT_PERIOD / 4
+        self.__first_interval = Settings.HEARTBEAT_PERIOD
+        self.__histories: Dict[str, _History] = {}
+        self.__lock = threading.Lock()
+
+    def heartbeat(self, addr: str, timestamp: Optional[float] = None) -> bool:
+        """
+        Record a heartbeat (or any other proof of life) of a node.
+
+        Args:
+            addr: Address of the node.
+            timestamp: Time (monotonic) of the heartbeat. Now by default.
+
+        Returns:
+            False if the heartbeat is older than the last one known (ignored), True otherwise.
+
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self.__lock:
+            history = self.__histories.get(addr)
+            if history is None:
+                self.__histories[addr] = _History(self.window, self.__first_interval, timestamp)
+                return True
+            if timestamp <= history.last:
+                return False
+            history.add(timestamp - history.last)
+            history.last = timestamp
+            return True
+
+    def phi(self, addr: str, now: Optional[float] = None) -> float:
+        """
+        Get the suspicion level of a node. 0 if the node is unknown.
+
+        Args:
+            addr: Address of the node.
+            now: Current time (monotonic). Now by default.
+
+        """
+        if now is None:
+            now = time.monotonic()
+        with self.__lock:
+            history = self.__histories.get(addr)
+            if history is None:
+                return 0.0
+            n = len(history.intervals)
+            mean = history.total / n
+            std = math.sqrt(max(history.squares / n - mean**2, 0.0))
+            elapsed = now - history.last
+        mean += self.acceptable_pause
+        std = max(std, self.min_std)
+        # Logistic approximation of the normal CDF
+        y = (elapsed - mean) / std
+        e = math.exp(-y * (1.5976 + 0.070566 * y * y)) if y > -20 else math.inf
+        if elapsed > mean:
+            return -math.log10(e / (1.0 + e)) if e > 0 else math.inf
+        return -math.log10(1.0 - 1.0 / (1.0 + e))
+
+    def is_available(self, addr: str, now: Optional[float] = None) -> bool:
+        """
+        Check if a node is considered alive.
+
+        Args:
+            addr: Address of the node.
+            now: Current time (monotonic). Now by default.
+
+        """
+        return self.phi(addr, now) < self.threshold
+
+    def last_seen(self, addr: str) -> Optional[float]:
+        """
+        Get the time (monotonic) of the last heartbeat of a node. None if unknown.
+
+        Args:
+            addr: Address of the node.
+
+        """
+        with self.__lock:
+            history = self.__histories.get(addr)
+            return history.last if history is not None else None
+
+    def get_nodes(self) -> List[str]:
+        """Get the tracked nodes."""
+        with self.__lock:
+            return list(self.__histories)
+
+    def remove(self, addr: str) -> None:
+        """
+        Forget a node.
+
+        Args:
+            addr: Address of the node.
+
+        """
+        with self.__lock:
+            self.__histories.pop(addr, None)
+
+    def __contains__(self, addr: str) -> bool:
+        """Check if a node is tracked."""
+        return addr in self.__histories
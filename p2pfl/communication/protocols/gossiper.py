@@ -18,16 +18,109 @@
 
 """Protocol agnostic gossiper."""
 
-import random
+import heapq
 import threading
 import time
-from typing import Any, Callable, List, Optional, Tuple
+from collections import deque
+from concurrent import futures
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
 
 from p2pfl.communication.protocols.client import Client
+from p2pfl.communication.protocols.peer_selection import PeerStats, get_peer_selection_policy
+from p2pfl.communication.protocols.rate_limiter import RateLimiter
 from p2pfl.management.logger import logger
 from p2pfl.settings import Settings
 
 
+class PendingMessages:
+    """
+    Priority queue of messages pending to be gossiped.
+
+    Messages are drained by priority (``Settings.GOSSIP_PRIORITIES``, lower first) and then in arrival order. A message
+    of a command in ``Settings.GOSSIP_COALESCE_COMMANDS`` replaces the pending message of the same command and source
+    (keeping its place in the queue), so stale updates are not sent.
+
+    Not thread-safe.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the queue."""
+        # Entries: [priority, sequence, msg, pending neis, key]
+        self.__heap: List[List[Any]] = []
+        self.__by_key: Dict[Tuple[str, str], List[Any]] = {}
+        self.__sequence = 0
+        self.coalesced = 0
+
+    def push(self, msg: Any, pending_neis: List[str], cmd: Optional[str] = None, source: Optional[str] = None) -> None:
+        """
+        Add a message.
+
+        Args:
+            msg: Message to send.
+            pending_neis: Neighbors to send the message.
+            cmd: Command of the message (used to prioritize and coalesce).
+            source: Source of the message (used to coalesce).
+
+        """
+        key = (cmd, source) if cmd in Settings.GOSSIP_COALESCE_COMMANDS and source is not None else None
+        if key is not None and key in self.__by_key:
+            # Supersede the pending message
+            entry = self.__by_key[key]
+            entry[2] = msg
+            entry[3] = entry[3] + [n for n in pending_neis if n not in entry[3]]
+            self.coalesced += 1
+            return
+        priority = Settings.GOSSIP_PRIORITIES.get(cmd, 0) if cmd is not None else 0
+        entry = [priority, self.__sequence, msg, list(pending_neis), key]
+        self.__sequence += 1
+        heapq.heappush(self.__heap, entry)
+        if key is not None:
+            self.__by_key[key] = entry
+
+    def pop(self, budget: int, ready: Optional[Callable[[str], bool]] = None) -> List[Tuple[Any, List[str]]]:
+        """
+        Get the next messages to send.
+
+        Args:
+            budget: Maximum amount of messages (one per neighbor) to send.
+            ready: Function called (once per selected neighbor) to check if a message can be sent to a neighbor. The
+                messages to the neighbors that are not ready stay pending, in their place.
+
+        Returns:
+            List of messages and the neighbors to send them.
+
+        """
+        selected = []
+        emptied = False
+        for entry in sorted(self.__heap):
+            if budget <= 0:
+                break
+            neis = []
+            for n in entry[3]:
+                if len(neis) == budget:
+                    break
+                if ready is None or ready(n):
+                    neis.append(n)
+            if not neis:
+                continue
+            # Select the neis (a partially sent entry keeps its place)
+            selected.append((entry[2], neis))
+            entry[3] = [n for n in entry[3] if n not in neis]
+            budget -= len(neis)
+            if not entry[3]:
+                emptied = True
+                if entry[4] is not None:
+                    del self.__by_key[entry[4]]
+        if emptied:
+            self.__heap = [entry for entry in self.__heap if entry[3]]
+            heapq.heapify(self.__heap)
+        return selected
+
+    def __len__(self) -> int:
+        """Get the number of pending messages."""
+        return len(self.__heap)
+
+
 class Gossiper(threading.Thread):
     """
     Gossiper for agnostic communication protocol.
@@ -58,17 +151,39 @@ class Gossiper(threading.Thread):
         self.name = f"gossiper-thread-{self.__self_addr}"
 
         # Lists, locks and flag
-        self.__processed_messages: List[int] = []
+        self.__processed_messages: Set[int] = set()
+        self.__processed_messages_order: Deque[int] = deque()  # oldest first
         self.__processed_messages_lock = threading.Lock()
-        self.__pending_msgs: List[Tuple[Any, List[str]]] = []
+        self.__duplicated_messages = 0
+        self.__new_messages = 0
+        self.__pending_msgs = PendingMessages()
         self.__pending_msgs_lock = threading.Lock()
+        self.__pending_msgs_flag = threading.Event()
+        self.__pending_callbacks: List[Callable[[], None]] = []
         self.__gossip_terminate_flag = threading.Event()
+        self.__next_tick: Optional[float] = None
 
         # Props
         self.__client = client
         self.period = period
         self.messages_per_period = messages_per_period
 
+        # Rate limit (shared by messages and models)
+        self.rate_limiter = RateLimiter(
+            self.__self_addr,
+            messages_per_second=Settings.GOSSIP_MAX_MESSAGES_PER_SECOND,
+            bytes_per_second=Settings.GOSSIP_MAX_BYTES_PER_SECOND,
+        )
+
+        # Model gossip targets (selected using the observed stats of the links)
+        self.peer_stats = PeerStats()
+        self.peer_selection = get_peer_selection_policy()
+        self.__last_model_size = 0
+
+        # Sends not yet completed (per neighbor and lane: small messages or models)
+        self.__in_flight: Dict[Tuple[str, bool], threading.Semaphore] = {}
+        self.__in_flight_lock = threading.Lock()
+
     ###
     # Thread control
     ###
@@ -82,23 +197,53 @@ class Gossiper(threading.Thread):
         """Stop the gossiper thread."""
         logger.info(self.__self_addr, "Stopping gossiper...")
         self.__gossip_terminate_flag.set()
+        self.__pending_msgs_flag.set()
 
     ###
     # Gossip
     ###
 
-    def add_message(self, msg: Any, pending_neis: List[str]) -> None:
+    def remove_neighbor(self, addr: str) -> None:
+        """
+        Forget the link stats and the in-flight sends of a removed neighbor.
+
+        Args:
+            addr: Address of the neighbor.
+
+        """
+        self.peer_stats.remove(addr)
+        with self.__in_flight_lock:
+            for bulk in (False, True):
+                self.__in_flight.pop((addr, bulk), None)
+
+    def add_message(self, msg: Any, pending_neis: List[str], cmd: Optional[str] = None, source: Optional[str] = None) -> None:
         """
         Add message to pending.
 
         Args:
             msg: Message to send.
             pending_neis: Neighbors to send the message.
+            cmd: Command of the message (used to prioritize and coalesce pending messages).
+            source: Source of the message (used to coalesce pending messages).
+
+        """
+        with self.__pending_msgs_lock:
+            self.__pending_msgs.push(msg, pending_neis, cmd, source)
+            self.__pending_msgs_flag.set()
+        for callback in self.__pending_callbacks:
+            callback()
+
+    def add_pending_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Add a function called (out of the lock) every time a message is added to pending.
+
+        Used to wake up the gossip when it is not run by its own thread (see :meth:`tick`).
+
+        Args:
+            callback: Function to call.
 
         """
-        self.__pending_msgs_lock.acquire()
-        self.__pending_msgs.append((msg, pending_neis))
-        self.__pending_msgs_lock.release()
+        self.__pending_callbacks = self.__pending_callbacks + [callback]
 
     def check_and_set_processed(self, msg_hash: int) -> bool:
         """
@@ -108,53 +253,199 @@ class Gossiper(threading.Thread):
             msg_hash: Hash of the message to check.
 
         """
-        self.__processed_messages_lock.acquire()
-        # Check if message was already processed
-        if msg_hash in self.__processed_messages:
-            self.__processed_messages_lock.release()
-            return False
-        # If there are more than X messages, remove the oldest one
-        if len(self.__processed_messages) > Settings.AMOUNT_LAST_MESSAGES_SAVED:
-            self.__processed_messages.pop(0)
-        # Add message
-        self.__processed_messages.append(msg_hash)
-        self.__processed_messages_lock.release()
-        return True
+        with self.__processed_messages_lock:
+            # Check if message was already processed
+            if msg_hash in self.__processed_messages:
+                self.__duplicated_messages += 1
+                return False
+            # Keep at most X messages, remove the oldest ones
+            while len(self.__processed_messages_order) >= Settings.AMOUNT_LAST_MESSAGES_SAVED:
+                self.__processed_messages.discard(self.__processed_messages_order.popleft())
+            # Add message
+            self.__processed_messages.add(msg_hash)
+            self.__processed_messages_order.append(msg_hash)
+            self.__new_messages += 1
+            return True
+
+    def get_processed_stats(self) -> Dict[str, int]:
+        """
+        Get the counters of the duplicate message detection.
+
+        Returns:
+            Number of duplicated (``hits``) and new (``misses``) messages checked, and number of hashes kept (``size``).
+
+        """
+        with self.__processed_messages_lock:
+            return {
+                "hits": self.__duplicated_messages,
+                "misses": self.__new_messages,
+                "size": len(self.__processed_messages),
+            }
 
     def run(self) -> None:
         """Run the gossiper thread."""
         while not self.__gossip_terminate_flag.is_set():
-            t = time.time()
-            messages_to_send = []
-            messages_left = self.messages_per_period
+            delay = self.tick()
+            if delay is None:
+                # Nothing to gossip, wait for new messages
+                self.__pending_msgs_flag.wait()
+            else:
+                # Sleep to allow periodicity
+                self.__gossip_terminate_flag.wait(delay)
 
-            # Lock
+    def tick(self) -> Optional[float]:
+        """
+        Gossip the pending messages of a period, never waiting for the neighbors.
+
+        Messages to the neighbors with all their in-flight slots taken (``Settings.GOSSIP_MAX_IN_FLIGHT_PER_PEER``) stay
+        pending for the next periods. Run by the gossiper thread, or periodically by the caller (without starting the
+        thread, see :meth:`add_pending_callback`).
+
+        Returns:
+            Time (seconds) until the next period, None if there is nothing to gossip (a new period starts when new
+            messages are added).
+
+        """
+        if self.__next_tick is None:
+            self.__next_tick = time.monotonic()
+
+        # Select the max amount of messages to send (to the neighbors with a free in-flight slot). Synchronous sends
+        # free their slots, so the messages left are selected again.
+        acquired: Dict[str, threading.Semaphore] = {}
+
+        def acquire_slot(nei: str) -> bool:
+            slots = self.__get_slots(nei, False)
+            if not slots.acquire(blocking=False):
+                return False
+            acquired[nei] = slots
+            return True
+
+        budget = self.messages_per_period
+        sent = 0
+        idle = False
+        while budget > 0:
             with self.__pending_msgs_lock:
-                # Select the max amount of messages to send
-                while messages_left > 0 and len(self.__pending_msgs) > 0:
-                    head_msg = self.__pending_msgs[0]
-                    # Select msgs
-                    if len(head_msg[1]) < messages_left:
-                        # Select all
-                        messages_to_send.append(head_msg)
-                        # Remove from pending
-                        self.__pending_msgs.pop(0)
-                    else:
-                        # Select only the first neis
-                        messages_to_send.append((head_msg[0], head_msg[1][:messages_left]))
-                        # Remove from pending
-                        self.__pending_msgs[0] = (
-                            self.__pending_msgs[0][0],
-                            self.__pending_msgs[0][1][messages_left:],
-                        )
+                messages_to_send = self.__pending_msgs.pop(budget, acquire_slot)
+                idle = len(self.__pending_msgs) == 0
+                if idle:
+                    self.__pending_msgs_flag.clear()
+            if not messages_to_send:
+                break
 
             # Send messages
             for msg, neis in messages_to_send:
+                size = self.__client.get_message_size(msg)
                 for nei in neis:
-                    self.__client.send(nei, msg)
-            # Sleep to allow periodicity
-            sleep_time = max(0, self.period - (t - time.time()))
-            time.sleep(sleep_time)
+                    if not self.__timed_send(nei, msg, size, 0, acquired[nei], self.__gossip_terminate_flag):
+                        self.__next_tick = None
+                        return None
+                budget -= len(neis)
+                sent += len(neis)
+
+        # Nothing to gossip
+        if idle and sent == 0:
+            self.__next_tick = None
+            return None
+
+        self.__next_tick = self.__next_period(self.__next_tick, self.period)
+        return self.__next_tick - time.monotonic()
+
+    def __get_slots(self, nei: str, bulk: bool) -> threading.Semaphore:
+        """
+        Get the in-flight slots of a neighbor (small messages and models have separate slots).
+
+        Args:
+            nei: Neighbor.
+            bulk: Slots of the models.
+
+        """
+        with self.__in_flight_lock:
+            return self.__in_flight.setdefault((nei, bulk), threading.Semaphore(Settings.GOSSIP_MAX_IN_FLIGHT_PER_PEER))
+
+    def __wait_slot(self, slots: threading.Semaphore) -> bool:
+        """
+        Wait for an in-flight slot of a neighbor.
+
+        Args:
+            slots: In-flight slots of the neighbor.
+
+        Returns:
+            False if the wait was interrupted by the stop of the gossiper, True otherwise.
+
+        """
+        while not slots.acquire(timeout=self.period):
+            if self.__gossip_terminate_flag.is_set():
+                return False
+        return True
+
+    def __timed_send(
+        self,
+        nei: str,
+        msg: Any,
+        size: int,
+        nbytes: int,
+        slots: threading.Semaphore,
+        stop_event: Optional[threading.Event] = None,
+        **kwargs: Any,
+    ) -> bool:
+        """
+        Send a message recording its duration in the stats of the link.
+
+        The caller holds an in-flight slot of the neighbor (``Settings.GOSSIP_MAX_IN_FLIGHT_PER_PEER``), released when
+        the send completes. The send waits for the rate limiter, so both apply to the completed sends of asynchronous
+        clients, not to the enqueued ones.
+
+        Args:
+            nei: Neighbor to send the message.
+            msg: Message to send.
+            size: Size (bytes) of the message (rate limiting).
+            nbytes: Size (bytes) of the model sent (0 for small messages, used to measure the latency).
+            slots: In-flight slots of the neighbor (one of them acquired by the caller).
+            stop_event: Event to stop waiting.
+            kwargs: Additional keyword arguments for the send method.
+
+        Returns:
+            False if the wait was interrupted by the stop event (the message is not sent), True otherwise.
+
+        """
+        if not self.rate_limiter.acquire(1, size, stop_event):
+            slots.release()
+            return False
+
+        def record(_: Any = None) -> None:
+            slots.release()
+            duration = time.monotonic() - start
+            if nbytes > 0:
+                self.peer_stats.record_transfer(nei, nbytes, duration)
+            else:
+                self.peer_stats.record_latency(nei, duration)
+
+        start = time.monotonic()
+        try:
+            result: Any = self.__client.send(nei, msg, **kwargs)  # type: ignore[func-returns-value]
+        except Exception:
+            slots.release()
+            raise
+        # Asynchronous clients return a future
+        if isinstance(result, futures.Future):
+            result.add_done_callback(record)
+        else:
+            record()
+        return True
+
+    @staticmethod
+    def __next_period(next_tick: float, period: float) -> float:
+        """
+        Get the start of the next period (the time spent working is not slept).
+
+        Args:
+            next_tick: Start (monotonic time) of the current period.
+            period: Period (seconds).
+
+        """
+        next_tick += period
+        # Behind schedule, do not try to catch up
+        return max(next_tick, time.monotonic())
 
     ###
     # Gossip Model (syncronous gossip not as a thread)
@@ -168,6 +459,7 @@ class Gossiper(threading.Thread):
         model_fn: Callable[[str], Any],
         period: float,
         create_connection: bool,
+        gap_fn: Optional[Callable[[str], int]] = None,
     ) -> None:
         """
         Gossip model weights. This is a synchronous gossip. End when there are no more neighbors to gossip.
@@ -179,16 +471,16 @@ class Gossiper(threading.Thread):
             model_fn: Function to get the model of a neighbor.
             period: Period of gossip.
             create_connection: Flag to create a connection.
+            gap_fn: Function to get the contributors a neighbor would get from the model (prioritizes the neighbors). Only
+                called if the peer selection policy needs the gaps.
 
         """
         # Initialize list with status of nodes in the last X iterations
         last_x_status: List[Any] = []
         j = 0
 
+        next_tick = time.monotonic()
         while True:
-            # Get time to calculate frequency
-            t = time.time()
-
             # If the trainning has been interrupted, stop waiting
             if early_stopping_fn():
                 logger.info(self.__self_addr, "Stopping model gossip process.")
@@ -203,7 +495,7 @@ class Gossiper(threading.Thread):
                 return
 
             # Save state of neighbors. If nodes are not responding gossip will stop
-            logger.debug(self.__self_addr, f"Gossip remaining nodes: {neis}")
+            logger.debug(self.__self_addr, "Gossip remaining nodes: %s", neis, every=10)
             if len(last_x_status) != Settings.GOSSIP_EXIT_ON_X_EQUAL_ROUNDS:
                 last_x_status.append(status_fn())
             else:
@@ -218,12 +510,13 @@ class Gossiper(threading.Thread):
                         self.__self_addr,
                         f"⏹️  Gossiping exited for {Settings.GOSSIP_EXIT_ON_X_EQUAL_ROUNDS} equal rounds.",
                     )
-                    logger.debug(self.__self_addr, f"Gossip last status: {last_x_status[-1]}")
+                    logger.debug(self.__self_addr, "Gossip last status: %s", last_x_status[-1])
                     return
 
-            # Select a random subset of neighbors
+            # Select a subset of neighbors
             samples = min(Settings.GOSSIP_MODELS_PER_ROUND, len(neis))
-            neis = random.sample(neis, samples)
+            gaps = {n: gap_fn(n) for n in neis} if gap_fn is not None and self.peer_selection.needs_gaps else None
+            neis = self.peer_selection.select(neis, samples, self.peer_stats, gaps, self.__last_model_size)
 
             # Generate and Send Model Partial Aggregations (model, node_contributors)
             for nei in neis:
@@ -231,9 +524,21 @@ class Gossiper(threading.Thread):
                 model = model_fn(nei)
                 if model is None:
                     continue
-                logger.debug(self.__self_addr, f"Gossiping model to {nei}.")
-                self.__client.send(nei, model, create_connection=create_connection)
+                logger.debug(self.__self_addr, "Gossiping model to %s.", nei)
+                self.__last_model_size = self.__client.get_message_size(model)
+                slots = self.__get_slots(nei, True)
+                if not self.__wait_slot(slots) or not self.__timed_send(
+                    nei,
+                    model,
+                    self.__last_model_size,
+                    self.__last_model_size,
+                    slots,
+                    self.__gossip_terminate_flag,
+                    create_connection=create_connection,
+                ):
+                    logger.info(self.__self_addr, "Stopping model gossip process.")
+                    return
 
             # Sleep to allow periodicity
-            sleep_time = max(0, period - (t - time.time()))
-            time.sleep(sleep_time)
+            next_tick = self.__next_period(next_tick, period)
+            time.sleep(max(0.0, next_tick - time.monotonic()))
@@ -0,0 +1,214 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Asynchronous GRPC client."""
+
+import asyncio
+import concurrent.futures
+import time
+import uuid
+from typing import Any, List, Optional
+
+import grpc
+
+from p2pfl.communication.protocols.exceptions import CommunicationError, NeighborNotConnectedError
+from p2pfl.communication.protocols.grpc.async_grpc_neighbors import AsyncGrpcNeighbors, create_aio_channel
+from p2pfl.communication.protocols.grpc.channel_pool import ChannelPool
+from p2pfl.communication.protocols.grpc.event_loop import run_blocking, run_coroutine
+from p2pfl.communication.protocols.grpc.grpc_client import BaseGrpcClient
+from p2pfl.communication.protocols.grpc.proto import node_pb2
+from p2pfl.communication.protocols.grpc.server_lanes import is_busy, send_metadata
+from p2pfl.communication.protocols.grpc.weights_transfer import build_header, iter_chunks
+from p2pfl.management.logger import logger
+from p2pfl.settings import Settings
+
+
+class AsyncGrpcClient(BaseGrpcClient):
+    """
+    Client side of the asynchronous GRPC communication protocol.
+
+    Messages are sent from the process-wide event loop: ``send`` and ``broadcast`` return immediately with a future.
+
+    Args:
+        self_addr: Address of the node.
+        neighbors: Neighbors of the node.
+
+    """
+
+    def __init__(self, self_addr: str, neighbors: AsyncGrpcNeighbors) -> None:
+        """Initialize the asynchronous GRPC client."""
+        super().__init__(
+            self_addr,
+            neighbors,
+            ChannelPool(
+                create_aio_channel,
+                Settings.GRPC_CHANNEL_POOL_SIZE,
+                Settings.GRPC_CHANNEL_IDLE_TIMEOUT,
+                close_fn=lambda channel: run_coroutine(channel.close()),
+            ),
+        )
+
+    ####
+    # Message Sending
+    ####
+
+    def send(  # type: ignore[override]
+        self,
+        nei: str,
+        msg: node_pb2.RootMessage,
+        create_connection: bool = False,
+        raise_error: bool = False,
+        remove_on_error: bool = True,
+    ) -> "concurrent.futures.Future[None]":
+        """
+        Send a message to a neighbor without blocking.
+
+        Args:
+            nei: Neighbor address.
+            msg: Message to send.
+            create_connection: Create a connection if not exists.
+            raise_error: Raise error (in the returned future) if an error occurs.
+            remove_on_error: Remove neighbor if an error occurs.
+
+        Returns:
+            Future completed when the message has been sent.
+
+        """
+        return run_coroutine(self.send_async(nei, msg, create_connection, raise_error, remove_on_error))
+
+    async def send_async(
+        self,
+        nei: str,
+        msg: node_pb2.RootMessage,
+        create_connection: bool = False,
+        raise_error: bool = False,
+        remove_on_error: bool = True,
+    ) -> None:
+        """
+        Send a message to a neighbor (coroutine, runs in the event loop).
+
+        Args:
+            nei: Neighbor address.
+            msg: Message to send.
+            create_connection: Create a connection if not exists.
+            raise_error: Raise error if an error occurs.
+            remove_on_error: Remove neighbor if an error occurs.
+
+        """
+        pooled = False
+        try:
+            # Get neighbor
+            try:
+                node_stub: Any = self._neighbors.get(nei)[1]
+            except KeyError as e:
+                raise NeighborNotConnectedError(f"Neighbor {nei} not found.") from e
+
+            # Check if direct connection (otherwise, reuse a pooled channel)
+            if node_stub is None and create_connection:
+                node_stub = self._channel_pool.get_stub(nei)
+                pooled = True
+
+            # Send
+            if node_stub is not None:
+                # Send message (large models are streamed in chunks)
+                if msg.HasField("weights") and len(msg.weights.weights) > Settings.GRPC_CHUNK_SIZE:
+                    res = await self.__send_weights_chunked(node_stub, msg)
+                else:
+                    res = await node_stub.send(msg, timeout=Settings.GRPC_TIMEOUT, metadata=send_metadata(self._self_addr, msg))
+            else:
+                raise NeighborNotConnectedError("Neighbor not directly connected (Stub not defined and create_connection is false).")
+            if res.error:
+                raise CommunicationError(f"Error while sending a message: {msg.cmd}: {res.error}")
+        except Exception as e:
+            logger.info(
+                self._self_addr,
+                f"Cannot send message {msg.cmd} to {nei}. Error: {str(e)}",
+            )
+            # Do not reuse a possibly broken channel
+            if pooled and not is_busy(e):
+                self._channel_pool.remove(nei)
+            # Remove neighbor unless it is busy (takes the neighbors lock, out of the event loop)
+            if remove_on_error and not is_busy(e):
+                await run_blocking(self._neighbors.remove, nei, disconnect_msg=True)
+            # Re-raise
+            if raise_error:
+                raise e
+
+    async def __send_weights_chunked(self, node_stub: Any, msg: node_pb2.RootMessage) -> node_pb2.ResponseMessage:
+        """
+        Send a weights message in chunks, resuming the transfer if it is interrupted.
+
+        Args:
+            node_stub: Stub of the neighbor.
+            msg: Weights message to send.
+
+        """
+        data = msg.weights.weights
+        header = build_header(msg)
+        transfer_id = uuid.uuid4().hex
+        start = 0
+        for attempt in range(Settings.GRPC_TRANSFER_RETRIES + 1):
+            try:
+                return await node_stub.send_weights(
+                    iter_chunks(transfer_id, header, data, Settings.GRPC_CHUNK_SIZE, start),
+                    timeout=Settings.GRPC_TIMEOUT,
+                )
+            except grpc.aio.AioRpcError as e:
+                # Neighbor without chunked transfers
+                if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                    return await node_stub.send(msg, timeout=Settings.GRPC_TIMEOUT, metadata=send_metadata(self._self_addr, msg))
+                # Bulk lane of the neighbor full, nothing to resume
+                if is_busy(e) or attempt == Settings.GRPC_TRANSFER_RETRIES:
+                    raise e
+                # Resume from the last received byte
+                status = await node_stub.transfer_status(
+                    node_pb2.TransferStatusRequest(transfer_id=transfer_id), timeout=Settings.GRPC_TIMEOUT
+                )
+                start = status.received
+                logger.debug(self._self_addr, f"Resuming model transfer {transfer_id} from byte {start} (attempt {attempt + 1})")
+        raise CommunicationError("Model transfer failed")
+
+    def broadcast(
+        self,
+        msg: node_pb2.RootMessage,
+        node_list: Optional[List[str]] = None,
+    ) -> "concurrent.futures.Future[None]":
+        """
+        Broadcast a message to all the neighbors without blocking. Messages are sent concurrently.
+
+        Args:
+            msg: Message to send.
+            node_list: List of neighbors to send the message. If None, send to all the neighbors.
+
+        Returns:
+            Future completed when the message has been sent to all the neighbors.
+
+        """
+        nodes = list(node_list if node_list is not None else self._neighbors.get_all(only_direct=True).keys())
+        return run_coroutine(self.__broadcast(msg, nodes))
+
+    async def __broadcast(self, msg: node_pb2.RootMessage, nodes: List[str]) -> None:
+        start = time.monotonic()
+
+        async def timed_send(nei: str) -> None:
+            try:
+                await self.send_async(nei, msg)
+            finally:
+                self.broadcast_latency.add(time.monotonic() - start)
+
+        await asyncio.gather(*[timed_send(n) for n in nodes])
+        self.broadcast_latency.report()
@@ -0,0 +1,284 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Asynchronous GRPC communication protocol (grpc.aio)."""
+
+import concurrent.futures
+from typing import Any, Callable, List, Mapping, Optional, Union
+
+from p2pfl.communication.commands.command import Command
+from p2pfl.communication.commands.message.heartbeat_command import HeartbeatCommand
+from p2pfl.communication.protocols.communication_protocol import CommunicationProtocol
+from p2pfl.communication.protocols.gossiper import Gossiper
+from p2pfl.communication.protocols.grpc.address import AddressParser
+from p2pfl.communication.protocols.grpc.async_grpc_client import AsyncGrpcClient
+from p2pfl.communication.protocols.grpc.async_grpc_neighbors import AsyncGrpcNeighbors
+from p2pfl.communication.protocols.grpc.async_grpc_server import AsyncGrpcServer
+from p2pfl.communication.protocols.grpc.event_loop import PeriodicTask
+from p2pfl.communication.protocols.grpc.grpc_communication_protocol import running
+from p2pfl.communication.protocols.grpc.proto import node_pb2
+from p2pfl.communication.protocols.heartbeater import Heartbeater
+from p2pfl.settings import Settings
+
+
+class AsyncGrpcCommunicationProtocol(CommunicationProtocol):
+    """
+    Asynchronous GRPC communication protocol, a drop-in replacement of the ``GrpcCommunicationProtocol``.
+
+    The servers, channels and calls of all the nodes of the process share a single event loop (see
+    :mod:`p2pfl.communication.protocols.grpc.event_loop`), so nodes do not need their own server threads and
+    ``send``/``broadcast`` do not block the caller. Heartbeats and gossip are periodic tasks of the event loop instead of
+    threads of the node.
+
+    Args:
+        addr: Address of the node.
+        commands: Commands to add to the communication protocol.
+
+    """
+
+    def __init__(self, addr: str = "127.0.0.1", commands: Optional[List[Command]] = None) -> None:
+        """Initialize the asynchronous GRPC communication protocol."""
+        # Parse IP address
+        parsed_address = AddressParser(addr)
+        self.addr = parsed_address.get_parsed_address()
+        # Neighbors
+        self._neighbors = AsyncGrpcNeighbors(self.addr)
+        # GRPC Client
+        self._client = AsyncGrpcClient(self.addr, self._neighbors)
+        # Gossip
+        self._gossiper = Gossiper(self.addr, self._client)
+        self._neighbors.add_removal_callback(self._gossiper.remove_neighbor)
+        self.__gossip_task = PeriodicTask(self._gossiper.tick)
+        self._gossiper.add_pending_callback(self.__gossip_task.wake)
+        # Hearbeat
+        self._heartbeater = Heartbeater(self.addr, self._neighbors, self._client)
+        self.__heartbeat_task = PeriodicTask(self._heartbeater.tick)
+        # GRPC
+        self._server = AsyncGrpcServer(self.addr, self._gossiper, self._neighbors, commands, self._heartbeater)
+        # Commands
+        self.add_command(HeartbeatCommand(self._heartbeater))
+        if commands is None:
+            commands = []
+        self.add_command(commands)
+
+    def get_address(self) -> str:
+        """
+        Get the address.
+
+        Returns:
+            The address.
+
+        """
+        return self.addr
+
+    def start(self) -> None:
+        """Start the asynchronous GRPC communication protocol."""
+        self._server.start()
+        self.__heartbeat_task.start()
+        self.__gossip_task.start()
+
+    @running
+    def stop(self) -> None:
+        """Stop the asynchronous GRPC communication protocol."""
+        self.__heartbeat_task.stop()
+        self.__gossip_task.stop()
+        self._heartbeater.stop()
+        self._gossiper.stop()
+        self._neighbors.clear_neighbors()
+        self._client.close()
+        self._server.stop()
+
+    def add_command(self, cmds: Union[Command, List[Command]]) -> None:
+        """
+        Add a command to the communication protocol.
+
+        Args:
+            cmds: The command to add.
+
+        """
+        self._server.add_command(cmds)
+
+    @running
+    def connect(self, addr: str, non_direct: bool = False) -> bool:
+        """
+        Connect to a neighbor.
+
+        Args:
+            addr: The address to connect to.
+            non_direct: The non direct flag.
+
+        """
+        return self._neighbors.add(addr, non_direct=non_direct)
+
+    @running
+    def disconnect(self, nei: str, disconnect_msg: bool = True) -> None:
+        """
+        Disconnect from a neighbor.
+
+        Args:
+            nei: The neighbor to disconnect from.
+            disconnect_msg: The disconnect message flag.
+
+        """
+        self._neighbors.remove(nei, disconnect_msg=disconnect_msg)
+
+    def build_msg(self, cmd: str, args: Optional[List[str]] = None, round: Optional[int] = None) -> Any:
+        """
+        Build a message.
+
+        Args:
+            cmd: The message.
+            args: The arguments.
+            round: The round.
+
+        """
+        if args is None:
+            args = []
+        return self._client.build_message(cmd, args, round)
+
+    def build_weights(
+        self,
+        cmd: str,
+        round: int,
+        serialized_model: bytes,
+        contributors: Optional[List[str]] = None,
+        weight: int = 1,
+    ) -> Any:
+        """
+        Build weights.
+
+        Args:
+            cmd: The command.
+            round: The round.
+            serialized_model: The serialized model.
+            contributors: The model contributors.
+            weight: The weight of the model (amount of samples used).
+
+        """
+        if contributors is None:
+            contributors = []
+        return self._client.build_weights(cmd, round, serialized_model, contributors, weight)
+
+    @running
+    def send(  # type: ignore[override]
+        self,
+        nei: str,
+        msg: node_pb2.RootMessage,
+        raise_error: bool = False,
+        remove_on_error: bool = True,
+    ) -> "concurrent.futures.Future[None]":
+        """
+        Send a message to a neighbor without blocking.
+
+        If ``raise_error`` is set, the call waits for the message to be sent so that errors are raised as in the
+        synchronous protocol.
+
+        Args:
+            nei: The neighbor to send the message.
+            msg: The message to send.
+            raise_error: If raise error.
+            remove_on_error: If remove on error.
+
+        Returns:
+            Future completed when the message has been sent.
+
+        """
+        future = self._client.send(nei, msg, raise_error=raise_error, remove_on_error=remove_on_error)
+        if raise_error:
+            future.result()
+        return future
+
+    @running
+    def broadcast(  # type: ignore[override]
+        self, msg: node_pb2.RootMessage, node_list: Optional[List[str]] = None
+    ) -> "concurrent.futures.Future[None]":
+        """
+        Broadcast a message to all neighbors without blocking.
+
+        Args:
+            msg: The message to broadcast.
+            node_list: Optional node list.
+
+        Returns:
+            Future completed when the message has been sent to all the neighbors.
+
+        """
+        if node_list is None:
+            self._heartbeater.notify_sent()
+        return self._client.broadcast(msg, node_list)
+
+    @running
+    def get_neighbors(self, only_direct: bool = False) -> Mapping[str, Any]:
+        """
+        Get the neighbors.
+
+        Args:
+            only_direct: The only direct flag.
+
+        """
+        return self._neighbors.get_all(only_direct)
+
+    def get_neighbor_encodings(self, nei: str) -> List[str]:
+        """
+        Get the model encodings advertised by a neighbor in the handshake.
+
+        Args:
+            nei: The neighbor.
+
+        """
+        return self._neighbors.get_encodings(nei)
+
+    @running
+    def wait_for_termination(self) -> None:
+        """Wait for the termination of the server."""
+        self._server.wait_for_termination()
+
+    @running
+    def gossip_weights(
+        self,
+        early_stopping_fn: Callable[[], bool],
+        get_candidates_fn: Callable[[], List[str]],
+        status_fn: Callable[[], Any],
+        model_fn: Callable[[str], Any],
+        period: Optional[float] = None,
+        create_connection: bool = False,
+        gap_fn: Optional[Callable[[str], int]] = None,
+    ) -> None:
+        """
+        Gossip model weights.
+
+        Args:
+            early_stopping_fn: The early stopping function.
+            get_candidates_fn: The get candidates function.
+            status_fn: The status function.
+            model_fn: The model function.
+            period: The period.
+            create_connection: The create connection flag.
+            gap_fn: The function to get the contributors a neighbor would get from the model.
+
+        """
+        if period is None:
+            period = Settings.GOSSIP_MODELS_PERIOD
+        self._gossiper.gossip_weights(
+            early_stopping_fn,
+            get_candidates_fn,
+            status_fn,
+            model_fn,
+            period,
+            create_connection,
+            gap_fn,
+        )
@@ -0,0 +1,120 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Asynchronous GRPC neighbors."""
+
+import contextlib
+import time
+from os.path import isfile
+from typing import Any, Optional, Tuple
+
+import grpc
+
+from p2pfl.communication.protocols.grpc.credentials import credentials_provider
+from p2pfl.communication.protocols.grpc.event_loop import run_coroutine, run_sync
+from p2pfl.communication.protocols.grpc.grpc_neighbors import GrpcNeighbors
+from p2pfl.communication.protocols.grpc.proto import node_pb2, node_pb2_grpc
+from p2pfl.learning.frameworks.model_encoding import SUPPORTED_ENCODINGS
+from p2pfl.management.logger import logger
+from p2pfl.settings import Settings
+
+
+def create_aio_channel(addr: str) -> grpc.aio.Channel:
+    """
+    Create an asynchronous channel to a node (secure if SSL is enabled). Must be called from the event loop.
+
+    Args:
+        addr: Address of the node.
+
+    """
+    if Settings.USE_SSL and isfile(Settings.SERVER_CRT):
+        return grpc.aio.secure_channel(addr, credentials_provider.get_channel_credentials())
+    return grpc.aio.insecure_channel(addr)
+
+
+class AsyncGrpcNeighbors(GrpcNeighbors):
+    """
+    Implementation of the neighbors for the asynchronous GRPC communication protocol.
+
+    Neighbors hold ``grpc.aio`` channels and stubs. Connecting blocks the caller (never the event loop) until the
+    handshake is done, and disconnecting is scheduled in the event loop without waiting.
+    """
+
+    def connect(
+        self, addr: str, non_direct: bool = False, handshake_msg: bool = True
+    ) -> Tuple[Optional[grpc.aio.Channel], Optional[node_pb2_grpc.NodeServicesStub], float]:
+        """
+        Connect to a neighbor.
+
+        Args:
+            addr: Address of the neighbor to connect.
+            non_direct: If the connection is direct or not.
+            handshake_msg: If a handshake message is needed.
+
+        """
+        if non_direct:
+            logger.debug(self.self_addr, f"Found node {addr}")
+            return (None, None, time.time())
+        logger.info(self.self_addr, f"Adding {addr}")
+        try:
+            return run_sync(self.__build_direct_neighbor(addr, handshake_msg), timeout=Settings.GRPC_TIMEOUT * 2)
+        except Exception as e:
+            logger.info(self.self_addr, f"Crash while adding a neighbor: {e}")
+            raise e
+
+    async def __build_direct_neighbor(
+        self, addr: str, handshake_msg: bool
+    ) -> Tuple[grpc.aio.Channel, node_pb2_grpc.NodeServicesStub, float]:
+        channel = create_aio_channel(addr)
+        stub = node_pb2_grpc.NodeServicesStub(channel)
+        if handshake_msg:
+            try:
+                res = await stub.handshake(  # type: ignore
+                    node_pb2.HandShakeRequest(addr=self.self_addr, encodings=SUPPORTED_ENCODINGS),
+                    timeout=Settings.GRPC_TIMEOUT,
+                )
+            except Exception:
+                await channel.close()
+                raise
+            if res.error:
+                logger.info(self.self_addr, f"Cannot add a neighbor: {res.error}")
+                await channel.close()
+                raise Exception(f"Cannot add a neighbor: {res.error}")
+            self._set_encodings(addr, list(res.encodings))
+        return (channel, stub, time.time())
+
+    def disconnect(self, addr: str, disconnect_msg: bool = True) -> None:
+        """
+        Disconnect from a neighbor.
+
+        Args:
+            addr: Address of the neighbor to disconnect.
+            disconnect_msg: If a disconnect message is needed.
+
+        """
+        try:
+            node_channel, node_stub, _ = self.get(addr)
+        except KeyError:
+            return
+        if node_channel is not None:
+            run_coroutine(self.__close(node_channel, node_stub if disconnect_msg else None))
+
+    async def __close(self, channel: Any, stub: Optional[node_pb2_grpc.NodeServicesStub]) -> None:
+        if stub is not None:
+            with contextlib.suppress(Exception):
+                await stub.disconnect(node_pb2.HandShakeRequest(addr=self.self_addr), timeout=Settings.GRPC_TIMEOUT)  # type: ignore
+        await channel.close()
@@ -0,0 +1,306 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Asynchronous GRPC server."""
+
+from os.path import isfile
+from typing import AsyncIterator, List, Optional, Union
+
+import google.protobuf.empty_pb2
+import grpc
+
+from p2pfl.communication.commands.command import Command
+from p2pfl.communication.protocols.gossiper import Gossiper
+from p2pfl.communication.protocols.grpc.async_grpc_neighbors import AsyncGrpcNeighbors
+from p2pfl.communication.protocols.grpc.credentials import credentials_provider
+from p2pfl.communication.protocols.grpc.event_loop import run_blocking, run_sync
+from p2pfl.communication.protocols.grpc.grpc_server import execute_message
+from p2pfl.communication.protocols.grpc.proto import node_pb2, node_pb2_grpc
+from p2pfl.communication.protocols.grpc.server_lanes import BULK_LANE, CONTROL_LANE, get_sender
+from p2pfl.communication.protocols.grpc.weights_transfer import TransferError, WeightsReassembler
+from p2pfl.communication.protocols.heartbeater import Heartbeater, heartbeater_cmd_name
+from p2pfl.learning.frameworks.model_encoding import SUPPORTED_ENCODINGS
+from p2pfl.management.logger import logger
+from p2pfl.settings import Settings
+
+
+class AsyncGrpcServer(node_pb2_grpc.NodeServicesServicer):
+    """
+    Server side of the asynchronous GRPC communication protocol, served from the process-wide event loop.
+
+    Chunks of model transfers are reassembled in the event loop. The blocking work of the calls (commands and
+    neighbors, whose lock can be held while waiting for the event loop) runs in the executor returned by
+    :func:`get_executor`: model transfers in its bulk lane, everything else in its control-plane lane.
+
+    Args:
+        addr: Address of the server.
+        gossiper: Gossiper instance.
+        neighbors: Neighbors instance.
+        commands: List of commands to be executed by the server.
+        heartbeater: Heartbeater notified of the received messages (proof of life of their sources).
+
+    """
+
+    def __init__(
+        self,
+        addr: str,
+        gossiper: Gossiper,
+        neighbors: AsyncGrpcNeighbors,
+        commands: Optional[List[Command]] = None,
+        heartbeater: Optional[Heartbeater] = None,
+    ) -> None:
+        """Initialize the asynchronous GRPC server."""
+        # Message handlers
+        if commands is None:
+            commands = []
+        self.__commands = {c.get_name(): c for c in commands}
+
+        # Address
+        self.addr = addr
+
+        # Server (created in the event loop)
+        self.__server: Optional[grpc.aio.Server] = None
+
+        # Chunked model transfers
+        self.__reassembler = WeightsReassembler(Settings.GRPC_TRANSFER_TIMEOUT)
+
+        # Gossiper
+        self.__gossiper = gossiper
+
+        # Neighbors
+        self.__neighbors = neighbors
+
+        # Heartbeater
+        self.__heartbeater = heartbeater
+
+    ####
+    # Management
+    ####
+
+    def start(self, wait: bool = False) -> None:
+        """
+        Start the GRPC server.
+
+        Args:
+            wait: If True, wait for termination.
+
+        """
+        run_sync(self.__start())
+        if wait:
+            self.wait_for_termination()
+
+    async def __start(self) -> None:
+        maxMsgLength = 1024 * 1024 * 1024
+        server = grpc.aio.server(
+            options=[
+                ("grpc.max_send_message_length", maxMsgLength),
+                ("grpc.max_receive_message_length", maxMsgLength),
+            ],
+        )
+        node_pb2_grpc.add_NodeServicesServicer_to_server(self, server)
+        try:
+            if Settings.USE_SSL and isfile(Settings.SERVER_KEY) and isfile(Settings.SERVER_CRT):
+                server.add_secure_port(self.addr, credentials_provider.get_server_credentials())
+            else:
+                server.add_insecure_port(self.addr)
+        except Exception as e:
+            raise Exception(f"Cannot bind the address ({self.addr}): {e}") from e
+        await server.start()
+        self.__server = server
+
+    def stop(self) -> None:
+        """Stop the GRPC server."""
+        if self.__server is not None:
+            server, self.__server = self.__server, None
+            run_sync(server.stop(0))
+
+    def wait_for_termination(self) -> None:
+        """Wait for termination."""
+        if self.__server is not None:
+            run_sync(self.__server.wait_for_termination())
+
+    def is_running(self) -> bool:
+        """
+        Check if the server is running.
+
+        Returns:
+            True if the server is running, False otherwise.
+
+        """
+        return self.__server is not None
+
+    ####
+    # GRPC Services
+    ####
+
+    async def handshake(self, request: node_pb2.HandShakeRequest, _: grpc.aio.ServicerContext) -> node_pb2.ResponseMessage:
+        """
+        GRPC service. It is called when a node connects to another.
+
+        Args:
+            request: Request message.
+            _: Context.
+
+        """
+        if await run_blocking(self.__add_neighbor, request):
+            return node_pb2.ResponseMessage(encodings=SUPPORTED_ENCODINGS)
+        else:
+            return node_pb2.ResponseMessage(error="Cannot add the node (duplicated or wrong direction)")
+
+    def __add_neighbor(self, request: node_pb2.HandShakeRequest) -> bool:
+        """
+        Add the node of a handshake as a neighbor (blocking, runs in the executor).
+
+        Args:
+            request: Request message.
+
+        Returns:
+            True if the neighbor has been added.
+
+        """
+        if self.__neighbors.add(request.addr, non_direct=False, handshake_msg=False):
+            self.__neighbors.set_encodings(request.addr, list(request.encodings))
+            return True
+        return False
+
+    async def disconnect(self, request: node_pb2.HandShakeRequest, _: grpc.aio.ServicerContext) -> google.protobuf.empty_pb2.Empty:
+        """
+        GRPC service. It is called when a node disconnects from another.
+
+        Args:
+            request: Request message.
+            _: Context.
+
+        """
+        await run_blocking(self.__neighbors.remove, request.addr, disconnect_msg=False)
+        return google.protobuf.empty_pb2.Empty()
+
+    async def send(self, request: node_pb2.RootMessage, context: grpc.aio.ServicerContext) -> node_pb2.ResponseMessage:
+        """
+        GRPC service. Handles both regular messages and model weights.
+
+        Args:
+            request: The RootMessage containing either a Message or Weights payload.
+            context: Context.
+
+        """
+        # Proof of life of the neighbor that sent the message (models are never relayed)
+        sender = request.source if request.HasField("weights") else get_sender(context)
+        lane = BULK_LANE if request.HasField("weights") else CONTROL_LANE
+        return await run_blocking(self.__process, request, sender, lane=lane)
+
+    def __process(self, request: node_pb2.RootMessage, sender: Optional[str]) -> node_pb2.ResponseMessage:
+        """
+        Process a received message (blocking, runs in the executor).
+
+        Args:
+            request: The RootMessage containing either a Message or Weights payload.
+            sender: Address of the node that sent the message.
+
+        """
+        self.__notify_received(sender, request.cmd)
+
+        # If message already processed, return
+        if request.HasField("message") and not self.__gossiper.check_and_set_processed(request.message.hash):
+            return node_pb2.ResponseMessage()
+
+        # Process message/model
+        error = execute_message(self.addr, self.__commands, request)
+        if error is not None:
+            return node_pb2.ResponseMessage(error=error)
+
+        # If message gossip
+        if request.HasField("message") and request.message.ttl > 0:
+            # Update ttl and gossip
+            request.message.ttl -= 1
+            pending_neis = [n for n in self.__neighbors.get_all(only_direct=True) if n != request.source]
+            self.__gossiper.add_message(request, pending_neis, request.cmd, request.source)
+
+        return node_pb2.ResponseMessage()
+
+    async def send_weights(
+        self, request_iterator: AsyncIterator[node_pb2.WeightsChunk], _: grpc.aio.ServicerContext
+    ) -> node_pb2.ResponseMessage:
+        """
+        GRPC service. Receives a model split in chunks and executes its command once the transfer is complete.
+
+        Args:
+            request_iterator: Chunks of the transfer.
+            _: Context.
+
+        """
+        async for chunk in request_iterator:
+            try:
+                completed = self.__reassembler.add_chunk(chunk)
+            except TransferError as e:
+                logger.debug(self.addr, f"Error in model transfer: {e}")
+                return node_pb2.ResponseMessage(error=str(e))
+            if completed is not None:
+                header, weights = completed
+                return await run_blocking(self.__process_weights, header, weights, lane=BULK_LANE)
+        return node_pb2.ResponseMessage(error="Incomplete model transfer")
+
+    def __process_weights(self, header: node_pb2.RootMessage, weights: Union[bytes, bytearray]) -> node_pb2.ResponseMessage:
+        """
+        Process a model received in chunks (blocking, runs in the executor).
+
+        Args:
+            header: Message of the transfer, without the model.
+            weights: Serialized model.
+
+        """
+        self.__notify_received(header.source, header.cmd)
+        error = execute_message(self.addr, self.__commands, header, weights)
+        if error is not None:
+            return node_pb2.ResponseMessage(error=error)
+        return node_pb2.ResponseMessage()
+
+    async def transfer_status(self, request: node_pb2.TransferStatusRequest, _: grpc.aio.ServicerContext) -> node_pb2.TransferStatus:
+        """
+        GRPC service. Returns the number of bytes received for a model transfer (used to resume it).
+
+        Args:
+            request: Request message.
+            _: Context.
+
+        """
+        return node_pb2.TransferStatus(received=self.__reassembler.received(request.transfer_id))
+
+    def __notify_received(self, sender: Optional[str], cmd: str) -> None:
+        # Any message is a proof of life of the neighbor that sent it (heartbeats are handled by their command)
+        if self.__heartbeater is not None and sender is not None and cmd != heartbeater_cmd_name:
+            self.__heartbeater.notify_received(sender)
+
+    ####
+    # Commands
+    ####
+
+    def add_command(self, cmds: Union[Command, List[Command]]) -> None:
+        """
+        Add a command.
+
+        Args:
+            cmds: Command or list of commands to be added.
+
+        """
+        if isinstance(cmds, list):
+            for cmd in cmds:
+                self.__commands[cmd.get_name()] = cmd
+        elif isinstance(cmds, Command):
+            self.__commands[cmds.get_name()] = cmds
+        else:
+            raise Exception("Command not valid")
@@ -0,0 +1,121 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Pool of reusable gRPC channels for non-direct neighbors."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from p2pfl.communication.protocols.grpc.proto import node_pb2_grpc
+
+
+class ChannelPool:
+    """
+    Bounded pool of gRPC channels, evicting the least recently used one when it is full.
+
+    Channels not used for ``idle_timeout`` seconds are closed. It avoids a new channel (and TLS handshake) for
+    every message sent to a non-direct neighbor.
+
+    Args:
+        channel_factory: Function to create a channel to an address.
+        max_size: Maximum number of open channels.
+        idle_timeout: Time (seconds) after which an unused channel is closed.
+        close_fn: Function to close a channel (``channel.close()`` by default).
+
+    """
+
+    def __init__(
+        self,
+        channel_factory: Callable[[str], Any],
+        max_size: int,
+        idle_timeout: float,
+        close_fn: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """Initialize the pool."""
+        self.__channel_factory = channel_factory
+        self.__close_fn = close_fn if close_fn is not None else lambda channel: channel.close()
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        # addr -> (channel, stub, last use), ordered from least to most recently used
+        self.__channels: OrderedDict[str, Tuple[Any, node_pb2_grpc.NodeServicesStub, float]] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get_stub(self, addr: str) -> node_pb2_grpc.NodeServicesStub:
+        """
+        Get a stub for an address, reusing its channel if it is in the pool.
+
+        Args:
+            addr: Address of the node.
+
+        """
+        now = time.monotonic()
+        to_close = []
+        with self.__lock:
+            # Close idle channels (the oldest are at the beginning)
+            while self.__channels:
+                oldest_addr, (channel, _, last_use) = next(iter(self.__channels.items()))
+                if now - last_use <= self.idle_timeout:
+                    break
+                del self.__channels[oldest_addr]
+                to_close.append(channel)
+
+            if addr in self.__channels:
+                channel, stub, _ = self.__channels.pop(addr)
+            else:
+                channel = self.__channel_factory(addr)
+                stub = node_pb2_grpc.NodeServicesStub(channel)
+            self.__channels[addr] = (channel, stub, now)
+
+            # Evict the least recently used
+            while len(self.__channels) > self.max_size:
+                _, (channel_to_close, _, _) = self.__channels.popitem(last=False)
+                to_close.append(channel_to_close)
+
+        for c in to_close:
+            self.__close_fn(c)
+        return stub
+
+    def remove(self, addr: str) -> None:
+        """
+        Close and remove the channel of an address (if any).
+
+        Args:
+            addr: Address of the node.
+
+        """
+        with self.__lock:
+            entry = self.__channels.pop(addr, None)
+        if entry is not None:
+            self.__close_fn(entry[0])
+
+    def close(self) -> None:
+        """Close all the channels."""
+        with self.__lock:
+            channels = [c for c, _, _ in self.__channels.values()]
+            self.__channels.clear()
+        for c in channels:
+            self.__close_fn(c)
+
+    def __len__(self) -> int:
+        """Get the number of open channels."""
+        return len(self.__channels)
+
+    def __contains__(self, addr: str) -> bool:
+        """Check if there is a channel for an address."""
+        return addr in self.__channels
@@ -0,0 +1,92 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Process-wide cache of the gRPC SSL credentials."""
+
+import os
+import threading
+from typing import Any, Dict, Tuple
+
+import grpc
+
+from p2pfl.settings import Settings
+
+
+class CredentialsProvider:
+    """
+    Load and build the gRPC SSL credentials once, shared by all the nodes of the process.
+
+    The certificate files are read again only when their path or modification time changes (certificate rotation).
+    """
+
+    def __init__(self) -> None:
+        """Initialize the provider."""
+        # kind -> (files key, credentials)
+        self.__cache: Dict[str, Tuple[Tuple[Tuple[str, int], ...], Any]] = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __files_key(*paths: str) -> Tuple[Tuple[str, int], ...]:
+        return tuple((path, os.stat(path).st_mtime_ns) for path in paths)
+
+    @staticmethod
+    def __read(*paths: str) -> Tuple[bytes, ...]:
+        contents = []
+        for path in paths:
+            with open(path) as f:
+                contents.append(f.read().encode())
+        return tuple(contents)
+
+    def get_channel_credentials(self) -> grpc.ChannelCredentials:
+        """Get the client credentials (``Settings.CLIENT_KEY``, ``Settings.CLIENT_CRT`` and ``Settings.CA_CRT``)."""
+        paths = (Settings.CLIENT_KEY, Settings.CLIENT_CRT, Settings.CA_CRT)
+        with self.__lock:
+            key = self.__files_key(*paths)
+            cached = self.__cache.get("channel")
+            if cached is None or cached[0] != key:
+                private_key, certificate_chain, root_certificates = self.__read(*paths)
+                creds = grpc.ssl_channel_credentials(
+                    root_certificates=root_certificates,
+                    private_key=private_key,
+                    certificate_chain=certificate_chain,
+                )
+                cached = (key, creds)
+                self.__cache["channel"] = cached
+            return cached[1]
+
+    def get_server_credentials(self) -> grpc.ServerCredentials:
+        """Get the server credentials (``Settings.SERVER_KEY``, ``Settings.SERVER_CRT`` and ``Settings.CA_CRT``)."""
+        paths = (Settings.SERVER_KEY, Settings.SERVER_CRT, Settings.CA_CRT)
+        with self.__lock:
+            key = self.__files_key(*paths)
+            cached = self.__cache.get("server")
+            if cached is None or cached[0] != key:
+                private_key, certificate_chain, root_certificates = self.__read(*paths)
+                creds = grpc.ssl_server_credentials(
+                    [(private_key, certificate_chain)], root_certificates=root_certificates, require_client_auth=True
+                )
+                cached = (key, creds)
+                self.__cache["server"] = cached
+            return cached[1]
+
+    def clear(self) -> None:
+        """Drop the cached credentials."""
+        with self.__lock:
+            self.__cache.clear()
+
+
+credentials_provider = CredentialsProvider()
@@ -0,0 +1,176 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Process-wide asyncio event loop for the asynchronous gRPC transport.
+
+All the asynchronous gRPC objects (servers, channels and calls) of the process live in a single event loop, run by a
+daemon thread. The loop only does I/O: blocking work (command execution, locks) is offloaded with :func:`run_blocking`
+to a process-wide :class:`LaneExecutor` (sized by ``Settings.GRPC_SERVER_CONTROL_WORKERS`` and
+``Settings.GRPC_SERVER_WORKERS``), so nodes never block each other and model transfers never starve control-plane
+messages. Periodic work of the nodes (heartbeats, gossip) is scheduled by the loop too (see :class:`PeriodicTask`), so
+the number of threads of the process does not grow with the number of nodes.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+
+from p2pfl.communication.protocols.grpc.server_lanes import CONTROL_LANE, LaneExecutor
+from p2pfl.settings import Settings
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+_executor: Optional[LaneExecutor] = None
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get the process-wide event loop, starting it on first use."""
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="grpc-aio-loop", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+def in_event_loop() -> bool:
+    """Check if the caller is running in the event loop thread."""
+    return _loop_thread is not None and threading.current_thread() is _loop_thread
+
+
+def run_coroutine(coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+    """
+    Schedule a coroutine in the event loop (thread-safe).
+
+    Args:
+        coro: Coroutine to run.
+
+    Returns:
+        A future with the result of the coroutine.
+
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """
+    Run a coroutine in the event loop and wait for its result.
+
+    Args:
+        coro: Coroutine to run.
+        timeout: Maximum time (seconds) to wait.
+
+    Raises:
+        RuntimeError: If called from the event loop thread (it would deadlock).
+
+    """
+    if in_event_loop():
+        coro.close()
+        raise RuntimeError("Cannot wait for a coroutine from the event loop thread")
+    return run_coroutine(coro).result(timeout)
+
+
+def get_executor() -> LaneExecutor:
+    """Get the process-wide executor of the blocking work, creating it on first use."""
+    global _executor
+    with _loop_lock:
+        if _executor is None:
+            _executor = LaneExecutor(Settings.GRPC_SERVER_CONTROL_WORKERS, Settings.GRPC_SERVER_WORKERS)
+        return _executor
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, lane: str = CONTROL_LANE, **kwargs: Any) -> T:
+    """
+    Run a blocking function in the executor of the blocking work (see :func:`get_executor`).
+
+    Args:
+        fn: Function to run.
+        args: Positional arguments of the function.
+        lane: Lane of the executor (``CONTROL_LANE`` or ``BULK_LANE``).
+        kwargs: Keyword arguments of the function.
+
+    """
+    return await asyncio.wrap_future(get_executor().submit_to(lane, fn, *args, **kwargs))
+
+
+class PeriodicTask:
+    """
+    Blocking function run periodically, scheduled by the event loop and run in the control-plane lane of the executor.
+
+    The function returns the time (seconds) until its next run, or None to wait for :meth:`wake`. Runs never overlap.
+
+    Args:
+        fn: Function to run.
+
+    """
+
+    def __init__(self, fn: Callable[[], Optional[float]]) -> None:
+        """Initialize the task."""
+        self.__fn = fn
+        self.__handle: Optional[asyncio.TimerHandle] = None
+        self.__running = False
+        self.__woken = False
+        self.__stopped = False
+
+    def start(self) -> None:
+        """Start running the function (thread-safe)."""
+        get_event_loop().call_soon_threadsafe(self.__schedule, 0.0)
+
+    def wake(self) -> None:
+        """Run the function as soon as possible if it is waiting for this call (thread-safe)."""
+        get_event_loop().call_soon_threadsafe(self.__wake)
+
+    def stop(self) -> None:
+        """Stop running the function (thread-safe). A run in progress is not interrupted."""
+        self.__stopped = True
+        get_event_loop().call_soon_threadsafe(self.__cancel)
+
+    def __schedule(self, delay: float) -> None:
+        if not self.__stopped and self.__handle is None:
+            self.__handle = get_event_loop().call_later(delay, self.__run)
+
+    def __wake(self) -> None:
+        if self.__running:
+            self.__woken = True
+        else:
+            self.__schedule(0.0)
+
+    def __cancel(self) -> None:
+        if self.__handle is not None:
+            self.__handle.cancel()
+            self.__handle = None
+
+    def __run(self) -> None:
+        self.__handle = None
+        self.__running = True
+        self.__woken = False
+        future = get_executor().submit_to(CONTROL_LANE, self.__fn)
+        future.add_done_callback(lambda f: get_event_loop().call_soon_threadsafe(self.__done, f))
+
+    def __done(self, future: "concurrent.futures.Future[Optional[float]]") -> None:
+        self.__running = False
+        delay = future.result()
+        if delay is not None:
+            self.__schedule(delay)
+        elif self.__woken:
+            self.__schedule(0.0)
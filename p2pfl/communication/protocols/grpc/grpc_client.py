@@ -18,40 +18,56 @@
 """GRPC client."""
 
 import random
+import time
+import uuid
 from datetime import datetime
 from os.path import isfile
 from typing import List, Optional
 
 import grpc
 
+from p2pfl.communication.protocols.broadcast import BroadcastLatency
 from p2pfl.communication.protocols.client import Client
 from p2pfl.communication.protocols.exceptions import CommunicationError, NeighborNotConnectedError
+from p2pfl.communication.protocols.grpc.channel_pool import ChannelPool
+from p2pfl.communication.protocols.grpc.credentials import credentials_provider
 from p2pfl.communication.protocols.grpc.grpc_neighbors import GrpcNeighbors
 from p2pfl.communication.protocols.grpc.proto import node_pb2, node_pb2_grpc
+from p2pfl.communication.protocols.grpc.server_lanes import is_busy, send_metadata
+from p2pfl.communication.protocols.grpc.weights_transfer import build_header, iter_chunks
 from p2pfl.management.logger import logger
 from p2pfl.settings import Settings
 
 
-class GrpcClient(Client):
+class BaseGrpcClient(Client):
     """
-    Implementation of the client side (i.e. who initiates the communication) of the GRPC communication protocol.
+    Common part of the GRPC clients: message building and pooled channels to the nodes that are not neighbors.
 
     Args:
         self_addr: Address of the node.
         neighbors: Neighbors of the node.
+        channel_pool: Pool of channels to the nodes that are not directly connected.
 
     """
 
-    def __init__(self, self_addr: str, neighbors: GrpcNeighbors) -> None:
+    def __init__(self, self_addr: str, neighbors: GrpcNeighbors, channel_pool: ChannelPool) -> None:
         """Initialize the GRPC client."""
-        self.__self_addr = self_addr
-        self.__neighbors = neighbors
+        self._self_addr = self_addr
+        self._neighbors = neighbors
+        self._channel_pool = channel_pool
+        self.broadcast_latency = BroadcastLatency(self_addr)
+
+    def close(self) -> None:
+        """Close the pooled channels."""
+        self._channel_pool.close()
 
     ####
     # Message Building
     ####
 
-    def build_message(self, cmd: str, args: Optional[List[str]] = None, round: Optional[int] = None) -> node_pb2.RootMessage:
+    def build_message(
+        self, cmd: str, args: Optional[List[str]] = None, round: Optional[int] = None, ttl: Optional[int] = None
+    ) -> node_pb2.RootMessage:
         """
         Build a RootMessage to send to the neighbors.
 
@@ -59,6 +75,7 @@ class GrpcClient(Client):
             cmd: Command of the message.
             args: Arguments of the message.
             round: Round of the message.
+            ttl: Time to live of the message (``Settings.TTL`` by default).
 
         Returns:
             RootMessage to send.
@@ -68,15 +85,17 @@ class GrpcClient(Client):
             round = -1
         if args is None:
             args = []
+        if ttl is None:
+            ttl = Settings.TTL
         hs = hash(str(cmd) + str(args) + str(datetime.now()) + str(random.randint(0, 100000)))
         args = [str(a) for a in args]
 
         return node_pb2.RootMessage(
-            source=self.__self_addr,
+            source=self._self_addr,
             round=round,
             cmd=cmd,
             message=node_pb2.Message(
-                ttl=Settings.TTL,
+                ttl=ttl,
                 hash=hs,
                 args=args,
             ),
@@ -107,7 +126,7 @@ class GrpcClient(Client):
         if contributors is None:
             contributors = []
         return node_pb2.RootMessage(
-            source=self.__self_addr,
+            source=self._self_addr,
             round=round,
             cmd=cmd,
             weights=node_pb2.Weights(
@@ -117,6 +136,48 @@ class GrpcClient(Client):
             ),
         )
 
+    def get_message_size(self, msg: node_pb2.RootMessage) -> int:
+        """
+        Get the size (bytes) of a message, used to limit the bandwidth.
+
+        Args:
+            msg: Message.
+
+        """
+        return msg.ByteSize()
+
+
+class GrpcClient(BaseGrpcClient):
+    """
+    Implementation of the client side (i.e. who initiates the communication) of the GRPC communication protocol.
+
+    Args:
+        self_addr: Address of the node.
+        neighbors: Neighbors of the node.
+
+    """
+
+    def __init__(self, self_addr: str, neighbors: GrpcNeighbors) -> None:
+        """Initialize the GRPC client."""
+        super().__init__(
+            self_addr,
+            neighbors,
+            ChannelPool(self.__create_channel, Settings.GRPC_CHANNEL_POOL_SIZE, Settings.GRPC_CHANNEL_IDLE_TIMEOUT),
+        )
+
+    @staticmethod
+    def __create_channel(addr: str) -> grpc.Channel:
+        """
+        Create a channel to a node (secure if SSL is enabled).
+
+        Args:
+            addr: Address of the node.
+
+        """
+        if Settings.USE_SSL and isfile(Settings.SERVER_CRT):
+            return grpc.secure_channel(addr, credentials_provider.get_channel_credentials())
+        return grpc.insecure_channel(addr)
+
     ####
     # Message Sending
     ####
@@ -140,35 +201,26 @@ class GrpcClient(Client):
             remove_on_error (bool): Remove neighbor if an error occurs.
 
         """
-        channel = None
+        pooled = False
         try:
             # Get neighbor
             try:
-                node_stub = self.__neighbors.get(nei)[1]
+                node_stub = self._neighbors.get(nei)[1]
             except KeyError as e:
                 raise NeighborNotConnectedError(f"Neighbor {nei} not found.") from e
 
-            # Check if direct connection
+            # Check if direct connection (otherwise, reuse a pooled channel)
             if node_stub is None and create_connection:
-                if Settings.USE_SSL and isfile(Settings.SERVER_CRT):
-                    with open(Settings.CLIENT_KEY) as key_file, open(Settings.CLIENT_CRT) as crt_file, open(Settings.CA_CRT) as ca_file:
-                        private_key = key_file.read().encode()
-                        certificate_chain = crt_file.read().encode()
-                        root_certificates = ca_file.read().encode()
-                    creds = grpc.ssl_channel_credentials(
-                        root_certificates=root_certificates,
-                        private_key=private_key,
-                        certificate_chain=certificate_chain,
-                    )
-                    channel = grpc.secure_channel(nei, creds)
-                else:
-                    channel = grpc.insecure_channel(nei)
-                node_stub = node_pb2_grpc.NodeServicesStub(channel)
+                node_stub = self._channel_pool.get_stub(nei)
+                pooled = True
 
             # Send
             if node_stub is not None:
-                # Send message
-                res = node_stub.send(msg, timeout=Settings.GRPC_TIMEOUT)
+                # Send message (large models are streamed in chunks)
+                if msg.HasField("weights") and len(msg.weights.weights) > Settings.GRPC_CHUNK_SIZE:
+                    res = self.__send_weights_chunked(node_stub, msg)
+                else:
+                    res = node_stub.send(msg, timeout=Settings.GRPC_TIMEOUT, metadata=send_metadata(self._self_addr, msg))
             else:
                 raise NeighborNotConnectedError("Neighbor not directly connected (Stub not defined and create_connection is false).")
             if res.error:
@@ -176,31 +228,90 @@ class GrpcClient(Client):
         except Exception as e:
             # Remove neighbor
             logger.info(
-                self.__self_addr,
+                self._self_addr,
                 f"Cannot send message {msg.cmd} to {nei}. Error: {str(e)}",
             )
-            if remove_on_error:
-                self.__neighbors.remove(nei, disconnect_msg=True)
+            # Do not reuse a possibly broken channel
+            if pooled and not is_busy(e):
+                self._channel_pool.remove(nei)
+            # A busy neighbor is alive, keep it
+            if remove_on_error and not is_busy(e):
+                self._neighbors.remove(nei, disconnect_msg=True)
             # Re-raise
             if raise_error:
                 raise e
 
-        finally:
-            if channel is not None:
-                channel.close()
+    def __send_weights_chunked(self, node_stub: node_pb2_grpc.NodeServicesStub, msg: node_pb2.RootMessage) -> node_pb2.ResponseMessage:
+        """
+        Send a weights message in chunks, resuming the transfer if it is interrupted.
+
+        Args:
+            node_stub: Stub of the neighbor.
+            msg: Weights message to send.
+
+        """
+        data = msg.weights.weights
+        header = build_header(msg)
+        transfer_id = uuid.uuid4().hex
+        start = 0
+        for attempt in range(Settings.GRPC_TRANSFER_RETRIES + 1):
+            try:
+                return node_stub.send_weights(
+                    iter_chunks(transfer_id, header, data, Settings.GRPC_CHUNK_SIZE, start),
+                    timeout=Settings.GRPC_TIMEOUT,
+                )
+            except grpc.RpcError as e:
+                # Neighbor without chunked transfers
+                if e.code() == grpc.StatusCode.UNIMPLEMENTED:  # type: ignore
+                    return node_stub.send(msg, timeout=Settings.GRPC_TIMEOUT, metadata=send_metadata(self._self_addr, msg))
+                # Bulk lane of the neighbor full, nothing to resume
+                if is_busy(e) or attempt == Settings.GRPC_TRANSFER_RETRIES:
+                    raise e
+                # Resume from the last received byte
+                status = node_stub.transfer_status(node_pb2.TransferStatusRequest(transfer_id=transfer_id), timeout=Settings.GRPC_TIMEOUT)
+                start = status.received
+                logger.debug(self._self_addr, f"Resuming model transfer {transfer_id} from byte {start} (attempt {attempt + 1})")
+        raise CommunicationError("Model transfer failed")
 
     def broadcast(self, msg: node_pb2.RootMessage, node_list: Optional[List[str]] = None) -> None:
         """
         Broadcast a message to all the neighbors.
 
+        The message is sent to all the neighbors at once (asynchronous calls, each one with its own deadline), so a
+        slow or dead neighbor does not delay the others. Neighbors that fail (and are not busy) are removed.
+
         Args:
             msg: Message to send.
             node_list: List of neighbors to send the message. If None, send to all the neighbors.
 
         """
         # Node list
-        nodes = node_list if node_list is not None else self.__neighbors.get_all(only_direct=True).keys()
+        nodes = node_list if node_list is not None else self._neighbors.get_all(only_direct=True).keys()
 
-        # Send
+        # Start the calls
+        start = time.monotonic()
+        calls = {}
         for n in nodes:
-            self.send(n, msg)
+            try:
+                node_stub = self._neighbors.get(n)[1]
+            except KeyError:
+                node_stub = None
+            if node_stub is None or (msg.HasField("weights") and len(msg.weights.weights) > Settings.GRPC_CHUNK_SIZE):
+                # Not directly connected or chunked model, regular send
+                self.send(n, msg)
+                continue
+            call = node_stub.send.future(msg, timeout=Settings.GRPC_TIMEOUT, metadata=send_metadata(self._self_addr, msg))
+            call.add_done_callback(lambda _: self.broadcast_latency.add(time.monotonic() - start))
+            calls[n] = call
+
+        # Collect the results
+        for n, call in calls.items():
+            try:
+                res = call.result()
+                if res.error:
+                    raise CommunicationError(f"Error while sending a message: {msg.cmd}: {res.error}")
+            except Exception as e:
+                logger.info(self._self_addr, f"Cannot send message {msg.cmd} to {n}. Error: {str(e)}")
+                if not is_busy(e):
+                    self._neighbors.remove(n, disconnect_msg=True)
+        self.broadcast_latency.report()
@@ -18,7 +18,7 @@
 """GRPC communication protocol."""
 
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, List, Mapping, Optional, Union
 
 from p2pfl.communication.commands.command import Command
 from p2pfl.communication.commands.message.heartbeat_command import HeartbeatCommand  # Need to decouple this command
@@ -70,10 +70,11 @@ class GrpcCommunicationProtocol(CommunicationProtocol):
         self._client = GrpcClient(self.addr, self._neighbors)
         # Gossip
         self._gossiper = Gossiper(self.addr, self._client)
-        # GRPC
-        self._server = GrpcServer(self.addr, self._gossiper, self._neighbors, commands)
+        self._neighbors.add_removal_callback(self._gossiper.remove_neighbor)
         # Hearbeat
         self._heartbeater = Heartbeater(self.addr, self._neighbors, self._client)
+        # GRPC
+        self._server = GrpcServer(self.addr, self._gossiper, self._neighbors, commands, self._heartbeater)
         # Commands
         self.add_command(HeartbeatCommand(self._heartbeater))
         if commands is None:
@@ -102,6 +103,7 @@ class GrpcCommunicationProtocol(CommunicationProtocol):
         self._heartbeater.stop()
         self._gossiper.stop()
         self._neighbors.clear_neighbors()
+        self._client.close()
         self._server.stop()
 
     def add_command(self, cmds: Union[Command, List[Command]]) -> None:
@@ -205,10 +207,12 @@ class GrpcCommunicationProtocol(CommunicationProtocol):
             node_list: Optional node list.
 
         """
+        if node_list is None:
+            self._heartbeater.notify_sent()
         self._client.broadcast(msg, node_list)
 
     @running
-    def get_neighbors(self, only_direct: bool = False) -> Dict[str, Any]:
+    def get_neighbors(self, only_direct: bool = False) -> Mapping[str, Any]:
         """
         Get the neighbors.
 
@@ -218,6 +222,16 @@ class GrpcCommunicationProtocol(CommunicationProtocol):
         """
         return self._neighbors.get_all(only_direct)
 
+    def get_neighbor_encodings(self, nei: str) -> List[str]:
+        """
+        Get the model encodings advertised by a neighbor in the handshake.
+
+        Args:
+            nei: The neighbor.
+
+        """
+        return self._neighbors.get_encodings(nei)
+
     @running
     def wait_for_termination(self) -> None:
         """
@@ -238,6 +252,7 @@ class GrpcCommunicationProtocol(CommunicationProtocol):
         model_fn: Callable[[str], Any],
         period: Optional[float] = None,
         create_connection: bool = False,
+        gap_fn: Optional[Callable[[str], int]] = None,
     ) -> None:
         """
         Gossip model weights.
@@ -249,6 +264,7 @@ class GrpcCommunicationProtocol(CommunicationProtocol):
             model_fn: The model function.
             period: The period.
             create_connection: The create connection flag.
+            gap_fn: The function to get the contributors a neighbor would get from the model.
 
         """
         if period is None:
@@ -260,4 +276,5 @@ class GrpcCommunicationProtocol(CommunicationProtocol):
             model_fn,
             period,
             create_connection,
+            gap_fn,
         )
@@ -23,8 +23,10 @@ from typing import Optional, Tuple
 
 import grpc
 
+from p2pfl.communication.protocols.grpc.credentials import credentials_provider
 from p2pfl.communication.protocols.grpc.proto import node_pb2, node_pb2_grpc
 from p2pfl.communication.protocols.neighbors import Neighbors
+from p2pfl.learning.frameworks.model_encoding import SUPPORTED_ENCODINGS
 from p2pfl.management.logger import logger
 from p2pfl.settings import Settings
 
@@ -41,18 +43,8 @@ class GrpcNeighbors(Neighbors):
             time: Time of the last heartbeat.
 
         """
-        # Update if exists
-        if addr in self.neis:
-            # Update time
-            self.neis_lock.acquire()
-            self.neis[addr] = (
-                self.neis[addr][0],
-                self.neis[addr][1],
-                time,
-            )
-            self.neis_lock.release()
-        else:
-            # Add
+        # Update if exists, add otherwise
+        if not self.refresh(addr, time):
             self.add(addr, non_direct=True)
 
     def connect(
@@ -85,14 +77,7 @@ class GrpcNeighbors(Neighbors):
         try:
             # Create channel and stub
             if Settings.USE_SSL and isfile(Settings.SERVER_CRT):
-                with open(Settings.CLIENT_KEY) as key_file, open(Settings.CLIENT_CRT) as crt_file, open(Settings.CA_CRT) as ca_file:
-                    private_key = key_file.read().encode()
-                    certificate_chain = crt_file.read().encode()
-                    root_certificates = ca_file.read().encode()
-                creds = grpc.ssl_channel_credentials(
-                    root_certificates=root_certificates, private_key=private_key, certificate_chain=certificate_chain
-                )
-                channel = grpc.secure_channel(addr, creds)
+                channel = grpc.secure_channel(addr, credentials_provider.get_channel_credentials())
             else:
                 channel = grpc.insecure_channel(addr)
             stub = node_pb2_grpc.NodeServicesStub(channel)
@@ -103,13 +88,14 @@ class GrpcNeighbors(Neighbors):
             # Handshake
             if handshake_msg:
                 res = stub.handshake(
-                    node_pb2.HandShakeRequest(addr=self.self_addr),
+                    node_pb2.HandShakeRequest(addr=self.self_addr, encodings=SUPPORTED_ENCODINGS),
                     timeout=Settings.GRPC_TIMEOUT,
                 )
                 if res.error:
                     logger.info(self.self_addr, f"Cannot add a neighbor: {res.error}")
                     channel.close()
                     raise Exception(f"Cannot add a neighbor: {res.error}")
+                self._set_encodings(addr, list(res.encodings))
 
             # Add neighbor
             return (channel, stub, time.time())
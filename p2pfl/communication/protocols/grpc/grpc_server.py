@@ -20,19 +20,69 @@
 import traceback
 from concurrent import futures
 from os.path import isfile
-from typing import List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Union
 
 import google.protobuf.empty_pb2
 import grpc
 
 from p2pfl.communication.commands.command import Command
 from p2pfl.communication.protocols.gossiper import Gossiper
+from p2pfl.communication.protocols.grpc.credentials import credentials_provider
 from p2pfl.communication.protocols.grpc.grpc_neighbors import GrpcNeighbors
 from p2pfl.communication.protocols.grpc.proto import node_pb2, node_pb2_grpc
+from p2pfl.communication.protocols.grpc.server_lanes import LaneInterceptor, get_sender, server_workers
+from p2pfl.communication.protocols.grpc.weights_transfer import TransferError, WeightsReassembler
+from p2pfl.communication.protocols.heartbeater import Heartbeater, heartbeater_cmd_name
+from p2pfl.learning.frameworks.model_encoding import SUPPORTED_ENCODINGS
 from p2pfl.management.logger import logger
 from p2pfl.settings import Settings
 
 
+def execute_message(
+    addr: str, commands: Dict[str, Command], request: node_pb2.RootMessage, weights: Optional[Union[bytes, bytearray]] = None
+) -> Optional[str]:
+    """
+    Execute the command of a message.
+
+    Args:
+        addr: Address of the node.
+        commands: Commands of the node, by name.
+        request: The RootMessage to execute.
+        weights: Serialized model (overrides the one in the request, used by chunked transfers).
+
+    Returns:
+        The error text if the command fails, None otherwise.
+
+    """
+    if request.cmd != "beat" or not Settings.EXCLUDE_BEAT_LOGS:
+        logger.debug(addr, lambda: f"{request.cmd.upper()} received from {request.source}")
+    if request.cmd in commands:
+        try:
+            if request.HasField("message"):
+                commands[request.cmd].execute(request.source, request.round, *request.message.args)
+            elif request.HasField("weights"):
+                commands[request.cmd].execute(
+                    request.source,
+                    request.round,
+                    weights=weights if weights is not None else request.weights.weights,
+                    contributors=request.weights.contributors,
+                    num_samples=request.weights.num_samples,
+                )
+            else:
+                error_text = f"Error while processing command: {request.cmd}: No message or weights"
+                logger.error(addr, error_text)
+                return error_text
+        except Exception as e:
+            error_text = f"Error while processing command: {request.cmd}. {type(e).__name__}: {e}"
+            logger.error(addr, error_text + f"\n{traceback.format_exc()}")
+            return error_text
+    else:
+        # disconnect node
+        logger.error(addr, f"Unknown command: {request.cmd} from {request.source}")
+        return f"Unknown command: {request.cmd}"
+    return None
+
+
 class GrpcServer(node_pb2_grpc.NodeServicesServicer):
     """
     Implementation of the server side of a GRPC communication protocol.
@@ -42,6 +92,7 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
         gossiper: Gossiper instance.
         neighbors: Neighbors instance.
         commands: List of commands to be executed by the server.
+        heartbeater: Heartbeater notified of the received messages (proof of life of their sources).
 
     """
 
@@ -51,6 +102,7 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
         gossiper: Gossiper,
         neighbors: GrpcNeighbors,
         commands: Optional[List[Command]] = None,
+        heartbeater: Optional[Heartbeater] = None,
     ) -> None:
         """Initialize the GRPC server."""
         # Message handlers
@@ -63,8 +115,12 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
 
         # Server
         maxMsgLength = 1024 * 1024 * 1024
+        workers = server_workers(Settings.GRPC_SERVER_CONTROL_WORKERS, Settings.GRPC_SERVER_WORKERS)
+        self.__pool = futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grpc-server")
         self.__server = grpc.server(
-            futures.ThreadPoolExecutor(max_workers=2),
+            self.__pool,
+            interceptors=[LaneInterceptor(Settings.GRPC_SERVER_WORKERS)],
+            maximum_concurrent_rpcs=workers,
             options=[
                 ("grpc.max_send_message_length", maxMsgLength),
                 ("grpc.max_receive_message_length", maxMsgLength),
@@ -72,12 +128,18 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
         )
         self.__server_started = False
 
+        # Chunked model transfers
+        self.__reassembler = WeightsReassembler(Settings.GRPC_TRANSFER_TIMEOUT)
+
         # Gossiper
         self.__gossiper = gossiper
 
         # Neighbors
         self.__neighbors = neighbors
 
+        # Heartbeater
+        self.__heartbeater = heartbeater
+
     ####
     # Management
     ####
@@ -94,14 +156,7 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
         node_pb2_grpc.add_NodeServicesServicer_to_server(self, self.__server)
         try:
             if Settings.USE_SSL and isfile(Settings.SERVER_KEY) and isfile(Settings.SERVER_CRT):
-                with open(Settings.SERVER_KEY) as key_file, open(Settings.SERVER_CRT) as crt_file, open(Settings.CA_CRT) as ca_file:
-                    private_key = key_file.read().encode()
-                    certificate_chain = crt_file.read().encode()
-                    root_certificates = ca_file.read().encode()
-                server_credentials = grpc.ssl_server_credentials(
-                    [(private_key, certificate_chain)], root_certificates=root_certificates, require_client_auth=True
-                )
-                self.__server.add_secure_port(self.addr, server_credentials)
+                self.__server.add_secure_port(self.addr, credentials_provider.get_server_credentials())
             else:
                 self.__server.add_insecure_port(self.addr)
         except Exception as e:
@@ -112,6 +167,7 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
     def stop(self) -> None:
         """Stop the GRPC server."""
         self.__server.stop(0)
+        self.__pool.shutdown(wait=False)
         self.__server_started = False
 
     def wait_for_termination(self) -> None:
@@ -142,7 +198,8 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
 
         """
         if self.__neighbors.add(request.addr, non_direct=False, handshake_msg=False):
-            return node_pb2.ResponseMessage()
+            self.__neighbors.set_encodings(request.addr, list(request.encodings))
+            return node_pb2.ResponseMessage(encodings=SUPPORTED_ENCODINGS)
         else:
             return node_pb2.ResponseMessage(error="Cannot add the node (duplicated or wrong direction)")
 
@@ -158,15 +215,18 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
         self.__neighbors.remove(request.addr, disconnect_msg=False)
         return google.protobuf.empty_pb2.Empty()
 
-    def send(self, request: node_pb2.RootMessage, _: grpc.ServicerContext) -> node_pb2.ResponseMessage:
+    def send(self, request: node_pb2.RootMessage, context: grpc.ServicerContext) -> node_pb2.ResponseMessage:
         """
         GRPC service. Handles both regular messages and model weights.
 
         Args:
             request: The RootMessage containing either a Message or Weights payload.
-            _: Context.
+            context: Context.
 
         """
+        # Proof of life of the neighbor that sent the message (models are never relayed)
+        self.__notify_received(request.source if request.HasField("weights") else get_sender(context), request.cmd)
+
         # If message already proce
         # ssed, return
         if request.HasField("message") and not self.__gossiper.check_and_set_processed(request.message.hash):
@@ -177,45 +237,75 @@ class GrpcServer(node_pb2_grpc.NodeServicesServicer):
             return node_pb2.ResponseMessage()
 
         # Process message/model
-        if request.cmd != "beat" or (not Settings.EXCLUDE_BEAT_LOGS and request.cmd == "beat"):
-            logger.debug(
-                self.addr,
-                f"{request.cmd.upper()} received from {request.source}",
-            )
-        if request.cmd in self.__commands:
-            try:
-                if request.HasField("message"):
-                    self.__commands[request.cmd].execute(request.source, request.round, *request.message.args)
-                elif request.HasField("weights"):
-                    self.__commands[request.cmd].execute(
-                        request.source,
-                        request.round,
-                        weights=request.weights.weights,
-                        contributors=request.weights.contributors,
-                        num_samples=request.weights.num_samples,
-                    )
-                else:
-                    error_text = f"Error while processing command: {request.cmd}: No message or weights"
-                    logger.error(self.addr, error_text)
-                    return node_pb2.ResponseMessage(error=error_text)
-            except Exception as e:
-                error_text = f"Error while processing command: {request.cmd}. {type(e).__name__}: {e}"
-                logger.error(self.addr, error_text + f"\n{traceback.format_exc()}")
-                return node_pb2.ResponseMessage(error=error_text)
-        else:
-            # disconnect node
-            logger.error(self.addr, f"Unknown command: {request.cmd} from {request.source}")
-            return node_pb2.ResponseMessage(error=f"Unknown command: {request.cmd}")
+        error = execute_message(self.addr, self.__commands, request)
+        if error is not None:
+            return node_pb2.ResponseMessage(error=error)
 
         # If message gossip
         if request.HasField("message") and request.message.ttl > 0:
             # Update ttl and gossip
             request.message.ttl -= 1
             pending_neis = [n for n in self.__neighbors.get_all(only_direct=True) if n != request.source]
-            self.__gossiper.add_message(request, pending_neis)
+            self.__gossiper.add_message(request, pending_neis, request.cmd, request.source)
 
         return node_pb2.ResponseMessage()
 
+    def send_weights(self, request_iterator: Iterator[node_pb2.WeightsChunk], _: grpc.ServicerContext) -> node_pb2.ResponseMessage:
+        """
+        GRPC service. Receives a model split in chunks and executes its command once the transfer is complete.
+
+        Args:
+            request_iterator: Chunks of the transfer.
+            _: Context.
+
+        """
+        for chunk in request_iterator:
+            response = self.receive_chunk(chunk)
+            if response is not None:
+                return response
+        return node_pb2.ResponseMessage(error="Incomplete model transfer")
+
+    def receive_chunk(self, chunk: node_pb2.WeightsChunk) -> Optional[node_pb2.ResponseMessage]:
+        """
+        Add a chunk to its model transfer and execute the command once the transfer is complete.
+
+        Args:
+            chunk: Received chunk.
+
+        Returns:
+            The response if the transfer is complete or has failed, None if more chunks are expected.
+
+        """
+        try:
+            completed = self.__reassembler.add_chunk(chunk)
+        except TransferError as e:
+            logger.debug(self.addr, f"Error in model transfer: {e}")
+            return node_pb2.ResponseMessage(error=str(e))
+        if completed is None:
+            return None
+        header, weights = completed
+        self.__notify_received(header.source, header.cmd)
+        error = execute_message(self.addr, self.__commands, header, weights)
+        if error is not None:
+            return node_pb2.ResponseMessage(error=error)
+        return node_pb2.ResponseMessage()
+
+    def transfer_status(self, request: node_pb2.TransferStatusRequest, _: grpc.ServicerContext) -> node_pb2.TransferStatus:
+        """
+        GRPC service. Returns the number of bytes received for a model transfer (used to resume it).
+
+        Args:
+            request: Request message.
+            _: Context.
+
+        """
+        return node_pb2.TransferStatus(received=self.__reassembler.received(request.transfer_id))
+
+    def __notify_received(self, sender: Optional[str], cmd: str) -> None:
+        # Any message is a proof of life of the neighbor that sent it (heartbeats are handled by their command)
+        if self.__heartbeater is not None and sender is not None and cmd != heartbeater_cmd_name:
+            self.__heartbeater.notify_received(sender)
+
     ####
     # Commands
     ####
@@ -15,7 +15,7 @@ _sym_db = _symbol_database.Default()
 from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nnode.proto\x12\x04node\x1a\x1bgoogle/protobuf/empty.proto\"\x9c\x01\n\x0bRootMessage\x12\x0e\n\x06source\x18\x01 \x01(\t\x12\x12\n\x05round\x18\x02 \x01(\x05H\x01\x88\x01\x01\x12\x0b\n\x03\x63md\x18\x03 \x01(\t\x12 \n\x07message\x18\x04 \x01(\x0b\x32\r.node.MessageH\x00\x12 \n\x07weights\x18\x05 \x01(\x0b\x32\r.node.WeightsH\x00\x42\x0e\n\x0cpayload_typeB\x08\n\x06_round\"2\n\x07Message\x12\x0b\n\x03ttl\x18\x01 \x01(\x05\x12\x0c\n\x04hash\x18\x02 \x01(\x03\x12\x0c\n\x04\x61rgs\x18\x03 \x03(\t\"E\n\x07Weights\x12\x0f\n\x07weights\x18\x01 \x01(\x0c\x12\x14\n\x0c\x63ontributors\x18\x02 \x03(\t\x12\x13\n\x0bnum_samples\x18\x03 \x01(\x05\" \n\x10HandShakeRequest\x12\x0c\n\x04\x61\x64\x64r\x18\x01 \x01(\t\"/\n\x0fResponseMessage\x12\x12\n\x05\x65rror\x18\x01 \x01(\tH\x00\x88\x01\x01\x42\x08\n\x06_error2\xba\x01\n\x0cNodeServices\x12:\n\thandshake\x12\x16.node.HandShakeRequest\x1a\x15.node.ResponseMessage\x12<\n\ndisconnect\x12\x16.node.HandShakeRequest\x1a\x16.google.protobuf.Empty\x12\x30\n\x04send\x12\x11.node.RootMessage\x1a\x15.node.ResponseMessageb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nnode.proto\x12\x04node\x1a\x1bgoogle/protobuf/empty.proto\"\x9c\x01\n\x0bRootMessage\x12\x0e\n\x06source\x18\x01 \x01(\t\x12\x12\n\x05round\x18\x02 \x01(\x05H\x01\x88\x01\x01\x12\x0b\n\x03\x63md\x18\x03 \x01(\t\x12 \n\x07message\x18\x04 \x01(\x0b\x32\r.node.MessageH\x00\x12 \n\x07weights\x18\x05 \x01(\x0b\x32\r.node.WeightsH\x00\x42\x0e\n\x0cpayload_typeB\x08\n\x06_round\"2\n\x07Message\x12\x0b\n\x03ttl\x18\x01 \x01(\x05\x12\x0c\n\x04hash\x18\x02 \x01(\x03\x12\x0c\n\x04\x61rgs\x18\x03 \x03(\t\"E\n\x07Weights\x12\x0f\n\x07weights\x18\x01 \x01(\x0c\x12\x14\n\x0c\x63ontributors\x18\x02 \x03(\t\x12\x13\n\x0bnum_samples\x18\x03 \x01(\x05\"3\n\x10HandShakeRequest\x12\x0c\n\x04\x61\x64\x64r\x18\x01 \x01(\t\x12\x11\n\tencodings\x18\x02 \x03(\t\"B\n\x0fResponseMessage\x12\x12\n\x05\x65rror\x18\x01 \x01(\tH\x00\x88\x01\x01\x12\x11\n\tencodings\x18\x02 \x03(\tB\x08\n\x06_error\"\x8a\x01\n\x0cWeightsChunk\x12\x13\n\x0btransfer_id\x18\x01 \x01(\t\x12\x0e\n\x06offset\x18\x02 \x01(\x04\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\x12\x10\n\x08\x63hecksum\x18\x04 \x01(\r\x12\x12\n\ntotal_size\x18\x05 \x01(\x04\x12!\n\x06header\x18\x06 \x01(\x0b\x32\x11.node.RootMessage\",\n\x15TransferStatusRequest\x12\x13\n\x0btransfer_id\x18\x01 \x01(\t\"\"\n\x0eTransferStatus\x12\x10\n\x08received\x18\x01 \x01(\x04\x32\xbd\x02\n\x0cNodeServices\x12:\n\thandshake\x12\x16.node.HandShakeRequest\x1a\x15.node.ResponseMessage\x12<\n\ndisconnect\x12\x16.node.HandShakeRequest\x1a\x16.google.protobuf.Empty\x12\x30\n\x04send\x12\x11.node.RootMessage\x1a\x15.node.ResponseMessage\x12;\n\x0csend_weights\x12\x12.node.WeightsChunk\x1a\x15.node.ResponseMessage(\x01\x12\x44\n\x0ftransfer_status\x12\x1b.node.TransferStatusRequest\x1a\x14.node.TransferStatusb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -29,9 +29,15 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _globals['_WEIGHTS']._serialized_start=260
   _globals['_WEIGHTS']._serialized_end=329
   _globals['_HANDSHAKEREQUEST']._serialized_start=331
-  _globals['_HANDSHAKEREQUEST']._serialized_end=363
-  _globals['_RESPONSEMESSAGE']._serialized_start=365
-  _globals['_RESPONSEMESSAGE']._serialized_end=412
-  _globals['_NODESERVICES']._serialized_start=415
-  _globals['_NODESERVICES']._serialized_end=601
+  _globals['_HANDSHAKEREQUEST']._serialized_end=382
+  _globals['_RESPONSEMESSAGE']._serialized_start=384
+  _globals['_RESPONSEMESSAGE']._serialized_end=450
+  _globals['_WEIGHTSCHUNK']._serialized_start=453
+  _globals['_WEIGHTSCHUNK']._serialized_end=591
+  _globals['_TRANSFERSTATUSREQUEST']._serialized_start=593
+  _globals['_TRANSFERSTATUSREQUEST']._serialized_end=637
+  _globals['_TRANSFERSTATUS']._serialized_start=639
+  _globals['_TRANSFERSTATUS']._serialized_end=673
+  _globals['_NODESERVICES']._serialized_start=676
+  _globals['_NODESERVICES']._serialized_end=993
 # @@protoc_insertion_point(module_scope)
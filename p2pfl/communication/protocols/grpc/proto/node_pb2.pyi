@@ -97,13 +97,17 @@ class HandShakeRequest(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
 
     ADDR_FIELD_NUMBER: builtins.int
+    ENCODINGS_FIELD_NUMBER: builtins.int
     addr: builtins.str
+    @property
+    def encodings(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.str]: ...
     def __init__(
         self,
         *,
         addr: builtins.str = ...,
+        encodings: collections.abc.Iterable[builtins.str] | None = ...,
     ) -> None: ...
-    def ClearField(self, field_name: typing.Literal["addr", b"addr"]) -> None: ...
+    def ClearField(self, field_name: typing.Literal["addr", b"addr", "encodings", b"encodings"]) -> None: ...
 
 global___HandShakeRequest = HandShakeRequest
 
@@ -112,14 +116,80 @@ class ResponseMessage(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
 
     ERROR_FIELD_NUMBER: builtins.int
+    ENCODINGS_FIELD_NUMBER: builtins.int
     error: builtins.str
+    @property
+    def encodings(self) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[builtins.str]: ...
     def __init__(
         self,
         *,
         error: builtins.str | None = ...,
+        encodings: collections.abc.Iterable[builtins.str] | None = ...,
     ) -> None: ...
     def HasField(self, field_name: typing.Literal["_error", b"_error", "error", b"error"]) -> builtins.bool: ...
-    def ClearField(self, field_name: typing.Literal["_error", b"_error", "error", b"error"]) -> None: ...
+    def ClearField(self, field_name: typing.Literal["_error", b"_error", "encodings", b"encodings", "error", b"error"]) -> None: ...
     def WhichOneof(self, oneof_group: typing.Literal["_error", b"_error"]) -> typing.Literal["error"] | None: ...
 
 global___ResponseMessage = ResponseMessage
+
+@typing.final
+class WeightsChunk(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    TRANSFER_ID_FIELD_NUMBER: builtins.int
+    OFFSET_FIELD_NUMBER: builtins.int
+    DATA_FIELD_NUMBER: builtins.int
+    CHECKSUM_FIELD_NUMBER: builtins.int
+    TOTAL_SIZE_FIELD_NUMBER: builtins.int
+    HEADER_FIELD_NUMBER: builtins.int
+    transfer_id: builtins.str
+    offset: builtins.int
+    data: builtins.bytes
+    checksum: builtins.int
+    total_size: builtins.int
+    @property
+    def header(self) -> global___RootMessage: ...
+    def __init__(
+        self,
+        *,
+        transfer_id: builtins.str = ...,
+        offset: builtins.int = ...,
+        data: builtins.bytes = ...,
+        checksum: builtins.int = ...,
+        total_size: builtins.int = ...,
+        header: global___RootMessage | None = ...,
+    ) -> None: ...
+    def HasField(self, field_name: typing.Literal["header", b"header"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing.Literal["checksum", b"checksum", "data", b"data", "header", b"header", "offset", b"offset", "total_size", b"total_size", "transfer_id", b"transfer_id"]) -> None: ...
+
+global___WeightsChunk = WeightsChunk
+
+@typing.final
+class TransferStatusRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    TRANSFER_ID_FIELD_NUMBER: builtins.int
+    transfer_id: builtins.str
+    def __init__(
+        self,
+        *,
+        transfer_id: builtins.str = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["transfer_id", b"transfer_id"]) -> None: ...
+
+global___TransferStatusRequest = TransferStatusRequest
+
+@typing.final
+class TransferStatus(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    RECEIVED_FIELD_NUMBER: builtins.int
+    received: builtins.int
+    def __init__(
+        self,
+        *,
+        received: builtins.int = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["received", b"received"]) -> None: ...
+
+global___TransferStatus = TransferStatus
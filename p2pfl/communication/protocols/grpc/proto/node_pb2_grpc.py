@@ -30,6 +30,16 @@ class NodeServicesStub(object):
                 request_serializer=node__pb2.RootMessage.SerializeToString,
                 response_deserializer=node__pb2.ResponseMessage.FromString,
                 )
+        self.send_weights = channel.stream_unary(
+                '/node.NodeServices/send_weights',
+                request_serializer=node__pb2.WeightsChunk.SerializeToString,
+                response_deserializer=node__pb2.ResponseMessage.FromString,
+                )
+        self.transfer_status = channel.unary_unary(
+                '/node.NodeServices/transfer_status',
+                request_serializer=node__pb2.TransferStatusRequest.SerializeToString,
+                response_deserializer=node__pb2.TransferStatus.FromString,
+                )
 
 
 class NodeServicesServicer(object):
@@ -53,6 +63,18 @@ class NodeServicesServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def send_weights(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def transfer_status(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_NodeServicesServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -71,6 +93,16 @@ def add_NodeServicesServicer_to_server(servicer, server):
                     request_deserializer=node__pb2.RootMessage.FromString,
                     response_serializer=node__pb2.ResponseMessage.SerializeToString,
             ),
+            'send_weights': grpc.stream_unary_rpc_method_handler(
+                    servicer.send_weights,
+                    request_deserializer=node__pb2.WeightsChunk.FromString,
+                    response_serializer=node__pb2.ResponseMessage.SerializeToString,
+            ),
+            'transfer_status': grpc.unary_unary_rpc_method_handler(
+                    servicer.transfer_status,
+                    request_deserializer=node__pb2.TransferStatusRequest.FromString,
+                    response_serializer=node__pb2.TransferStatus.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'node.NodeServices', rpc_method_handlers)
@@ -131,3 +163,37 @@ class NodeServices(object):
             node__pb2.ResponseMessage.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def send_weights(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/node.NodeServices/send_weights',
+            node__pb2.WeightsChunk.SerializeToString,
+            node__pb2.ResponseMessage.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def transfer_status(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/node.NodeServices/transfer_status',
+            node__pb2.TransferStatusRequest.SerializeToString,
+            node__pb2.TransferStatus.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -37,6 +37,16 @@ class NodeServicesStub:
         node_pb2.ResponseMessage,
     ]
 
+    send_weights: grpc.StreamUnaryMultiCallable[
+        node_pb2.WeightsChunk,
+        node_pb2.ResponseMessage,
+    ]
+
+    transfer_status: grpc.UnaryUnaryMultiCallable[
+        node_pb2.TransferStatusRequest,
+        node_pb2.TransferStatus,
+    ]
+
 class NodeServicesAsyncStub:
     handshake: grpc.aio.UnaryUnaryMultiCallable[
         node_pb2.HandShakeRequest,
@@ -53,6 +63,16 @@ class NodeServicesAsyncStub:
         node_pb2.ResponseMessage,
     ]
 
+    send_weights: grpc.aio.StreamUnaryMultiCallable[
+        node_pb2.WeightsChunk,
+        node_pb2.ResponseMessage,
+    ]
+
+    transfer_status: grpc.aio.UnaryUnaryMultiCallable[
+        node_pb2.TransferStatusRequest,
+        node_pb2.TransferStatus,
+    ]
+
 class NodeServicesServicer(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def handshake(
@@ -75,4 +95,18 @@ class NodeServicesServicer(metaclass=abc.ABCMeta):
         context: _ServicerContext,
     ) -> typing.Union[node_pb2.ResponseMessage, collections.abc.Awaitable[node_pb2.ResponseMessage]]: ...
 
+    @abc.abstractmethod
+    def send_weights(
+        self,
+        request_iterator: _MaybeAsyncIterator[node_pb2.WeightsChunk],
+        context: _ServicerContext,
+    ) -> typing.Union[node_pb2.ResponseMessage, collections.abc.Awaitable[node_pb2.ResponseMessage]]: ...
+
+    @abc.abstractmethod
+    def transfer_status(
+        self,
+        request: node_pb2.TransferStatusRequest,
+        context: _ServicerContext,
+    ) -> typing.Union[node_pb2.TransferStatus, collections.abc.Awaitable[node_pb2.TransferStatus]]: ...
+
 def add_NodeServicesServicer_to_server(servicer: NodeServicesServicer, server: typing.Union[grpc.Server, grpc.aio.Server]) -> None: ...
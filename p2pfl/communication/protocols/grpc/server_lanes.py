@@ -0,0 +1,231 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Priority lanes for the GRPC servers.
+
+Bulk RPCs (model transfers) and control-plane RPCs (heartbeats, votes, handshakes...) are bounded separately, so
+control-plane commands are never starved by large transfers. Senders tag bulk ``send`` calls with
+:data:`BULK_METADATA`; ``send_weights`` streams are always bulk.
+
+The synchronous server runs each call in a single thread of its pool (one per lane slot, see
+:func:`server_workers`) and limits its concurrent RPCs to the same number, so gRPC rejects the calls it can not run
+instead of queueing them behind the running ones. :class:`LaneInterceptor` rejects the bulk calls beyond the size of
+the bulk lane, so model transfers never take the threads left for the control plane. Rejected calls fail with
+:data:`BUSY_CODE`: the sender keeps the neighbor (see :func:`is_busy`) and retries later.
+
+The asynchronous server offloads the blocking work of each call to the pool of its lane of a :class:`LaneExecutor`.
+
+``send`` calls also carry the address of the node that sends them (:data:`SENDER_METADATA_KEY`), which is not the
+source of the message when it is relayed by the gossip protocol.
+"""
+
+import threading
+from concurrent import futures
+from typing import Any, Callable, Optional, Tuple
+
+import grpc
+
+from p2pfl.communication.protocols.grpc.proto import node_pb2
+
+LANE_METADATA_KEY = "p2pfl-lane"
+BULK_LANE = "bulk"
+CONTROL_LANE = "control"
+BULK_METADATA: Tuple[Tuple[str, str], ...] = ((LANE_METADATA_KEY, BULK_LANE),)
+SENDER_METADATA_KEY = "p2pfl-sender"
+BUSY_CODE = grpc.StatusCode.RESOURCE_EXHAUSTED
+
+
+def lane_metadata(msg: node_pb2.RootMessage) -> Optional[Tuple[Tuple[str, str], ...]]:
+    """
+    Get the metadata to send a message in its lane.
+
+    Args:
+        msg: Message to send.
+
+    """
+    return BULK_METADATA if msg.HasField("weights") else None
+
+
+def send_metadata(sender: str, msg: node_pb2.RootMessage) -> Tuple[Tuple[str, str], ...]:
+    """
+    Get the metadata of a ``send`` call: the address of the sender and the lane of the message.
+
+    Args:
+        sender: Address of the node that sends the message.
+        msg: Message to send.
+
+    """
+    return ((SENDER_METADATA_KEY, sender),) + (lane_metadata(msg) or ())
+
+
+def get_sender(context: Any) -> Optional[str]:
+    """
+    Get the address of the node that sent a ``send`` call (None if the call does not carry it).
+
+    Args:
+        context: Context of the call.
+
+    """
+    return dict(context.invocation_metadata() or ()).get(SENDER_METADATA_KEY)
+
+
+def is_busy(error: BaseException) -> bool:
+    """
+    Check if a call failed because the lane of the neighbor was full (the neighbor is alive, the call can be retried).
+
+    Args:
+        error: Error raised by the call.
+
+    """
+    return isinstance(error, grpc.RpcError) and error.code() == BUSY_CODE  # type: ignore
+
+
+def is_bulk_call(method: str, metadata: Any) -> bool:
+    """
+    Check if an incoming call belongs to the bulk lane.
+
+    Args:
+        method: Full name of the called method.
+        metadata: Invocation metadata of the call.
+
+    """
+    return method.endswith("/send_weights") or dict(metadata or ()).get(LANE_METADATA_KEY) == BULK_LANE
+
+
+class LaneExecutor(futures.Executor):
+    """
+    Executor with a control-plane lane and a bulk lane, each one backed by its own thread pool.
+
+    Pools start without threads and grow with the load up to their maximum size. ``submit`` runs tasks in the
+    control-plane lane, use ``submit_to`` to choose the lane.
+
+    Args:
+        control_workers: Maximum threads of the control-plane lane.
+        bulk_workers: Maximum threads of the bulk lane.
+
+    """
+
+    def __init__(self, control_workers: int, bulk_workers: int) -> None:
+        """Initialize the executor."""
+        self.__control = futures.ThreadPoolExecutor(max_workers=control_workers, thread_name_prefix="grpc-control")
+        self.__bulk = futures.ThreadPoolExecutor(max_workers=bulk_workers, thread_name_prefix="grpc-bulk")
+
+    def submit_to(self, lane: str, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> futures.Future:
+        """
+        Submit a task to a lane.
+
+        Args:
+            lane: Lane (``CONTROL_LANE`` or ``BULK_LANE``).
+            fn: Function to execute.
+            args: Positional arguments.
+            kwargs: Keyword arguments.
+
+        """
+        pool = self.__bulk if lane == BULK_LANE else self.__control
+        return pool.submit(fn, *args, **kwargs)
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> futures.Future:
+        """
+        Submit a task to the control-plane lane.
+
+        Args:
+            fn: Function to execute.
+            args: Positional arguments.
+            kwargs: Keyword arguments.
+
+        """
+        return self.submit_to(CONTROL_LANE, fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """
+        Shutdown both lanes.
+
+        Args:
+            wait: Wait for the running tasks.
+            cancel_futures: Cancel the pending tasks.
+
+        """
+        self.__control.shutdown(wait=wait, cancel_futures=cancel_futures)
+        self.__bulk.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+class LaneInterceptor(grpc.ServerInterceptor):
+    """
+    Server interceptor that bounds the concurrent calls of the bulk lane.
+
+    Bulk calls beyond ``bulk_workers`` are rejected with :data:`BUSY_CODE` before running, so they never hold more
+    threads of the server than the bulk lane has. Control-plane calls run unchanged.
+
+    Args:
+        bulk_workers: Maximum concurrent calls of the bulk lane.
+
+    """
+
+    def __init__(self, bulk_workers: int) -> None:
+        """Initialize the interceptor."""
+        self.__bulk_slots = threading.BoundedSemaphore(bulk_workers)
+
+    def intercept_service(
+        self,
+        continuation: Callable[[grpc.HandlerCallDetails], Optional[grpc.RpcMethodHandler]],
+        handler_call_details: grpc.HandlerCallDetails,
+    ) -> Optional[grpc.RpcMethodHandler]:
+        """
+        Wrap the method handler of a bulk call to bound the calls of its lane.
+
+        Args:
+            continuation: Next step of the interceptor chain.
+            handler_call_details: Details of the call.
+
+        """
+        handler = continuation(handler_call_details)
+        if handler is None or not is_bulk_call(handler_call_details.method, handler_call_details.invocation_metadata):  # type: ignore
+            return handler
+        if handler.unary_unary is not None:
+            return grpc.unary_unary_rpc_method_handler(
+                self.__in_bulk_lane(handler.unary_unary), handler.request_deserializer, handler.response_serializer
+            )
+        if handler.stream_unary is not None:
+            return grpc.stream_unary_rpc_method_handler(
+                self.__in_bulk_lane(handler.stream_unary), handler.request_deserializer, handler.response_serializer
+            )
+        # Streaming responses are not used by the services
+        return handler
+
+    def __in_bulk_lane(self, behavior: Callable[[Any, grpc.ServicerContext], Any]) -> Callable[[Any, grpc.ServicerContext], Any]:
+        def run(request: Any, context: grpc.ServicerContext) -> Any:
+            if not self.__bulk_slots.acquire(blocking=False):
+                context.abort(BUSY_CODE, "Bulk lane full")
+            try:
+                return behavior(request, context)
+            finally:
+                self.__bulk_slots.release()
+
+        return run
+
+
+def server_workers(control_workers: int, bulk_workers: int) -> int:
+    """
+    Get the size of the thread pool (and the maximum concurrent RPCs) of a server using :class:`LaneInterceptor`.
+
+    Args:
+        control_workers: Threads left for the control-plane calls.
+        bulk_workers: Maximum concurrent calls of the bulk lane.
+
+    """
+    return control_workers + bulk_workers
@@ -0,0 +1,208 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Chunked model transfers over the ``send_weights`` client-streaming RPC.
+
+The sender splits the encoded model into fixed-size chunks, each one with its offset and a CRC32 checksum. The first chunk
+of every stream carries the ``RootMessage`` header (the weights message without the payload). The receiver copies each
+chunk into a buffer preallocated with the total size (bounded by ``Settings.GRPC_MAX_MODEL_SIZE``). Transfers are
+identified by an ID, so an interrupted transfer can be resumed from the last received byte (see ``transfer_status``).
+"""
+
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+
+from p2pfl.communication.protocols.exceptions import CommunicationError
+from p2pfl.communication.protocols.grpc.proto import node_pb2
+from p2pfl.settings import Settings
+
+
+class TransferError(CommunicationError):
+    """Error while reassembling a chunked transfer."""
+
+    pass
+
+
+def checksum(data: bytes) -> int:
+    """
+    Compute the checksum of a chunk.
+
+    Args:
+        data: Chunk data.
+
+    """
+    return zlib.crc32(data) & 0xFFFFFFFF
+
+
+def build_header(msg: node_pb2.RootMessage) -> node_pb2.RootMessage:
+    """
+    Build the header of a chunked transfer (the weights message without the serialized model).
+
+    Args:
+        msg: Weights message.
+
+    """
+    header = node_pb2.RootMessage(
+        source=msg.source,
+        cmd=msg.cmd,
+        weights=node_pb2.Weights(contributors=msg.weights.contributors, num_samples=msg.weights.num_samples),
+    )
+    if msg.HasField("round"):
+        header.round = msg.round
+    return header
+
+
+def iter_chunks(
+    transfer_id: str,
+    header: node_pb2.RootMessage,
+    data: bytes,
+    chunk_size: int,
+    start: int = 0,
+) -> Iterator[node_pb2.WeightsChunk]:
+    """
+    Split a serialized model into chunks.
+
+    Args:
+        transfer_id: Transfer identifier.
+        header: Header of the transfer (sent with the first chunk).
+        data: Serialized model.
+        chunk_size: Size (bytes) of the chunks.
+        start: Offset to start from (to resume a transfer).
+
+    """
+    view = memoryview(data)
+    total_size = len(data)
+    offset = start
+    while True:
+        chunk_data = bytes(view[offset : offset + chunk_size])
+        chunk = node_pb2.WeightsChunk(
+            transfer_id=transfer_id,
+            offset=offset,
+            data=chunk_data,
+            checksum=checksum(chunk_data),
+            total_size=total_size,
+        )
+        if offset == start:
+            chunk.header.CopyFrom(header)
+        yield chunk
+        offset += len(chunk_data)
+        if offset >= total_size:
+            break
+
+
+class _Transfer:
+    """In-progress transfer."""
+
+    __slots__ = ("header", "buffer", "received", "last_update", "lock")
+
+    def __init__(self, header: node_pb2.RootMessage, total_size: int) -> None:
+        self.header = header
+        self.buffer = bytearray(total_size)
+        self.received = 0
+        self.last_update = time.time()
+        self.lock = threading.Lock()
+
+
+class WeightsReassembler:
+    """
+    Reassemble chunked transfers into preallocated buffers.
+
+    Incomplete transfers are kept (to be resumed) until they are not updated for ``timeout`` seconds.
+
+    Args:
+        timeout: Time (seconds) to keep an incomplete transfer.
+        max_size: Maximum size (bytes) of a transfer (``Settings.GRPC_MAX_MODEL_SIZE`` by default).
+
+    """
+
+    def __init__(self, timeout: float, max_size: Optional[int] = None) -> None:
+        """Initialize the reassembler."""
+        self.timeout = timeout
+        self.max_size = max_size if max_size is not None else Settings.GRPC_MAX_MODEL_SIZE
+        self.__transfers: Dict[str, _Transfer] = {}
+        self.__lock = threading.Lock()
+
+    def received(self, transfer_id: str) -> int:
+        """
+        Get the number of contiguous bytes received for a transfer (0 if unknown).
+
+        Args:
+            transfer_id: Transfer identifier.
+
+        """
+        with self.__lock:
+            transfer = self.__transfers.get(transfer_id)
+            return transfer.received if transfer is not None else 0
+
+    def add_chunk(self, chunk: node_pb2.WeightsChunk) -> Optional[Tuple[node_pb2.RootMessage, bytearray]]:
+        """
+        Add a chunk to its transfer.
+
+        Args:
+            chunk: Received chunk.
+
+        Returns:
+            The header and the serialized model (the reassembly buffer, not a copy) if the transfer is complete, None
+            otherwise.
+
+        Raises:
+            TransferError: If the chunk is corrupted, out of order, too large or belongs to an unknown transfer.
+
+        """
+        with self.__lock:
+            transfer = self.__transfers.get(chunk.transfer_id)
+            if transfer is None:
+                if not chunk.HasField("header"):
+                    raise TransferError(f"Unknown transfer {chunk.transfer_id}")
+                if chunk.total_size > self.max_size:
+                    raise TransferError(f"Transfer {chunk.transfer_id} too large ({chunk.total_size} > {self.max_size} bytes)")
+                self.__purge_expired()
+                transfer = _Transfer(chunk.header, chunk.total_size)
+                self.__transfers[chunk.transfer_id] = transfer
+
+        # Check the chunk
+        if chunk.total_size != len(transfer.buffer):
+            raise TransferError(f"Size mismatch in transfer {chunk.transfer_id}")
+        if checksum(chunk.data) != chunk.checksum:
+            raise TransferError(f"Checksum mismatch in transfer {chunk.transfer_id} at offset {chunk.offset}")
+
+        with transfer.lock:
+            end = chunk.offset + len(chunk.data)
+            if chunk.offset > transfer.received or end > len(transfer.buffer):
+                raise TransferError(f"Chunk out of order in transfer {chunk.transfer_id} at offset {chunk.offset}")
+            transfer.last_update = time.time()
+
+            # Copy (already received bytes are skipped)
+            if end <= transfer.received:
+                return None
+            transfer.buffer[chunk.offset : end] = chunk.data
+            transfer.received = end
+            if transfer.received < len(transfer.buffer):
+                return None
+
+        # Complete (only the chunk that completes the buffer gets here)
+        with self.__lock:
+            self.__transfers.pop(chunk.transfer_id, None)
+        return transfer.header, transfer.buffer
+
+    def __purge_expired(self) -> None:
+        now = time.time()
+        for transfer_id in [t for t, transfer in self.__transfers.items() if now - transfer.last_update > self.timeout]:
+            del self.__transfers[transfer_id]
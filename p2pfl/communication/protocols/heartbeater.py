@@ -20,9 +20,10 @@
 
 import threading
 import time
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from p2pfl.communication.protocols.client import Client
+from p2pfl.communication.protocols.failure_detector import PhiAccrualFailureDetector
 from p2pfl.communication.protocols.neighbors import Neighbors
 from p2pfl.management.logger import logger
 from p2pfl.settings import Settings
@@ -30,11 +31,31 @@ from p2pfl.settings import Settings
 heartbeater_cmd_name = "beat"
 
 
+def parse_digest(digest: Tuple[str, ...]) -> List[Tuple[str, float]]:
+    """
+    Parse the digest of a heartbeat.
+
+    Args:
+        digest: Entries of the digest (``addr=age``).
+
+    Returns:
+        List of nodes and the time (seconds) since they were seen by the sender.
+
+    """
+    entries = []
+    for entry in digest:
+        addr, _, age = entry.rpartition("=")
+        entries.append((addr, float(age)))
+    return entries
+
+
 class Heartbeater(threading.Thread):
     """
     Heartbeater for agnostic communication protocol. Send and update fresh heartbeats.
 
-    TODO: Merge heartbeats to increase efficiency.
+    Nodes are removed when a phi accrual failure detector suspects them. Any message received from a node is a proof of
+    life (heartbeats are skipped while the node sends other messages). In ``digest`` mode (``Settings.HEARTBEAT_MODE``),
+    heartbeats are not gossiped: they are only sent to the direct neighbors, carrying the recently seen nodes.
 
     Args:
         self_addr: Address of the node.
@@ -50,24 +71,32 @@ class Heartbeater(threading.Thread):
         self.__neighbors = neighbors
         self.__client = client
         self.__heartbeat_terminate_flag = threading.Event()
+        self.failure_detector = PhiAccrualFailureDetector()
+        self.__last_sent = 0.0
+        self.__checked_version = -1
+        self.__next_tick: Optional[float] = None
+        self.__toggle = False
+        self.__skipped = False
         self.daemon = True
         self.name = f"heartbeater-thread-{self.__self_addr}"
 
     def run(self) -> None:
         """Run the heartbeat thread."""
-        self.__heartbeater()
+        while not self.__heartbeat_terminate_flag.is_set():
+            self.__heartbeat_terminate_flag.wait(self.tick())
 
     def stop(self) -> None:
         """Stop the heartbeat thread."""
         self.__heartbeat_terminate_flag.set()
 
-    def beat(self, nei: str, time: float) -> None:
+    def beat(self, nei: str, time: float, digest: Tuple[str, ...] = ()) -> None:
         """
         Update the time of the last heartbeat of a neighbor. If the neighbor is not added, add it.
 
         Args:
             nei: Address of the neighbor.
             time: Time of the heartbeat.
+            digest: Nodes recently seen by the neighbor (``addr=age``).
 
         """
         # Check if it is itself
@@ -75,39 +104,116 @@ class Heartbeater(threading.Thread):
             return
 
         # Check if exists
+        self.failure_detector.heartbeat(nei)
         self.__neighbors.refresh_or_add(nei, time)
 
-    def __heartbeater(
-        self,
-        period: Optional[float] = None,
-        timeout: Optional[float] = None,
-    ) -> None:
-        if period is None:
-            period = Settings.HEARTBEAT_PERIOD
-        if timeout is None:
-            timeout = Settings.HEARTBEAT_TIMEOUT
-        toggle = False
-        while not self.__heartbeat_terminate_flag.is_set():
-            t = time.time()
-
-            # Check heartbeats (every 2 periods)
-            if toggle:
-                # Get Neis
-                neis = self.__neighbors.get_all()
-                for nei in neis:
-                    if t - neis[nei][2] > timeout:
-                        logger.info(
-                            self.__self_addr,
-                            f"Heartbeat timeout for {nei} ({t - neis[nei][2]}). Removing...",
-                        )
-                        self.__neighbors.remove(nei)
-            else:
-                toggle = True
+        # Nodes seen by the neighbor
+        if digest:
+            self.__merge_digest(nei, digest)
+
+    def __merge_digest(self, nei: str, digest: Tuple[str, ...]) -> None:
+        now = time.monotonic()
+        for addr, age in parse_digest(digest):
+            if addr == self.__self_addr or addr == nei:
+                continue
+            # Do not bring back nodes that are not alive anymore
+            if not self.__neighbors.exists(addr) and age > Settings.HEARTBEAT_TIMEOUT:
+                continue
+            if self.failure_detector.heartbeat(addr, now - age):
+                self.__neighbors.refresh_or_add(addr, time.time() - age)
+
+    def notify_received(self, nei: str) -> None:
+        """
+        Notify that a message (other than a heartbeat) sent by a neighbor has been received (proof of life).
+
+        It only refreshes the neighbor if it is already known (it is never added back), and it is not a heartbeat sample
+        of the failure detector, whose intervals must only come from the heartbeats.
+
+        Args:
+            nei: Address of the neighbor that sent the message.
+
+        """
+        if nei != self.__self_addr:
+            self.__neighbors.refresh(nei, time.time())
+
+    def notify_sent(self) -> None:
+        """Notify that the node has broadcasted a message (the next heartbeat can be skipped)."""
+        self.__last_sent = time.monotonic()
+
+    def get_digest(self) -> List[str]:
+        """
+        Get the digest of the nodes recently seen (alive for the failure detector).
+
+        Returns:
+            Entries of the digest (``addr=age``).
 
-            # Send heartbeat
-            beat_msg = self.__client.build_message(heartbeater_cmd_name, args=[str(time.time())])
+        """
+        now = time.monotonic()
+        digest = []
+        for nei in self.__neighbors.get_all():
+            last_seen = self.failure_detector.last_seen(nei)
+            if last_seen is not None and self.failure_detector.is_available(nei, now):
+                digest.append(f"{nei}={now - last_seen:.3f}")
+        return digest
+
+    def tick(self) -> float:
+        """
+        Run a period of the heartbeater: check the heartbeats (every 2 periods) and send a heartbeat.
+
+        Run by the heartbeat thread, or every ``Settings.HEARTBEAT_PERIOD`` by the caller (without starting the thread).
+
+        Returns:
+            Time (seconds) until the next period.
+
+        """
+        period = Settings.HEARTBEAT_PERIOD
+        if self.__next_tick is None:
+            self.__next_tick = time.monotonic()
+
+        # Check heartbeats (every 2 periods)
+        if self.__toggle:
+            self.__check_heartbeats()
+        else:
+            self.__toggle = True
+
+        # Send heartbeat (skip every other one if other messages have been sent)
+        if not self.__skipped and self.__last_sent > self.__next_tick - period:
+            self.__skipped = True
+        else:
+            self.__skipped = False
+            if Settings.HEARTBEAT_MODE == "digest":
+                beat_msg = self.__client.build_message(heartbeater_cmd_name, args=[str(time.time()), *self.get_digest()], ttl=0)
+            else:
+                beat_msg = self.__client.build_message(heartbeater_cmd_name, args=[str(time.time())])
             self.__client.broadcast(beat_msg)
 
-            # Sleep to allow the periodicity
-            sleep_time = max(0, period - (t - time.time()))
-            time.sleep(sleep_time)
+        # Next period (the time spent working is not slept)
+        self.__next_tick += period
+        now = time.monotonic()
+        if self.__next_tick < now:
+            self.__next_tick = now
+        return self.__next_tick - now
+
+    def __check_heartbeats(self) -> None:
+        now = time.monotonic()
+
+        # Forget the nodes removed elsewhere (e.g. disconnected)
+        if self.__neighbors.version != self.__checked_version:
+            self.__checked_version = self.__neighbors.version
+            neis = self.__neighbors.get_all()
+            for addr in self.failure_detector.get_nodes():
+                if addr not in neis:
+                    self.failure_detector.remove(addr)
+
+        # Only the neighbors silent for longer than the acceptable pause can be suspected
+        for nei in self.__neighbors.get_expired(time.time() - self.failure_detector.acceptable_pause):
+            if nei not in self.failure_detector:
+                # Start tracking (e.g. connected without heartbeats)
+                self.failure_detector.heartbeat(nei, now)
+            elif not self.failure_detector.is_available(nei, now):
+                logger.info(
+                    self.__self_addr,
+                    f"Heartbeat timeout for {nei} (phi {self.failure_detector.phi(nei, now):.1f}). Removing...",
+                )
+                self.__neighbors.remove(nei)
+                self.failure_detector.remove(nei)
@@ -21,6 +21,7 @@ import random
 import time
 from typing import Dict, List, Optional, Union
 
+from p2pfl.communication.protocols.broadcast import BroadcastLatency, get_broadcast_executor, in_broadcast_worker
 from p2pfl.communication.protocols.client import Client
 from p2pfl.communication.protocols.exceptions import CommunicationError, NeighborNotConnectedError
 from p2pfl.communication.protocols.memory.memory_neighbors import InMemoryNeighbors
@@ -43,9 +44,10 @@ class InMemoryClient(Client):
         """Initialize the in-memory client."""
         self.__self_addr = self_addr
         self.__neighbors = neighbors
+        self.broadcast_latency = BroadcastLatency(self_addr)
 
     def build_message(
-        self, cmd: str, args: Optional[List[str]] = None, round: Optional[int] = None
+        self, cmd: str, args: Optional[List[str]] = None, round: Optional[int] = None, ttl: Optional[int] = None
     ) -> Dict[str, Union[str, int, List[str]]]:
         """
         Build a message to send to the neighbors.
@@ -54,6 +56,7 @@ class InMemoryClient(Client):
             cmd: Command of the message.
             args: Arguments of the message.
             round: Round of the message.
+            ttl: Time to live of the message (``Settings.TTL`` by default).
 
         Returns:
             Message to send.
@@ -63,11 +66,13 @@ class InMemoryClient(Client):
             round = -1
         if args is None:
             args = []
+        if ttl is None:
+            ttl = Settings.TTL
         hs = hash(str(cmd) + str(args) + str(time.time()) + str(random.randint(0, 100000)))
         args = [str(a) for a in args]
         return {
             "source": self.__self_addr,
-            "ttl": Settings.TTL,
+            "ttl": ttl,
             "hash": hs,
             "cmd": cmd,
             "args": args,
@@ -104,6 +109,17 @@ class InMemoryClient(Client):
             "cmd": cmd,
         }
 
+    def get_message_size(self, msg: Dict[str, Union[str, int, List[str], bytes]]) -> int:
+        """
+        Get the size (bytes) of a message, used to limit the bandwidth. Only the weights are taken into account.
+
+        Args:
+            msg: Message.
+
+        """
+        weights = msg.get("weights")
+        return len(weights) if isinstance(weights, bytes) else 0
+
     def send(
         self,
         nei: str,
@@ -136,7 +152,7 @@ class InMemoryClient(Client):
 
             # Simulate sending a message by invoking the neighbor's receive function
             if node_server is not None:
-                res = node_server.send_weights(msg) if "weight" in msg else node_server.send_message(msg)
+                res = node_server.send_weights(msg) if "weight" in msg else node_server.send_message(msg, self.__self_addr)
             else:
                 raise NeighborNotConnectedError("Neighbor not directly connected (Stub not defined and create_connection is false).")
             if "error" in res:
@@ -161,14 +177,29 @@ class InMemoryClient(Client):
         """
         Broadcast a message to all the neighbors.
 
+        Messages are sent concurrently (in a shared bounded executor), so a slow neighbor does not delay the others.
+
         Args:
             msg: Message to send.
             node_list: List of neighbors to send the message. If None, send to all the neighbors.
 
         """
         # Node list
-        nodes = node_list if node_list is not None else self.__neighbors.get_all(only_direct=True)
-
-        # Send
-        for n in nodes:
-            self.send(n, msg)
+        nodes = list(node_list if node_list is not None else self.__neighbors.get_all(only_direct=True))
+
+        # Send (inline if there is nothing to parallelize or already in a broadcast worker)
+        start = time.monotonic()
+        if len(nodes) <= 1 or in_broadcast_worker():
+            for n in nodes:
+                self.send(n, msg)
+                self.broadcast_latency.add(time.monotonic() - start)
+        else:
+            executor = get_broadcast_executor()
+            sends = [executor.submit(self.__timed_send, n, msg, start) for n in nodes]
+            for f in sends:
+                f.result()
+        self.broadcast_latency.report()
+
+    def __timed_send(self, nei: str, msg: Dict[str, Union[str, int, List[str], bytes]], start: float) -> None:
+        self.send(nei, msg)
+        self.broadcast_latency.add(time.monotonic() - start)
@@ -19,7 +19,7 @@
 
 import random
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Mapping, Optional, Union
 
 from p2pfl.communication.commands.command import Command
 from p2pfl.communication.commands.message.heartbeat_command import HeartbeatCommand
@@ -74,10 +74,11 @@ class InMemoryCommunicationProtocol(CommunicationProtocol):
         self._client = InMemoryClient(self.addr, self._neighbors)
         # Gossip
         self._gossiper = Gossiper(self.addr, self._client)
-        # Server
-        self._server = InMemoryServer(self.addr, self._gossiper, self._neighbors, commands)
+        self._neighbors.add_removal_callback(self._gossiper.remove_neighbor)
         # Hearbeat
         self._heartbeater = Heartbeater(self.addr, self._neighbors, self._client)
+        # Server
+        self._server = InMemoryServer(self.addr, self._gossiper, self._neighbors, commands, self._heartbeater)
         # Commands
         self._server.add_command(HeartbeatCommand(self._heartbeater))
         if commands is None:
@@ -216,10 +217,12 @@ class InMemoryCommunicationProtocol(CommunicationProtocol):
             node_list: Optional node list.
 
         """
+        if node_list is None:
+            self._heartbeater.notify_sent()
         self._client.broadcast(msg, node_list)
 
     @running
-    def get_neighbors(self, only_direct: bool = False) -> Dict[str, Any]:
+    def get_neighbors(self, only_direct: bool = False) -> Mapping[str, Any]:
         """
         Get the neighbors.
 
@@ -229,6 +232,16 @@ class InMemoryCommunicationProtocol(CommunicationProtocol):
         """
         return self._neighbors.get_all(only_direct)
 
+    def get_neighbor_encodings(self, nei: str) -> List[str]:
+        """
+        Get the model encodings advertised by a neighbor in the handshake.
+
+        Args:
+            nei: The neighbor.
+
+        """
+        return self._neighbors.get_encodings(nei)
+
     @running
     def wait_for_termination(self) -> None:
         """Wait for termination."""
@@ -243,6 +256,7 @@ class InMemoryCommunicationProtocol(CommunicationProtocol):
         model_fn: Callable[[str], Any],
         period: Optional[float] = None,
         create_connection: bool = False,
+        gap_fn: Optional[Callable[[str], int]] = None,
     ) -> None:
         """
         Gossip model weights.
@@ -254,6 +268,7 @@ class InMemoryCommunicationProtocol(CommunicationProtocol):
             model_fn: The model function.
             period: The period.
             create_connection: The create connection flag.
+            gap_fn: The function to get the contributors a neighbor would get from the model.
 
         """
         if period is None:
@@ -265,4 +280,5 @@ class InMemoryCommunicationProtocol(CommunicationProtocol):
             model_fn,
             period,
             create_connection,
+            gap_fn,
         )
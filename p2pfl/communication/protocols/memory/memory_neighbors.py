@@ -22,6 +22,7 @@ from typing import Optional, Tuple
 
 from p2pfl.communication.protocols.memory.server_singleton import ServerSingleton
 from p2pfl.communication.protocols.neighbors import Neighbors
+from p2pfl.learning.frameworks.model_encoding import SUPPORTED_ENCODINGS
 from p2pfl.management.logger import logger
 
 
@@ -37,17 +38,8 @@ class InMemoryNeighbors(Neighbors):
             time: Time of the last heartbeat.
 
         """
-        # Update if exists
-        if addr in self.neis:
-            with self.neis_lock:
-                # Update time
-                self.neis[addr] = (
-                    self.neis[addr][0],
-                    self.neis[addr][1],
-                    time,
-                )
-        else:
-            # Add
+        # Update if exists, add otherwise
+        if not self.refresh(addr, time):
             self.add(addr, non_direct=True)
 
     def connect(self, addr: str, non_direct: bool = False, handshake_msg: bool = True) -> Tuple[None, Optional[str], float]:
@@ -74,10 +66,11 @@ class InMemoryNeighbors(Neighbors):
 
             # Simulate the handshake process
             if handshake_msg:
-                response = server.handshake({"addr": self.self_addr})
+                response = server.handshake({"addr": self.self_addr, "encodings": SUPPORTED_ENCODINGS})
                 if response.get("error"):
                     logger.info(self.self_addr, f"Cannot add a neighbor: {response['error']}")
                     raise Exception(f"Cannot add a neighbor: {response['error']}")
+                self._set_encodings(addr, list(response.get("encodings", [])))
 
             return (None, server, time.time())
 
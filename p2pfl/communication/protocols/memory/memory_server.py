@@ -21,8 +21,10 @@ from typing import Any, Dict, List, Optional, Union
 
 from p2pfl.communication.commands.command import Command
 from p2pfl.communication.protocols.gossiper import Gossiper
+from p2pfl.communication.protocols.heartbeater import Heartbeater, heartbeater_cmd_name
 from p2pfl.communication.protocols.memory.memory_neighbors import InMemoryNeighbors
 from p2pfl.communication.protocols.memory.server_singleton import ServerSingleton
+from p2pfl.learning.frameworks.model_encoding import SUPPORTED_ENCODINGS
 from p2pfl.management.logger import logger
 from p2pfl.settings import Settings
 
@@ -36,6 +38,7 @@ class InMemoryServer:
         gossiper: Gossiper instance.
         neighbors: Neighbors instance.
         commands: List of commands to be executed by the server.
+        heartbeater: Heartbeater notified of the received messages (proof of life of their sources).
 
     """
 
@@ -49,6 +52,7 @@ class InMemoryServer:
         gossiper: Gossiper,
         neighbors: InMemoryNeighbors,
         commands: Optional[List[Command]] = None,
+        heartbeater: Optional[Heartbeater] = None,
     ) -> None:
         """Initialize the in-memory server."""
         # Message handlers
@@ -65,6 +69,9 @@ class InMemoryServer:
         # Neighbors
         self.__neighbors = neighbors
 
+        # Heartbeater
+        self.__heartbeater = heartbeater
+
         # Server
         self.__server = ServerSingleton()
         self.__server_started = False
@@ -120,7 +127,8 @@ class InMemoryServer:
 
         """
         if self.__neighbors.add(request["addr"], non_direct=False, handshake_msg=False):
-            return {}
+            self.__neighbors.set_encodings(request["addr"], list(request.get("encodings", [])))
+            return {"encodings": SUPPORTED_ENCODINGS}
         else:
             return {"error": "Cannot add the node (duplicated or wrong direction)"}
 
@@ -134,30 +142,28 @@ class InMemoryServer:
         """
         self.__neighbors.remove(request["addr"], disconnect_msg=False)
 
-    def send_message(self, request: Dict[str, Any]) -> Dict[str, Any]:
+    def send_message(self, request: Dict[str, Any], sender: Optional[str] = None) -> Dict[str, Any]:
         """
         In-memory service. It is called when a node sends a message to another.
 
         Args:
             request: Request message
+            sender: Address of the node that sends the message (not its source if it is relayed).
 
         """
+        # Proof of life of the neighbor that sent the message
+        self.__notify_received(sender, request["cmd"])
+
         # If not processed
         if self.__gossiper.check_and_set_processed(request["hash"]):
-            if request["cmd"] != "beat" or (not Settings.EXCLUDE_BEAT_LOGS and request["cmd"] == "beat"):
-                source = request["source"]
-                cmd = request["cmd"].upper()
-                ttl = request["ttl"]
-                logger.debug(
-                    self.addr,
-                    f"{cmd} received from {source} ({ttl=})",
-                )
+            if request["cmd"] != "beat" or not Settings.EXCLUDE_BEAT_LOGS:
+                logger.debug(self.addr, "%s received from %s (ttl=%s)", request["cmd"].upper(), request["source"], request["ttl"])
             # Gossip
             if request["ttl"] > 0:
                 # Update ttl and gossip
                 request["ttl"] -= 1
                 pending_neis = [n for n in self.__neighbors.get_all(only_direct=True) if n != request["source"]]
-                self.__gossiper.add_message(request, pending_neis)
+                self.__gossiper.add_message(request, pending_neis, request["cmd"], request["source"])
 
             # Process message
             if request["cmd"] in self.__commands:
@@ -184,6 +190,8 @@ class InMemoryServer:
             request: Request message.
 
         """
+        self.__notify_received(request["source"], request["cmd"])
+
         # Process message
         if request["cmd"] in self.__commands:
             try:
@@ -203,6 +211,11 @@ class InMemoryServer:
             return {"error": f"Unknown command: {request['cmd']}"}
         return {}
 
+    def __notify_received(self, sender: Optional[str], cmd: str) -> None:
+        # Any message is a proof of life of the neighbor that sent it (heartbeats are handled by their command)
+        if self.__heartbeater is not None and sender is not None and cmd != heartbeater_cmd_name:
+            self.__heartbeater.notify_received(sender)
+
     ####
     # Commands
     ####
@@ -18,8 +18,10 @@
 
 """Protocol agnostic neighbor management."""
 
+import heapq
 import threading
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Set, Tuple
 
 from p2pfl.management.logger import logger
 
@@ -28,6 +30,10 @@ class Neighbors:
     """
     Neighbor management class for agnostic communication protocol.
 
+    Neighbors are stored as ``(channel, stub, last_time)`` tuples (direct neighbors have a stub). The table keeps an
+    index of the direct neighbors, immutable snapshots (only rebuilt from the table when a neighbor is added or removed,
+    refreshes copy them) and a min-heap of the last seen times to find the expired neighbors in ``O(log n)``.
+
     Args:
         self_addr: Address of the node.
 
@@ -38,6 +44,23 @@ class Neighbors:
         self.self_addr = self_addr
         self.neis: Dict[str, Any] = {}
         self.neis_lock = threading.Lock()
+        self.__direct: Set[str] = set()
+        self.__snapshots: Dict[bool, Dict[str, Any]] = {}
+        self.__expiry_heap: List[Tuple[float, str]] = []
+        self.__removal_callbacks: List[Callable[[str], None]] = []
+        self.__encodings: Dict[str, List[str]] = {}
+        self.version = 0
+        """Incremented every time a neighbor is added or removed."""
+
+    def add_removal_callback(self, callback: Callable[[str], None]) -> None:
+        """
+        Add a function called (out of the lock) with the address of every removed neighbor.
+
+        Args:
+            callback: Function to call.
+
+        """
+        self.__removal_callbacks = self.__removal_callbacks + [callback]
 
     def connect(self, addr: str) -> Any:
         """
@@ -70,6 +93,25 @@ class Neighbors:
         """
         raise NotImplementedError
 
+    def refresh(self, addr: str, time: float) -> bool:
+        """
+        Refresh a neighbor (never adds it).
+
+        Args:
+            addr: Address of the neighbor.
+            time: Time it was last seen.
+
+        Returns:
+            False if the neighbor is not in the neighbors list, True otherwise.
+
+        """
+        with self.neis_lock:
+            nei = self.neis.get(addr)
+            if nei is None:
+                return False
+            self._set(addr, (nei[0], nei[1], time))
+            return True
+
     def add(self, addr: str, *args, **kargs) -> bool:
         """
         Add a neighbor to the neighbors list.
@@ -96,7 +138,7 @@ class Neighbors:
 
         # Add
         try:
-            self.neis[addr] = self.connect(addr, *args, **kargs)
+            self._set(addr, self.connect(addr, *args, **kargs))
         except Exception as e:
             logger.error(self.self_addr, f"❌ Cannot add {addr}: {e}")
             self.neis_lock.release()
@@ -122,9 +164,55 @@ class Neighbors:
         # Disconnect
         self.disconnect(addr, *args, **kargs)
         # Remove neighbor
-        if addr in self.neis:
+        removed = addr in self.neis
+        if removed:
             del self.neis[addr]
+            self.__direct.discard(addr)
+            self.__encodings.pop(addr, None)
+            self.__snapshots = {}
+            self.version += 1
         self.neis_lock.release()
+        # Notify
+        if removed:
+            for callback in self.__removal_callbacks:
+                callback(addr)
+
+    def set_encodings(self, addr: str, encodings: List[str]) -> None:
+        """
+        Set the model encodings advertised by a neighbor in the handshake.
+
+        Args:
+            addr: Address of the neighbor.
+            encodings: Encodings decoded by the neighbor.
+
+        """
+        with self.neis_lock:
+            self._set_encodings(addr, encodings)
+
+    def _set_encodings(self, addr: str, encodings: List[str]) -> None:
+        """
+        Set the model encodings advertised by a neighbor. The lock must be held by the caller (handshakes in ``connect``).
+
+        Args:
+            addr: Address of the neighbor.
+            encodings: Encodings decoded by the neighbor.
+
+        """
+        self.__encodings[addr] = list(encodings)
+
+    def get_encodings(self, addr: str) -> List[str]:
+        """
+        Get the model encodings advertised by a neighbor in the handshake.
+
+        Args:
+            addr: Address of the neighbor.
+
+        Returns:
+            The encodings (empty for non-direct neighbors and peers running older versions).
+
+        """
+        with self.neis_lock:
+            return list(self.__encodings.get(addr, []))
 
     def get(self, addr: str) -> Any:
         """
@@ -136,20 +224,84 @@ class Neighbors:
         """
         return self.neis[addr]
 
-    def get_all(self, only_direct: bool = False) -> Dict[str, Any]:
+    def _set(self, addr: str, nei: Tuple[Any, Any, float]) -> None:
+        """
+        Set (add or refresh) a neighbor in the table. The lock must be held by the caller.
+
+        Args:
+            addr: Address of the neighbor.
+            nei: Neighbor (``(channel, stub, last_time)``).
+
+        """
+        added = addr not in self.neis
+        self.neis[addr] = nei
+        if added:
+            if nei[1]:
+                self.__direct.add(addr)
+            # Copy on write, snapshots given to the callers never change their keys
+            self.__snapshots = {}
+            self.version += 1
+        else:
+            # Snapshots given to the callers are never mutated, the refreshed entry goes to a copy
+            for only_direct, snapshot in list(self.__snapshots.items()):
+                if not only_direct or addr in self.__direct:
+                    self.__snapshots[only_direct] = {**snapshot, addr: nei}
+        heapq.heappush(self.__expiry_heap, (nei[2], addr))
+        # Drop the outdated entries if the heap grows too much
+        if len(self.__expiry_heap) > 2 * len(self.neis) + 64:
+            self.__expiry_heap = [(v[2], k) for k, v in self.neis.items()]
+            heapq.heapify(self.__expiry_heap)
+
+    def get_all(self, only_direct: bool = False) -> Mapping[str, Any]:
         """
         Get all neighbors from the neighbors list.
 
+        The snapshot is read-only, shared between callers and never changes once returned. It is only rebuilt when a
+        neighbor is added or removed, so it is cheap to call it often.
+
         Args:
             only_direct: Flag to get only direct neighbors.
 
         """
-        # Copy neighbors dict
-        neis = self.neis.copy()
-        # Filter
-        if only_direct:
-            return {k: v for k, v in neis.items() if v[1]}
-        return neis
+        snapshot = self.__snapshots.get(only_direct)
+        if snapshot is None:
+            with self.neis_lock:
+                snapshot = self.__snapshots.get(only_direct)
+                if snapshot is None:
+                    snapshot = {k: self.neis[k] for k in self.__direct} if only_direct else self.neis.copy()
+                    self.__snapshots[only_direct] = snapshot
+        return MappingProxyType(snapshot)
+
+    def get_expired(self, deadline: float) -> List[str]:
+        """
+        Get the neighbors not refreshed since a given time.
+
+        Args:
+            deadline: Time. Neighbors with an older last time are returned.
+
+        """
+        with self.neis_lock:
+            expired: Dict[str, float] = {}
+            while self.__expiry_heap and self.__expiry_heap[0][0] < deadline:
+                last_time, addr = heapq.heappop(self.__expiry_heap)
+                # Skip outdated entries (refreshed or removed neighbors)
+                nei = self.neis.get(addr)
+                if nei is not None and nei[2] == last_time:
+                    expired[addr] = last_time
+            # Keep them until they are refreshed or removed
+            for addr, last_time in expired.items():
+                heapq.heappush(self.__expiry_heap, (last_time, addr))
+            return list(expired)
+
+    def is_direct(self, addr: str) -> bool:
+        """
+        Check if a neighbor is a direct neighbor.
+
+        Args:
+            addr: Address of the neighbor to check.
+
+        """
+        return addr in self.__direct
 
     def exists(self, addr: str) -> bool:
         """
@@ -0,0 +1,244 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Peer selection policies for the model gossip."""
+
+import random
+import threading
+from typing import Dict, List, Optional, Type
+
+from p2pfl.settings import Settings
+
+
+class PeerStats:
+    """
+    Observed latency and throughput of the links to the neighbors.
+
+    Both are exponentially weighted moving averages of the send durations: latencies are measured on small messages and
+    throughputs on model transfers (discounting the latency).
+
+    Args:
+        alpha: Weight of the new samples.
+
+    """
+
+    def __init__(self, alpha: Optional[float] = None) -> None:
+        """Initialize the stats."""
+        if alpha is None:
+            alpha = Settings.GOSSIP_PEER_STATS_ALPHA
+        self.alpha = alpha
+        self.__latencies: Dict[str, float] = {}
+        self.__throughputs: Dict[str, float] = {}
+        self.__lock = threading.Lock()
+
+    def __update(self, values: Dict[str, float], addr: str, sample: float) -> None:
+        old = values.get(addr)
+        values[addr] = sample if old is None else self.alpha * sample + (1 - self.alpha) * old
+
+    def record_latency(self, addr: str, duration: float) -> None:
+        """
+        Record the duration of a small message send.
+
+        Args:
+            addr: Address of the neighbor.
+            duration: Duration (seconds) of the send.
+
+        """
+        with self.__lock:
+            self.__update(self.__latencies, addr, duration)
+
+    def record_transfer(self, addr: str, nbytes: int, duration: float) -> None:
+        """
+        Record the duration of a model send.
+
+        Args:
+            addr: Address of the neighbor.
+            nbytes: Size (bytes) of the model.
+            duration: Duration (seconds) of the send.
+
+        """
+        if nbytes <= 0:
+            return
+        with self.__lock:
+            transfer_time = max(duration - self.__latencies.get(addr, 0.0), 1e-6)
+            self.__update(self.__throughputs, addr, nbytes / transfer_time)
+
+    def latency(self, addr: str) -> Optional[float]:
+        """
+        Get the latency (seconds) to a neighbor. None if unknown.
+
+        Args:
+            addr: Address of the neighbor.
+
+        """
+        return self.__latencies.get(addr)
+
+    def throughput(self, addr: str) -> Optional[float]:
+        """
+        Get the throughput (bytes per second) to a neighbor. None if unknown.
+
+        Args:
+            addr: Address of the neighbor.
+
+        """
+        return self.__throughputs.get(addr)
+
+    def estimate_send_time(self, addr: str, nbytes: int) -> Optional[float]:
+        """
+        Estimate the time to send a message to a neighbor. None if nothing is known about the link.
+
+        Args:
+            addr: Address of the neighbor.
+            nbytes: Size (bytes) of the message.
+
+        """
+        with self.__lock:
+            latency = self.__latencies.get(addr)
+            throughput = self.__throughputs.get(addr)
+        if latency is None and throughput is None:
+            return None
+        return (latency or 0.0) + (nbytes / throughput if throughput else 0.0)
+
+    def remove(self, addr: str) -> None:
+        """
+        Forget a neighbor.
+
+        Args:
+            addr: Address of the neighbor.
+
+        """
+        with self.__lock:
+            self.__latencies.pop(addr, None)
+            self.__throughputs.pop(addr, None)
+
+
+class PeerSelectionPolicy:
+    """Policy to select the neighbors to gossip a model to."""
+
+    needs_gaps = False
+    """Whether the policy reads the gaps of the candidates (they are only computed for the policies that need them)."""
+
+    def select(
+        self,
+        candidates: List[str],
+        samples: int,
+        stats: PeerStats,
+        gaps: Optional[Dict[str, int]] = None,
+        nbytes: int = 0,
+    ) -> List[str]:
+        """
+        Select the neighbors.
+
+        Args:
+            candidates: Neighbors that need the model.
+            samples: Number of neighbors to select.
+            stats: Observed stats of the links.
+            gaps: Contributors each neighbor would get from the model (None if unknown).
+            nbytes: Size (bytes) of the last model sent.
+
+        """
+        raise NotImplementedError
+
+
+class RandomPeerSelection(PeerSelectionPolicy):
+    """Select the neighbors at random."""
+
+    def select(
+        self,
+        candidates: List[str],
+        samples: int,
+        stats: PeerStats,
+        gaps: Optional[Dict[str, int]] = None,
+        nbytes: int = 0,
+    ) -> List[str]:
+        """
+        Select the neighbors.
+
+        Args:
+            candidates: Neighbors that need the model.
+            samples: Number of neighbors to select.
+            stats: Observed stats of the links.
+            gaps: Contributors each neighbor would get from the model (None if unknown).
+            nbytes: Size (bytes) of the last model sent.
+
+        """
+        return random.sample(candidates, min(samples, len(candidates)))
+
+
+class BandwidthAwarePeerSelection(PeerSelectionPolicy):
+    """
+    Select the neighbors where a send closes the biggest gap per second.
+
+    Each candidate is scored by the contributors it would get (its gap) divided by the estimated time to send it the
+    model. Neighbors without stats are assumed to be as fast as the fastest known one, so they get explored. Ties are
+    broken at random.
+    """
+
+    needs_gaps = True
+
+    def select(
+        self,
+        candidates: List[str],
+        samples: int,
+        stats: PeerStats,
+        gaps: Optional[Dict[str, int]] = None,
+        nbytes: int = 0,
+    ) -> List[str]:
+        """
+        Select the neighbors.
+
+        Args:
+            candidates: Neighbors that need the model.
+            samples: Number of neighbors to select.
+            stats: Observed stats of the links.
+            gaps: Contributors each neighbor would get from the model (None if unknown).
+            nbytes: Size (bytes) of the last model sent.
+
+        """
+        times = {n: stats.estimate_send_time(n, nbytes) for n in candidates}
+        known = [t for t in times.values() if t is not None]
+        default_time = min(known) if known else 1.0
+
+        def score(n: str) -> float:
+            gap = gaps.get(n, 1) if gaps is not None else 1
+            t = times[n]
+            return gap / max(t if t is not None else default_time, 1e-6)
+
+        shuffled = random.sample(candidates, len(candidates))
+        return sorted(shuffled, key=score, reverse=True)[:samples]
+
+
+PEER_SELECTION_POLICIES: Dict[str, Type[PeerSelectionPolicy]] = {
+    "random": RandomPeerSelection,
+    "bandwidth": BandwidthAwarePeerSelection,
+}
+
+
+def get_peer_selection_policy(name: Optional[str] = None) -> PeerSelectionPolicy:
+    """
+    Get a peer selection policy.
+
+    Args:
+        name: Name of the policy (``Settings.GOSSIP_PEER_SELECTION`` by default).
+
+    """
+    if name is None:
+        name = Settings.GOSSIP_PEER_SELECTION
+    try:
+        return PEER_SELECTION_POLICIES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown peer selection policy: {name}") from None
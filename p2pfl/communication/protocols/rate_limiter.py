@@ -0,0 +1,165 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Token bucket rate limiting for the gossip protocol."""
+
+import datetime
+import threading
+import time
+from typing import Dict, Optional
+
+from p2pfl.management.logger import logger
+from p2pfl.settings import Settings
+
+
+class TokenBucket:
+    """
+    Token bucket driven by a monotonic clock.
+
+    Tokens are refilled at ``rate`` per second up to ``burst``. A request larger than the available tokens leaves the
+    bucket in debt, so the following requests wait until it is paid.
+
+    Args:
+        rate: Tokens per second. None means unlimited.
+        burst: Maximum tokens (``rate`` by default, i.e. one second of traffic).
+
+    """
+
+    def __init__(self, rate: Optional[float], burst: Optional[float] = None) -> None:
+        """Initialize the bucket."""
+        self.rate = rate
+        self.burst = burst if burst is not None else (rate if rate is not None else 0.0)
+        self.__tokens = self.burst
+        self.__last = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take tokens from the bucket.
+
+        Args:
+            amount: Tokens to take.
+
+        Returns:
+            Time (seconds) to wait before using them.
+
+        """
+        if self.rate is None or self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.__tokens = min(self.burst, self.__tokens + (now - self.__last) * self.rate)
+        self.__last = now
+        # Wait until the bucket is not in debt (or has the tokens if the request fits in the bucket)
+        wait = max(0.0, min(amount, self.burst) - self.__tokens) / self.rate
+        self.__tokens -= amount
+        return wait
+
+
+class RateLimiter:
+    """
+    Limit the messages and bytes per second sent by a node.
+
+    It also measures the achieved rates, periodically reported (with the targets) in the debug log and as system
+    metrics (``gossip_messages_per_second`` and ``gossip_bytes_per_second``).
+
+    Args:
+        node: Address of the node.
+        messages_per_second: Maximum messages per second. None means unlimited.
+        bytes_per_second: Maximum bytes per second. None means unlimited.
+        report_period: Period (seconds) to report the achieved rates.
+
+    """
+
+    def __init__(
+        self,
+        node: str,
+        messages_per_second: Optional[float] = None,
+        bytes_per_second: Optional[float] = None,
+        report_period: Optional[float] = None,
+    ) -> None:
+        """Initialize the rate limiter."""
+        if report_period is None:
+            report_period = Settings.GOSSIP_RATE_REPORT_PERIOD
+        self.node = node
+        self.report_period = report_period
+        self.__messages = TokenBucket(messages_per_second)
+        self.__bytes = TokenBucket(bytes_per_second)
+        self.__lock = threading.Lock()
+        # Stats
+        self.__window_start = time.monotonic()
+        self.__window_messages = 0
+        self.__window_bytes = 0
+
+    def acquire(self, messages: int = 1, nbytes: int = 0, stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        Wait until messages can be sent.
+
+        Args:
+            messages: Number of messages to send.
+            nbytes: Number of bytes to send.
+            stop_event: Event to stop waiting.
+
+        Returns:
+            False if the wait was interrupted by the stop event, True otherwise.
+
+        """
+        with self.__lock:
+            wait = max(self.__messages.reserve(messages), self.__bytes.reserve(nbytes))
+            self.__window_messages += messages
+            self.__window_bytes += nbytes
+        if wait > 0:
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+        self.report()
+        return True
+
+    def get_rates(self) -> Dict[str, float]:
+        """
+        Get the achieved and the target rates.
+
+        Returns:
+            Achieved rates of the current window, and targets (0 means unlimited).
+
+        """
+        with self.__lock:
+            elapsed = max(time.monotonic() - self.__window_start, 1e-9)
+            return {
+                "messages_per_second": self.__window_messages / elapsed,
+                "bytes_per_second": self.__window_bytes / elapsed,
+                "target_messages_per_second": self.__messages.rate or 0.0,
+                "target_bytes_per_second": self.__bytes.rate or 0.0,
+            }
+
+    def report(self) -> None:
+        """Report the achieved rates if the report period has elapsed, starting a new window."""
+        if time.monotonic() - self.__window_start < self.report_period:
+            return
+        rates = self.get_rates()
+        with self.__lock:
+            self.__window_start = time.monotonic()
+            self.__window_messages = 0
+            self.__window_bytes = 0
+        timestamp = datetime.datetime.now()
+        logger.log_system_metric(self.node, "gossip_messages_per_second", rates["messages_per_second"], timestamp)
+        logger.log_system_metric(self.node, "gossip_bytes_per_second", rates["bytes_per_second"], timestamp)
+        logger.debug(
+            self.node,
+            f"Gossip rate: {rates['messages_per_second']:.1f} msg/s (target {rates['target_messages_per_second'] or 'unlimited'}), "
+            f"{rates['bytes_per_second']:.0f} B/s (target {rates['target_bytes_per_second'] or 'unlimited'})",
+        )
@@ -18,8 +18,12 @@
 
 """Abstract aggregator."""
 
+import atexit
 import threading
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence
+
+import numpy as np
 
 from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
 from p2pfl.management.logger import logger
@@ -32,6 +36,41 @@ class NoModelsToAggregateError(Exception):
     pass
 
 
+# Shards are aggregated in a thread pool shared by all the aggregators of the process (numpy releases the GIL)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def get_aggregation_executor() -> ThreadPoolExecutor:
+    """
+    Get the thread pool used to aggregate shards (sized by ``Settings.AGGREGATION_WORKERS``).
+
+    If the setting changes, a new pool is created and the previous one is shut down without waiting: the shards already
+    submitted to it still run (``map_shards`` runs the ones it can no longer submit in the calling thread).
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != Settings.AGGREGATION_WORKERS:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=Settings.AGGREGATION_WORKERS, thread_name_prefix="aggregation")
+            _executor_workers = Settings.AGGREGATION_WORKERS
+        return _executor
+
+
+def shutdown_aggregation_executor() -> None:
+    """Shut down the thread pool used to aggregate shards (a new one is created if needed again)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+atexit.register(shutdown_aggregation_executor)
+
+
 class Aggregator:
     """
     Class to manage the aggregation of models.
@@ -41,12 +80,22 @@ class Aggregator:
 
     """
 
+    WEIGHTED_SUM_BLOCK_SIZE = 1 << 16
+    """Number of parameters of the models stacked at once by ``weighted_sum`` (keeps the stacked block in cache)."""
+
     def __init__(self, node_name: str = "unknown") -> None:
         """Initialize the aggregator."""
         self.node_name = node_name
         self.__train_set: List[str] = []  # TODO: Remove the trainset from the state
         self.__models: List[P2PFLModel] = []
+        self.__contributors: List[str] = []
+        self.__folded_contributors: List[str] = []  # incremental aggregators
         self.partial_aggregation = False
+        self.incremental = False
+
+        # Partial aggregations (keyed by the contributors included). Invalidated when the models change.
+        self.__partial_aggregations: Dict[FrozenSet[str], P2PFLModel] = {}
+        self.__partial_aggregations_generation = 0
 
         # Locks
         self.__agg_lock = threading.Lock()
@@ -63,6 +112,94 @@ class Aggregator:
         """
         raise NotImplementedError
 
+    def map_shards(self, size: int, fn: Callable[[int, int], None]) -> None:
+        """
+        Split the range ``[0, size)`` of the flat parameters in shards and call ``fn(start, stop)`` for each one.
+
+        Shards run in parallel in the aggregation thread pool. Each shard has at least
+        ``Settings.AGGREGATION_MIN_SHARD_SIZE`` parameters, so small models run in the calling thread.
+        ``fn`` must only write its own range of the outputs.
+
+        Args:
+            size: Number of parameters.
+            fn: Function to apply to each shard.
+
+        """
+        n_shards = min(Settings.AGGREGATION_WORKERS, size // max(Settings.AGGREGATION_MIN_SHARD_SIZE, 1))
+        if n_shards <= 1:
+            fn(0, size)
+            return
+        bounds = [size * i // n_shards for i in range(n_shards + 1)]
+        executor = get_aggregation_executor()
+        futures = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            try:
+                futures.append(executor.submit(fn, start, stop))
+            except RuntimeError:
+                # The pool has been replaced (resized) and shut down
+                fn(start, stop)
+        for future in futures:
+            future.result()
+
+    def weighted_sum(self, flats: Sequence[np.ndarray], weights: Sequence[float]) -> np.ndarray:
+        """
+        Compute the weighted sum of several flat parameter vectors as a float64 vector, sharded with ``map_shards``.
+
+        Each shard is reduced in blocks of ``WEIGHTED_SUM_BLOCK_SIZE`` parameters: the slices of the models are stacked
+        and multiplied by the weights with a single ``np.dot``.
+
+        Args:
+            flats: Flat parameters (one vector per model, all of the same size).
+            weights: Weight of each model.
+
+        """
+        size = flats[0].size
+        w = np.asarray(weights, dtype=np.float64)
+        accum = np.empty(size, dtype=np.float64)
+
+        def sum_shard(start: int, stop: int) -> None:
+            stacked = np.empty((len(flats), min(self.WEIGHTED_SUM_BLOCK_SIZE, stop - start)), dtype=np.float64)
+            for block_start in range(start, stop, self.WEIGHTED_SUM_BLOCK_SIZE):
+                block_stop = min(block_start + self.WEIGHTED_SUM_BLOCK_SIZE, stop)
+                block = stacked[:, : block_stop - block_start]
+                for i, flat in enumerate(flats):
+                    block[i] = flat[block_start:block_stop]
+                np.dot(w, block, out=accum[block_start:block_stop])
+
+        self.map_shards(size, sum_shard)
+        return accum
+
+    def fold_model(self, model: P2PFLModel) -> None:
+        """
+        Fold a model into the running aggregation. Only used by incremental aggregators (``incremental = True``).
+
+        Incremental aggregators only keep the own model and the last received one, the rest are folded as they arrive.
+        The running aggregation is then aggregated with the kept models as a model with the folded samples, so
+        ``aggregate`` must weight the models by their samples.
+
+        Args:
+            model: Model to fold.
+
+        """
+        raise NotImplementedError
+
+    def get_running_aggregation(self, template: P2PFLModel) -> P2PFLModel:
+        """
+        Get the running aggregation of the folded models. Only used by incremental aggregators.
+
+        Args:
+            template: Model used to build the aggregated model (its parameters are not used).
+
+        Raises:
+            NoModelsToAggregateError: If no model was folded.
+
+        """
+        raise NotImplementedError
+
+    def reset_running_aggregation(self) -> None:
+        """Reset the running aggregation. Only used by incremental aggregators."""
+        pass
+
     def get_required_callbacks(self) -> List[str]:
         """
         Get the required callbacks for the aggregation.
@@ -95,6 +232,11 @@ class Aggregator:
         with self.__agg_lock:
             self.__train_set = []
             self.__models = []
+            self.__contributors = []
+            self.__folded_contributors = []
+            if self.incremental:
+                self.reset_running_aggregation()
+            self.__invalidate_partial_aggregations()
             self._finish_aggregation_event.set()
 
     def get_aggregated_models(self) -> List[str]:
@@ -105,10 +247,7 @@ class Aggregator:
             Name of nodes that colaborated to get the model.
 
         """
-        models_added = []
-        for n in self.__models:
-            models_added += n.get_contributors()
-        return models_added
+        return self.__contributors.copy()
 
     def add_model(self, model: P2PFLModel) -> List[str]:
         """
@@ -142,12 +281,19 @@ class Aggregator:
                 # Check if any model was added
                 any_model_added = any(n in self.get_aggregated_models() for n in model.get_contributors())
                 if not any_model_added:
-                    # Aggregate model
-                    self.__models.append(model)
-                    models_added = str(len(self.get_aggregated_models()))
+                    # Aggregate model (incremental aggregators fold the previously received one)
+                    if self.incremental:
+                        self.__keep_model(model)
+                    else:
+                        self.__models.append(model)
+                    self.__contributors += model.get_contributors()
+                    self.__invalidate_partial_aggregations()
                     logger.info(
                         self.node_name,
-                        f"🧩 Model added ({models_added}/{ str(len(self.__train_set))}) from {str(model.get_contributors())}",
+                        "🧩 Model added (%d/%d) from %s",
+                        len(self.__contributors),
+                        len(self.__train_set),
+                        model.get_contributors(),
                     )
 
                     # Check if all models were added
@@ -160,12 +306,14 @@ class Aggregator:
                 else:
                     logger.debug(
                         self.node_name,
-                        f"Can't add a model from a node ({model.get_contributors()}) that is already in the training set.",
+                        "Can't add a model from a node (%s) that is already in the training set.",
+                        model.get_contributors(),
                     )
             else:
                 logger.debug(
                     self.node_name,
-                    f"Can't add a model from a node ({model.get_contributors()}) that is not in the training set.",
+                    "Can't add a model from a node (%s) that is not in the training set.",
+                    model.get_contributors(),
                 )
         else:
             logger.debug(self.node_name, "🚫 Received a model when is not needed (already aggregated).")
@@ -205,6 +353,15 @@ class Aggregator:
                 logger.info(self.node_name, "🧠 Aggregating models.")
 
         # Notify node
+        if self.incremental:
+            # The cached aggregation may still be sent to neighbors, the node gets its own copy
+            aggregated_model = self.__get_running_partial_aggregation([])
+            return aggregated_model.build_copy(
+                params=[p.copy() for p in aggregated_model.get_parameters()],
+                num_samples=aggregated_model.get_num_samples(),
+                contributors=aggregated_model.get_contributors().copy(),
+                additional_info=aggregated_model.get_info().copy(),
+            )
         return self.aggregate(self.__models)
 
     def get_missing_models(self) -> set:
@@ -215,16 +372,16 @@ class Aggregator:
             A set of missing models.
 
         """
-        agg_models = []
-        for m in self.__models:
-            agg_models += m.get_contributors()
-        missing_models = set(self.__train_set) - set(agg_models)
+        missing_models = set(self.__train_set) - set(self.__contributors)
         return missing_models
 
     def __get_partial_aggregation(self, except_nodes: List[str]) -> P2PFLModel:
         """
         Obtain a partial aggregation.
 
+        Aggregations are memoized by the set of contributors included, so the same partial aggregation (and its
+        encoded parameters) is reused until a model is added or the aggregator is cleared.
+
         Args:
             except_nodes: List of nodes to exclude from the aggregation.
 
@@ -232,12 +389,85 @@ class Aggregator:
             Aggregated model, nodes aggregated and aggregation weight.
 
         """
-        models_to_aggregate = []
-        for m in self.__models.copy():
-            if all(n not in except_nodes for n in m.get_contributors()):
-                models_to_aggregate.append(m)
+        if self.incremental:
+            return self.__get_running_partial_aggregation(except_nodes)
+
+        with self.__agg_lock:
+            generation = self.__partial_aggregations_generation
+            models_to_aggregate = []
+            for m in self.__models:
+                if all(n not in except_nodes for n in m.get_contributors()):
+                    models_to_aggregate.append(m)
+            key = frozenset(n for m in models_to_aggregate for n in m.get_contributors())
+            cached = self.__partial_aggregations.get(key)
+        if cached is not None:
+            return cached
+
+        aggregated_model = self.aggregate(models_to_aggregate)
+
+        with self.__agg_lock:
+            # Do not cache aggregations of outdated models
+            if generation == self.__partial_aggregations_generation:
+                self.__partial_aggregations[key] = aggregated_model
+        return aggregated_model
 
-        return self.aggregate(models_to_aggregate)
+    def __keep_model(self, model: P2PFLModel) -> None:
+        """
+        Keep a model unfolded in an incremental aggregator.
+
+        The own model and the last received one are kept, so they can still be sent to neighbors that already have
+        some of the folded contributors. The previously received model is folded into the running aggregation.
+
+        Args:
+            model: Model to keep.
+
+        """
+        own = [self.node_name]
+        if model.get_contributors() != own:
+            for m in self.__models:
+                if m.get_contributors() != own:
+                    self.fold_model(m)
+                    self.__folded_contributors += m.get_contributors()
+            self.__models = [m for m in self.__models if m.get_contributors() == own]
+        self.__models.append(model)
+
+    def __get_running_partial_aggregation(self, except_nodes: List[str]) -> P2PFLModel:
+        """
+        Obtain a partial aggregation of an incremental aggregator.
+
+        Folded models can not be excluded, so the running aggregation is only included if none of its contributors is
+        excluded. The kept models are included if none of their contributors is excluded.
+
+        Args:
+            except_nodes: List of nodes to exclude from the aggregation.
+
+        """
+        with self.__agg_lock:
+            generation = self.__partial_aggregations_generation
+            models_to_aggregate = [m for m in self.__models if all(n not in except_nodes for n in m.get_contributors())]
+            include_running = len(self.__folded_contributors) > 0 and all(n not in except_nodes for n in self.__folded_contributors)
+            key = frozenset(n for m in models_to_aggregate for n in m.get_contributors())
+            if include_running:
+                key = key.union(self.__folded_contributors)
+            cached = self.__partial_aggregations.get(key)
+            if cached is not None:
+                return cached
+            if include_running:
+                # Snapshot of the running aggregation (folds change it in place). Kept models always include the last
+                # received one, used as template.
+                models_to_aggregate = [self.get_running_aggregation(self.__models[-1])] + models_to_aggregate
+
+        aggregated_model = self.aggregate(models_to_aggregate)
+
+        with self.__agg_lock:
+            # Do not cache aggregations of outdated models
+            if generation == self.__partial_aggregations_generation:
+                self.__partial_aggregations[key] = aggregated_model
+        return aggregated_model
+
+    def __invalidate_partial_aggregations(self) -> None:
+        self.__partial_aggregations = {}
+        self.__partial_aggregations_generation += 1
 
     def __get_remaining_model(self, except_nodes) -> P2PFLModel:
         """
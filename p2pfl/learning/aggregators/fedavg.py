@@ -18,12 +18,13 @@
 
 """Federated Averaging (FedAvg) Aggregator."""
 
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 
 from p2pfl.learning.aggregators.aggregator import Aggregator, NoModelsToAggregateError
 from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+from p2pfl.learning.frameworks.parameters_layout import ParametersLayout
 
 
 class FedAvg(Aggregator):
@@ -31,12 +32,26 @@ class FedAvg(Aggregator):
     Federated Averaging (FedAvg) [McMahan et al., 2016].
 
     Paper: https://arxiv.org/abs/1602.05629.
+
+    Args:
+        node_name: The name of the node.
+        incremental: If True, received models are folded into a float64 running weighted sum and released (memory
+            does not grow with the number of models). Only the own model and the last received one are kept, so
+            partial aggregations for neighbors that have some of the folded models only include the kept ones.
+
     """
 
-    def __init__(self, node_name: str = "unknown") -> None:
+    def __init__(self, node_name: str = "unknown", incremental: bool = False) -> None:
         """Initialize the aggregator."""
         super().__init__(node_name)
         self.partial_aggregation = True
+        self.incremental = incremental
+
+        # Running aggregation (incremental mode)
+        self.__running_sum: Optional[np.ndarray] = None
+        self.__running_layout: Optional[ParametersLayout] = None
+        self.__running_samples = 0
+        self.__running_contributors: List[str] = []
 
     def aggregate(self, models: List[P2PFLModel]) -> P2PFLModel:
         """
@@ -56,17 +71,16 @@ class FedAvg(Aggregator):
         # Total Samples
         total_samples = sum([m.get_num_samples() for m in models])
 
-        # Create a Zero Model using numpy
-        first_model_weights = models[0].get_parameters()
-        accum = [np.zeros_like(layer) for layer in first_model_weights]
-
-        # Add weighted models
-        for m in models:
-            for i, layer in enumerate(m.get_parameters()):
-                accum[i] = np.add(accum[i], layer * m.get_num_samples())
+        # Add weighted models (over the cached flat parameter vectors, sharded across the aggregation threads)
+        flats = [m.get_flat_parameters() for m in models]
+        layout = flats[0][1]
+        for _, other_layout in flats[1:]:
+            if other_layout != layout:
+                raise ValueError(f"({self.node_name}) Models with different architectures can not be aggregated")
+        accum = self.weighted_sum([flat for flat, _ in flats], [m.get_num_samples() for m in models])
 
         # Normalize Accum
-        accum = [np.divide(layer, total_samples) for layer in accum]
+        accum /= total_samples
 
         # Get contributors
         contributors: List[str] = []
@@ -74,4 +88,49 @@ class FedAvg(Aggregator):
             contributors = contributors + m.get_contributors()
 
         # Return an aggregated p2pfl model
-        return models[0].build_copy(params=accum, num_samples=total_samples, contributors=contributors)
+        return models[0].build_copy(params=layout.unflatten(accum), num_samples=total_samples, contributors=contributors)
+
+    def fold_model(self, model: P2PFLModel) -> None:
+        """
+        Fold a model into the running weighted sum.
+
+        Args:
+            model: Model to fold.
+
+        """
+        num_samples = model.get_num_samples()
+        flat, layout = model.get_flat_parameters()
+        if self.__running_sum is None:
+            self.__running_sum = np.zeros(layout.size, dtype=np.float64)
+            self.__running_layout = layout
+        elif layout != self.__running_layout:
+            raise ValueError(f"({self.node_name}) Models with different architectures can not be aggregated")
+        self.__running_sum += num_samples * flat
+        self.__running_samples += num_samples
+        self.__running_contributors += model.get_contributors()
+
+    def get_running_aggregation(self, template: P2PFLModel) -> P2PFLModel:
+        """
+        Get the weighted average of the folded models.
+
+        Args:
+            template: Model used to build the aggregated model (its parameters are not used).
+
+        Returns:
+            A P2PFLModel with the aggregated.
+
+        """
+        if self.__running_sum is None or self.__running_layout is None:
+            raise NoModelsToAggregateError(f"({self.node_name}) Trying to aggregate models when there is no models")
+
+        # Normalize
+        accum = self.__running_layout.unflatten(self.__running_sum / self.__running_samples)
+
+        return template.build_copy(params=accum, num_samples=self.__running_samples, contributors=self.__running_contributors.copy())
+
+    def reset_running_aggregation(self) -> None:
+        """Reset the running weighted sum."""
+        self.__running_sum = None
+        self.__running_layout = None
+        self.__running_samples = 0
+        self.__running_contributors = []
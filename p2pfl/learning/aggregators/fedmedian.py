@@ -18,7 +18,7 @@
 
 """Federated Median (FedMedian) Aggregator."""
 
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 
@@ -31,20 +31,36 @@ class FedMedian(Aggregator):
     Federated Median (FedMedian) [Yin et al., 2018].
 
     Paper: https://arxiv.org/pdf/1803.01498v1.pdf
+
+    The coordinate-wise median is computed over a preallocated ``(n_models, n_params)`` buffer with the flat
+    parameters of the models, using ``np.partition`` (linear time selection) instead of a full sort. Shards of the
+    parameters are reduced in parallel (see ``Aggregator.map_shards``), each one with its own buffer.
+
+    Args:
+        node_name: The name of the node.
+        chunk_size: If set, the parameters are processed in chunks of this number of parameters, bounding the
+            buffer to ``(n_models, chunk_size)``.
+
     """
 
+    def __init__(self, node_name: str = "unknown", chunk_size: Optional[int] = None) -> None:
+        """Initialize the aggregator."""
+        super().__init__(node_name)
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.chunk_size = chunk_size
+
     def aggregate(self, models: List[P2PFLModel]) -> P2PFLModel:
         """
         Compute the median of the models.
 
         Args:
-            models: Dict with the models (node: model, num_samples).
+            models: List of models to aggregate.
 
         Returns:
             A P2PFLModel with the aggregated
 
         """
-        raise NotImplementedError("This method is not implemented yet (need to add tests)")
         # Check if there are models to aggregate
         if len(models) == 0:
             raise NoModelsToAggregateError(f"({self.node_name}) Trying to aggregate models when there are no models")
@@ -52,14 +68,51 @@ class FedMedian(Aggregator):
         # Total Samples
         total_samples = sum([m.get_num_samples() for m in models])
 
-        # Create a list to store the weights of each model
-        weights = [m.get_parameters() for m in models]
+        # Flat parameters of the models (cached by the models)
+        flats = [m.get_flat_parameters() for m in models]
+        layout = flats[0][1]
+        for _, other_layout in flats[1:]:
+            if other_layout != layout:
+                raise ValueError(f"({self.node_name}) Models with different architectures can not be aggregated")
+
+        # Stack and reduce (float64, the layers are cast back to their dtype)
+        dtype = np.float64
+        result = np.empty(layout.size, dtype=dtype)
+
+        def reduce_shard(start: int, stop: int) -> None:
+            chunk_size = max(min(self.chunk_size or stop - start, stop - start), 1)
+            stacked = np.empty((len(models), chunk_size), dtype=dtype)
+            for chunk_start in range(start, stop, chunk_size):
+                chunk_stop = min(chunk_start + chunk_size, stop)
+                buffer = stacked[:, : chunk_stop - chunk_start]
+                for i, (flat, _) in enumerate(flats):
+                    buffer[i] = flat[chunk_start:chunk_stop]
+                result[chunk_start:chunk_stop] = self._reduce(buffer)
+
+        self.map_shards(layout.size, reduce_shard)
 
-        # Calculate the median for each layer
-        median_weights = []
-        for layer_index in range(len(weights[0])):
-            layer_weights = [weights[model][layer_index] for model in range(len(weights))]
-            median_weights.append(np.median(np.array(layer_weights), axis=0))
+        # Get contributors
+        contributors: List[str] = []
+        for m in models:
+            contributors = contributors + m.get_contributors()
 
         # Return an aggregated p2pfl model
-        return models[0].build_copy(params=median_weights, num_samples=total_samples)
+        return models[0].build_copy(params=layout.unflatten(result), num_samples=total_samples, contributors=contributors)
+
+    def _reduce(self, stacked: np.ndarray) -> np.ndarray:
+        """
+        Reduce the stacked parameters (one row per model) to the coordinate-wise median.
+
+        The buffer is partitioned in place.
+
+        Args:
+            stacked: Buffer with the stacked parameters.
+
+        """
+        n = stacked.shape[0]
+        k = n // 2
+        if n % 2 == 1:
+            stacked.partition(k, axis=0)
+            return stacked[k]
+        stacked.partition([k - 1, k], axis=0)
+        return (stacked[k - 1] + stacked[k]) / 2
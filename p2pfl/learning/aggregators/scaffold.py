@@ -24,6 +24,7 @@ import numpy as np
 
 from p2pfl.learning.aggregators.aggregator import Aggregator, NoModelsToAggregateError
 from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+from p2pfl.learning.frameworks.parameters_layout import ParametersLayout
 
 
 class Scaffold(Aggregator):
@@ -68,47 +69,35 @@ class Scaffold(Aggregator):
             raise NoModelsToAggregateError(f"({self.node_name}) Trying to aggregate models when there is no models")
 
         total_samples = sum([m.get_num_samples() for m in models])
-        # initialize the accumulators for the model and the control variates
-        first_model_weights = models[0].get_parameters()
-        accum_delta_y = [np.zeros_like(layer) for layer in first_model_weights]
 
-        # Accumulate weighted model updates
-        for m in models:
-            delta_y_i = self._get_and_validate_model_info(m)["delta_y_i"]
-            num_samples = m.get_num_samples()
-            for i, layer in enumerate(delta_y_i):
-                accum_delta_y[i] += layer * num_samples
+        # Accumulate weighted model updates (over flat vectors, sharded across the aggregation threads)
+        infos = [self._get_and_validate_model_info(m) for m in models]
+        y_layout = self.__check_layout([info["delta_y_i"] for info in infos])
+        accum_delta_y = self.weighted_sum([y_layout.flatten(info["delta_y_i"]) for info in infos], [m.get_num_samples() for m in models])
 
         # Normalize the accumulated model updates and apply global learning rate
-        accum_delta_y = [(layer / total_samples) * self.global_lr for layer in accum_delta_y]
+        accum_delta_y *= self.global_lr / total_samples
 
         # Update global model
         if not self.global_model_params:
             self.global_model_params = models[0].get_parameters()
-        self.global_model_params = [param + delta for param, delta in zip(self.global_model_params, accum_delta_y)]
+        global_model = y_layout.flatten(self.global_model_params)
+        global_model += accum_delta_y
+        self.global_model_params = y_layout.unflatten(global_model)
 
         # Accumulate control variates
-        delta_c_i_first = self._get_and_validate_model_info(models[0])["delta_c_i"] # take first model as reference
-        accum_c = [np.zeros_like(layer) for layer in delta_c_i_first]
-
-        if delta_c_i_first is None:
+        if any(info["delta_c_i"] is None for info in infos):
             raise ValueError("delta_c_i cannot be None after validation")
-
-        for m in models:
-            delta_c_i = self._get_and_validate_model_info(m)["delta_c_i"]
-            for i in range(len(accum_c)):
-                accum_c[i] += delta_c_i[i]
+        c_layout = self.__check_layout([info["delta_c_i"] for info in infos])
+        accum_c = self.weighted_sum([c_layout.flatten(info["delta_c_i"]) for info in infos], [1.0] * len(models))
 
         # Normalize the accumulated control variates
-        num_models = len(models)
-        accum_c = [layer / num_models for layer in accum_c]
+        accum_c /= len(models)
 
         # Update global c
-        if not self.c:
-            self.c = [np.zeros_like(layer) for layer in accum_c]
-
-        for i in range(len(self.c)):
-            self.c[i] += accum_c[i]
+        global_c = c_layout.flatten(self.c) if self.c else np.zeros(c_layout.size, dtype=np.float64)
+        global_c += accum_c
+        self.c = c_layout.unflatten(global_c)
 
         # Get contributors
         contributors = []
@@ -125,6 +114,19 @@ class Scaffold(Aggregator):
         """Retrieve the list of required callback keys for this aggregator."""
         return ["scaffold"]
 
+    def __check_layout(self, params: list[list[np.ndarray]]) -> ParametersLayout:
+        """
+        Get the layout of the first parameters, checking that the rest match it.
+
+        Args:
+            params: Parameters (one list of layers per model).
+
+        """
+        layout = ParametersLayout.from_parameters(params[0])
+        if any(ParametersLayout.from_parameters(p) != layout for p in params[1:]):
+            raise ValueError(f"({self.node_name}) Models with different architectures can not be aggregated")
+        return layout
+
     def _get_and_validate_model_info(self, model: P2PFLModel) -> dict[str, Any]:
         """
         Validate the model.
@@ -0,0 +1,67 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Trimmed Mean Aggregator."""
+
+from typing import Optional
+
+import numpy as np
+
+from p2pfl.learning.aggregators.fedmedian import FedMedian
+
+
+class TrimmedMean(FedMedian):
+    """
+    Coordinate-wise Trimmed Mean [Yin et al., 2018].
+
+    Paper: https://arxiv.org/pdf/1803.01498v1.pdf
+
+    For each parameter, the ``beta`` fraction of largest and smallest values is discarded and the rest is averaged.
+    The values to keep are selected with ``np.partition`` over the stacked buffer (see ``FedMedian``).
+
+    Args:
+        node_name: The name of the node.
+        beta: Fraction of values to trim from each end (``0 <= beta < 0.5``).
+        chunk_size: If set, the parameters are processed in chunks of this number of parameters.
+
+    """
+
+    def __init__(self, node_name: str = "unknown", beta: float = 0.1, chunk_size: Optional[int] = None) -> None:
+        """Initialize the aggregator."""
+        super().__init__(node_name, chunk_size)
+        if not 0 <= beta < 0.5:
+            raise ValueError("beta must be in [0, 0.5)")
+        self.beta = beta
+
+    def _reduce(self, stacked: np.ndarray) -> np.ndarray:
+        """
+        Reduce the stacked parameters (one row per model) to the coordinate-wise trimmed mean.
+
+        The buffer is partitioned in place.
+
+        Args:
+            stacked: Buffer with the stacked parameters.
+
+        """
+        n = stacked.shape[0]
+        k = int(self.beta * n)
+        if k == 0:
+            return stacked.mean(axis=0)
+        # After partitioning, rows k..n-k-1 hold the values ranked between both cuts
+        stacked.partition([k, n - k - 1], axis=0)
+        return stacked[k : n - k].mean(axis=0)
@@ -27,6 +27,7 @@ from flax import linen as nn
 
 from p2pfl.learning.frameworks import Framework
 from p2pfl.learning.frameworks.exceptions import ModelNotMatchingError
+from p2pfl.learning.frameworks.model_encoding import BYTES_LIKE, ModelEncoding, decode_binary, encode_binary, is_binary
 from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
 
 #####################
@@ -52,7 +53,7 @@ class FlaxModel(P2PFLModel):
         super().__init__(model, None, num_samples, contributors, additional_info)
         self.model_params = init_params
         if params:
-            if isinstance(params, bytes):
+            if isinstance(params, BYTES_LIKE):
                 params, _ = self.decode_parameters(params)
             self.model_params = self.__np_to_dict(self.model_params, params)
 
@@ -88,7 +89,7 @@ class FlaxModel(P2PFLModel):
             ModelNotMatchingError: If parameters don't match the model.
 
         """
-        if isinstance(params, bytes):
+        if isinstance(params, BYTES_LIKE):
             params, _ = self.decode_parameters(params)
 
         try:
@@ -98,15 +99,21 @@ class FlaxModel(P2PFLModel):
                 raise ValueError("Unvalid parameters.")
         except Exception as e:
             raise ModelNotMatchingError("Not matching models") from e
+        self.invalidate_cache()
 
-    def encode_parameters(self, params: Optional[List[np.ndarray]] = None) -> bytes:
+    def encode_parameters(self, params: Optional[List[np.ndarray]] = None, encoding: Optional[ModelEncoding] = None) -> bytes:
         """
         Encode the parameters of the model.
 
         Args:
             params: The parameters of the model.
+            encoding: The encoding to use. If None, the encoding of the model is used.
 
         """
+        if encoding is None:
+            encoding = self.get_encoding()
+        if encoding == ModelEncoding.BINARY:
+            return encode_binary(params if params else self.get_parameters(), self.additional_info)
         model_params = (
             self.model_params
             if not (params and self.model_params)
@@ -129,6 +136,8 @@ class FlaxModel(P2PFLModel):
             data: The parameters of the model.
 
         """
+        if is_binary(data):
+            return decode_binary(data)
         try:
             loaded_data = pickle.loads(data)
             params_dict = loaded_data["params"]
@@ -150,6 +159,7 @@ class FlaxModel(P2PFLModel):
 
         """
         flax_model = self.__class__(copy.deepcopy(self.model), copy.deepcopy(self.model_params), **kwargs)
+        flax_model.encoding = self.encoding
         return flax_model
 
     def get_framework(self) -> str:
@@ -27,6 +27,7 @@ from p2pfl.learning.aggregators.aggregator import Aggregator
 from p2pfl.learning.dataset.p2pfl_dataset import P2PFLDataset
 from p2pfl.learning.frameworks.callback import P2PFLCallback
 from p2pfl.learning.frameworks.callback_factory import CallbackFactory
+from p2pfl.learning.frameworks.model_encoding import BYTES_LIKE
 from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
 
 
@@ -73,7 +74,7 @@ class Learner(ABC):
         """
         if isinstance(model, P2PFLModel):
             self.model = model
-        elif isinstance(model, (list, bytes)):
+        elif isinstance(model, (list, *BYTES_LIKE)):
             self.model.set_parameters(model)
 
         # Update callbacks with model info
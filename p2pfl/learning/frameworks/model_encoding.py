@@ -0,0 +1,214 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+Model parameters wire formats.
+
+Two formats are supported:
+
+- ``pickle``: the legacy format, a pickled dict with the parameters and the additional info.
+- ``binary``: a versioned framed format. A small JSON header describes every tensor (dtype, shape, offset) and is
+  followed by the raw tensor buffers, so decoding returns ``np.frombuffer`` views over the received bytes (no copy).
+
+Frame layout (``binary``):
+
+.. code-block:: text
+
+    | magic (6) | version (1) | reserved (1) | header length (4, LE) | JSON header | pad | tensors (64B aligned) | info |
+
+The receiver detects the format from the magic bytes. Peers running older versions only decode ``pickle``, so the
+encodings decoded by each node are advertised in the handshake and a model is only sent as ``binary`` to the neighbors
+that advertised it (see ``negotiate_encoding``).
+"""
+
+import json
+import pickle
+import struct
+from enum import Enum
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from p2pfl.learning.frameworks.exceptions import DecodingParamsError
+
+
+class ModelEncoding(Enum):
+    """Enum for the different model parameters encodings."""
+
+    PICKLE = "pickle"
+    BINARY = "binary"
+
+
+SUPPORTED_ENCODINGS: List[str] = [e.value for e in ModelEncoding]
+"""Encodings decoded by this version (advertised to the neighbors in the handshake)."""
+
+BINARY_MAGIC = b"P2PFLT"
+BINARY_VERSION = 1
+_PREAMBLE = struct.Struct("<6sBBI")
+_ALIGNMENT = 64
+
+
+BYTES_LIKE = (bytes, bytearray, memoryview)
+"""Types of serialized parameters (received models can be reassembled in a ``bytearray``, without a final copy)."""
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def is_binary(data: bytes) -> bool:
+    """
+    Check if the data is encoded with the binary format.
+
+    Args:
+        data: The encoded parameters.
+
+    """
+    return bytes(data[: len(BINARY_MAGIC)]) == BINARY_MAGIC
+
+
+def negotiate_encoding(preferred: ModelEncoding, peer_encodings: Sequence[str]) -> ModelEncoding:
+    """
+    Get the encoding to send a model to a neighbor.
+
+    Args:
+        preferred: The encoding of the model.
+        peer_encodings: The encodings advertised by the neighbor (empty for unknown or older peers).
+
+    Returns:
+        The preferred encoding if the neighbor decodes it, pickle otherwise.
+
+    """
+    if preferred == ModelEncoding.PICKLE or preferred.value in peer_encodings:
+        return preferred
+    return ModelEncoding.PICKLE
+
+
+def supports_binary(params: List[np.ndarray]) -> bool:
+    """
+    Check if the parameters can be encoded with the binary format (only numeric, non-object arrays).
+
+    Args:
+        params: The parameters to check.
+
+    """
+    return all(not np.asarray(p).dtype.hasobject for p in params)
+
+
+def encode_pickle(params: Any, additional_info: Dict[str, Any]) -> bytes:
+    """
+    Encode the parameters with the pickle format.
+
+    Args:
+        params: The parameters of the model.
+        additional_info: The additional information of the model.
+
+    """
+    return pickle.dumps({"params": params, "additional_info": additional_info})
+
+
+def decode_pickle(data: bytes) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Decode the parameters encoded with the pickle format.
+
+    Args:
+        data: The encoded parameters.
+
+    """
+    loaded_data = pickle.loads(data)
+    return loaded_data["params"], loaded_data.get("additional_info", {})
+
+
+def encode_binary(params: List[np.ndarray], additional_info: Dict[str, Any]) -> bytes:
+    """
+    Encode the parameters with the binary framed format.
+
+    Each tensor is copied once, straight into the output frame.
+
+    Args:
+        params: The parameters of the model.
+        additional_info: The additional information of the model.
+
+    """
+    # ascontiguousarray promotes 0-d arrays to 1-d, so keep the original shapes
+    shapes = [np.shape(p) for p in params]
+    arrays = [np.ascontiguousarray(p) for p in params]
+    info = pickle.dumps(additional_info)
+
+    # Compute the layout. The header size depends on the offsets, so offsets are relative to the data section.
+    tensors: List[Dict[str, Any]] = []
+    offset = 0
+    for arr, shape in zip(arrays, shapes):
+        offset = _align(offset)
+        tensors.append({"dtype": arr.dtype.str, "shape": list(shape), "offset": offset, "nbytes": arr.nbytes})
+        offset += arr.nbytes
+    header_dict = {"tensors": tensors, "info": {"offset": offset, "nbytes": len(info)}}
+    header = json.dumps(header_dict, separators=(",", ":")).encode()
+    data_start = _align(_PREAMBLE.size + len(header))
+
+    # Build the frame
+    chunks: List[Any] = [_PREAMBLE.pack(BINARY_MAGIC, BINARY_VERSION, 0, len(header)), header]
+    position = _PREAMBLE.size + len(header)
+    for arr, tensor in zip(arrays, tensors):
+        start = data_start + tensor["offset"]
+        chunks.append(bytes(start - position))
+        chunks.append(arr.data.cast("B") if arr.nbytes > 0 else b"")
+        position = start + arr.nbytes
+    info_start = data_start + offset
+    chunks.append(bytes(info_start - position))
+    chunks.append(info)
+    return b"".join(chunks)
+
+
+def decode_binary(data: bytes) -> Tuple[List[np.ndarray], Dict[str, Any]]:
+    """
+    Decode the parameters encoded with the binary framed format.
+
+    The returned arrays are read-only views over ``data`` (no copy is made).
+
+    Args:
+        data: The encoded parameters.
+
+    Raises:
+        DecodingParamsError: If the frame is malformed or the version is not supported.
+
+    """
+    try:
+        magic, version, _, header_len = _PREAMBLE.unpack_from(data, 0)
+        if magic != BINARY_MAGIC:
+            raise DecodingParamsError("Not a binary encoded model")
+        if version > BINARY_VERSION:
+            raise DecodingParamsError(f"Unsupported binary model version {version} (max {BINARY_VERSION})")
+        header = json.loads(bytes(data[_PREAMBLE.size : _PREAMBLE.size + header_len]))
+        data_start = _align(_PREAMBLE.size + header_len)
+
+        params = []
+        for tensor in header["tensors"]:
+            dtype = np.dtype(tensor["dtype"])
+            shape = tuple(tensor["shape"])
+            count = tensor["nbytes"] // dtype.itemsize
+            arr = np.frombuffer(data, dtype=dtype, count=count, offset=data_start + tensor["offset"])
+            params.append(arr.reshape(shape))
+
+        info_start = data_start + header["info"]["offset"]
+        additional_info = pickle.loads(data[info_start : info_start + header["info"]["nbytes"]])
+        return params, additional_info
+    except DecodingParamsError:
+        raise
+    except Exception as e:
+        raise DecodingParamsError("Error decoding binary parameters") from e
@@ -19,12 +19,26 @@
 """P2PFL model abstraction."""
 
 import copy
-import pickle
-from typing import Any, Dict, List, Optional, Tuple, Union
+import itertools
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
 
 import numpy as np
+from numpy.typing import DTypeLike
 
 from p2pfl.learning.frameworks.exceptions import DecodingParamsError
+from p2pfl.learning.frameworks.model_encoding import (
+    ModelEncoding,
+    decode_binary,
+    decode_pickle,
+    encode_binary,
+    encode_pickle,
+    is_binary,
+    supports_binary,
+)
+from p2pfl.learning.frameworks.parameters_layout import ParametersLayout
+from p2pfl.settings import Settings
+
+_versions = itertools.count(1)
 
 
 class P2PFLModel:
@@ -42,6 +56,13 @@ class P2PFLModel:
 
     """
 
+    encoding: Optional[str] = None
+    """Encoding used by this model to serialize its weights. If None, ``Settings.MODEL_ENCODING`` is used."""
+
+    _version: int = 0
+    _encoded_cache: Optional[Tuple[int, Dict[ModelEncoding, bytes], Dict[ModelEncoding, Tuple[Hashable, Any]]]] = None
+    _flat_cache: Optional[Tuple[int, np.dtype, np.ndarray, ParametersLayout]] = None
+
     def __init__(
         self,
         model: Any,
@@ -52,6 +73,9 @@ class P2PFLModel:
     ) -> None:
         """Initialize the model."""
         self.model = model
+        self._version = next(_versions)
+        self._encoded_cache = None
+        self._flat_cache = None
         self.contributors: List[str] = []
         if contributors is not None:
             self.contributors = contributors
@@ -64,39 +88,127 @@ class P2PFLModel:
         if params is not None:
             self.set_parameters(params)
 
+    def __getstate__(self) -> Dict[str, Any]:
+        """Get the state to pickle (the cached encoding and flat vector are not sent)."""
+        state = self.__dict__.copy()
+        state["_encoded_cache"] = None
+        state["_flat_cache"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore a pickled model. Versions are only unique within a process, so a new one is assigned."""
+        self.__dict__.update(state)
+        self._version = next(_versions)
+
     def get_model(self) -> Any:
         """Get the model."""
         return self.model
 
-    def encode_parameters(self, params: Optional[List[np.ndarray]] = None) -> bytes:
+    def get_encoding(self) -> ModelEncoding:
+        """Get the encoding used to serialize the weights of this model."""
+        return ModelEncoding(self.encoding if self.encoding is not None else Settings.MODEL_ENCODING)
+
+    def set_encoding(self, encoding: Union[ModelEncoding, str]) -> None:
+        """
+        Set the encoding used to serialize the weights of this model (kept on copies).
+
+        Args:
+            encoding: The encoding ("binary" or "pickle").
+
+        """
+        self.encoding = ModelEncoding(encoding).value
+
+    def encode_parameters(self, params: Optional[List[np.ndarray]] = None, encoding: Optional[ModelEncoding] = None) -> bytes:
         """
         Encode the parameters of the model.
 
+        Uses the binary framed format unless the model is configured to use pickle or the parameters
+        are not plain numeric arrays.
+
         Args:
             params: The parameters of the model.
+            encoding: The encoding to use. If None, the encoding of the model is used.
 
         """
         if params is None:
             params = self.get_parameters()
-        data_to_serialize = {
-            "params": params,
-            "additional_info": self.additional_info,
-        }
-        return pickle.dumps(data_to_serialize)
+        if encoding is None:
+            encoding = self.get_encoding()
+        if encoding == ModelEncoding.BINARY and supports_binary(params):
+            return encode_binary(params, self.additional_info)
+        return encode_pickle(params, self.additional_info)
+
+    def get_encoded_parameters(self, encoding: Optional[ModelEncoding] = None) -> bytes:
+        """
+        Get the encoded parameters of the model.
+
+        The encodings are cached until the parameters change (see ``invalidate_cache``), so the same bytes can be
+        sent to all the neighbors.
+
+        Args:
+            encoding: The encoding to use (negotiated with the neighbor). If None, the encoding of the model is used.
+
+        """
+        if encoding is None:
+            encoding = self.get_encoding()
+        cache = self.__get_encoded_cache()
+        data = cache[1].get(encoding)
+        if data is None:
+            data = self.encode_parameters(encoding=encoding)
+            cache[1][encoding] = data
+        return data
+
+    def get_encoded_message(self, key: Hashable, build_fn: Callable[[bytes], Any], encoding: Optional[ModelEncoding] = None) -> Any:
+        """
+        Get a message built from the encoded parameters of the model.
+
+        The last message built for each encoding is cached with the encoded parameters, so the same message can be sent
+        to all the neighbors while the parameters and the key do not change.
+
+        Args:
+            key: Identifies the message built (for example, the command and the round).
+            build_fn: Function to build the message from the encoded parameters.
+            encoding: The encoding to use (negotiated with the neighbor). If None, the encoding of the model is used.
+
+        """
+        if encoding is None:
+            encoding = self.get_encoding()
+        cache = self.__get_encoded_cache()
+        cached = cache[2].get(encoding)
+        if cached is None or cached[0] != key:
+            cached = (key, build_fn(self.get_encoded_parameters(encoding)))
+            cache[2][encoding] = cached
+        return cached[1]
+
+    def __get_encoded_cache(self) -> Tuple[int, Dict[ModelEncoding, bytes], Dict[ModelEncoding, Tuple[Hashable, Any]]]:
+        cache = self._encoded_cache
+        if cache is None or cache[0] != self._version:
+            cache = (self._version, {}, {})
+            self._encoded_cache = cache
+        return cache
+
+    def get_version(self) -> int:
+        """Get the version of the parameters. It is unique across models and changes every time the parameters change."""
+        return self._version
+
+    def invalidate_cache(self) -> None:
+        """Notify that the parameters (or additional info) have changed, discarding the cached encoding and flat vector."""
+        self._version = next(_versions)
+        self._encoded_cache = None
+        self._flat_cache = None
 
     def decode_parameters(self, data: bytes) -> Tuple[List[np.ndarray], Dict[str, Any]]:
         """
-        Decode the parameters of the model.
+        Decode the parameters of the model. The format is detected from the data.
 
         Args:
             data: The parameters of the model.
 
         """
+        if is_binary(data):
+            return decode_binary(data)
         try:
-            loaded_data = pickle.loads(data)
-            params = loaded_data["params"]
-            additional_info = loaded_data["additional_info"]
-            return params, additional_info
+            return decode_pickle(data)
         except Exception as e:
             raise DecodingParamsError("Error decoding parameters") from e
 
@@ -110,6 +222,45 @@ class P2PFLModel:
         """
         raise NotImplementedError
 
+    def get_flat_parameters(self, dtype: DTypeLike = np.float64) -> Tuple[np.ndarray, ParametersLayout]:
+        """
+        Get the parameters of the model as a flat contiguous vector.
+
+        The vector is built once and cached until the parameters change (see ``invalidate_cache``), so aggregations
+        can slice it without copying the layers again. It is read-only.
+
+        Args:
+            dtype: Data type of the vector.
+
+        Returns:
+            The flat vector and the layout (layer offset table) to map it back to the layers.
+
+        """
+        dtype = np.dtype(dtype)
+        cache = self._flat_cache
+        if cache is None or cache[0] != self._version or cache[1] != dtype:
+            params = self.get_parameters()
+            layout = ParametersLayout.from_parameters(params)
+            flat = layout.flatten(params, dtype=dtype)
+            flat.flags.writeable = False
+            cache = (self._version, dtype, flat, layout)
+            self._flat_cache = cache
+        return cache[2], cache[3]
+
+    def set_flat_parameters(self, flat: np.ndarray, layout: ParametersLayout) -> None:
+        """
+        Set the parameters of the model from a flat vector.
+
+        Args:
+            flat: The flat vector.
+            layout: The layout of the vector.
+
+        Raises:
+            ModelNotMatchingError: If parameters don't match the model.
+
+        """
+        self.set_parameters(layout.unflatten(flat))
+
     def set_parameters(self, params: Union[List[np.ndarray], bytes]) -> None:
         """
         Set the parameters of the model.
@@ -120,6 +271,9 @@ class P2PFLModel:
         Raises:
             ModelNotMatchingError: If parameters don't match the model.
 
+        Note:
+            Implementations must call ``invalidate_cache`` once the parameters are set.
+
         """
         raise NotImplementedError
 
@@ -133,6 +287,7 @@ class P2PFLModel:
 
         """
         self.additional_info[callback] = info
+        self.invalidate_cache()
 
     def get_info(self, callback: Optional[str] = None) -> Any:
         """
@@ -182,7 +337,9 @@ class P2PFLModel:
             A copy of the model.
 
         """
-        return self.__class__(copy.deepcopy(self.model), **kwargs)
+        model_copy = self.__class__(copy.deepcopy(self.model), **kwargs)
+        model_copy.encoding = self.encoding
+        return model_copy
 
     def get_framework(self) -> str:
         """
@@ -0,0 +1,120 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Flat (single buffer) representation of the parameters of a model."""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+
+class ParametersLayout:
+    """
+    Offset table to map a list of per-layer parameters to a flat contiguous vector and back.
+
+    It allows aggregators to operate over the whole model with a single vectorized operation instead of looping
+    over the layers.
+
+    Args:
+        shapes: Shape of each layer.
+        dtypes: Data type of each layer.
+
+    """
+
+    def __init__(self, shapes: List[Tuple[int, ...]], dtypes: List[np.dtype]) -> None:
+        """Initialize the layout."""
+        self.shapes = shapes
+        self.dtypes = dtypes
+        self.sizes = [int(np.prod(shape, dtype=np.int64)) for shape in shapes]
+        self.offsets = np.concatenate([[0], np.cumsum(self.sizes, dtype=np.int64)]).tolist()
+        self.size: int = self.offsets[-1]
+
+    @classmethod
+    def from_parameters(cls, params: List[np.ndarray]) -> "ParametersLayout":
+        """
+        Build the layout of a list of parameters.
+
+        Args:
+            params: The parameters (one array per layer).
+
+        """
+        arrays = [np.asarray(p) for p in params]
+        return cls([a.shape for a in arrays], [a.dtype for a in arrays])
+
+    def __len__(self) -> int:
+        """Get the number of layers."""
+        return len(self.shapes)
+
+    def __eq__(self, other: object) -> bool:
+        """Check if two layouts have the same shapes."""
+        if not isinstance(other, ParametersLayout):
+            return NotImplemented
+        return self.shapes == other.shapes
+
+    def layer_slice(self, index: int) -> slice:
+        """
+        Get the slice of a layer in the flat vector.
+
+        Args:
+            index: Index of the layer.
+
+        """
+        return slice(self.offsets[index], self.offsets[index + 1])
+
+    def flatten(self, params: List[np.ndarray], dtype: DTypeLike = np.float64, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Copy the parameters into a flat contiguous vector.
+
+        Args:
+            params: The parameters (one array per layer), matching the layout.
+            dtype: Data type of the vector (ignored if ``out`` is given).
+            out: Preallocated vector to write into.
+
+        Raises:
+            ValueError: If the parameters do not match the layout.
+
+        """
+        if len(params) != len(self.shapes):
+            raise ValueError(f"Expected {len(self.shapes)} layers, got {len(params)}")
+        if out is None:
+            out = np.empty(self.size, dtype=dtype)
+        for i, layer in enumerate(params):
+            layer = np.asarray(layer)
+            if layer.shape != self.shapes[i]:
+                raise ValueError(f"Layer {i} shape {layer.shape} does not match {self.shapes[i]}")
+            out[self.layer_slice(i)] = layer.reshape(-1)
+        return out
+
+    def unflatten(self, flat: np.ndarray, cast: bool = True) -> List[np.ndarray]:
+        """
+        Split a flat vector into per-layer arrays.
+
+        Args:
+            flat: The flat vector.
+            cast: If True, floating layers are cast back to their original dtype. Otherwise, views over ``flat``
+                are returned.
+
+        """
+        params = []
+        for i, shape in enumerate(self.shapes):
+            layer = flat[self.layer_slice(i)].reshape(shape)
+            if cast and np.issubdtype(self.dtypes[i], np.floating):
+                layer = layer.astype(self.dtypes[i], copy=False)
+            params.append(layer)
+        return params
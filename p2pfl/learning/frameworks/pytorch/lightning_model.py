@@ -27,6 +27,7 @@ from torchmetrics import Accuracy, Metric
 
 from p2pfl.learning.frameworks import Framework
 from p2pfl.learning.frameworks.exceptions import ModelNotMatchingError
+from p2pfl.learning.frameworks.model_encoding import BYTES_LIKE
 from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
 
 #########################
@@ -80,7 +81,7 @@ class LightningModel(P2PFLModel):
 
         """
         # Decode parameters
-        if isinstance(params, bytes):
+        if isinstance(params, BYTES_LIKE):
             params, additional_info = self.decode_parameters(params)
             self.additional_info.update(additional_info)
 
@@ -96,6 +97,7 @@ class LightningModel(P2PFLModel):
             self.model.load_state_dict(state_dict)
         except Exception as e:
             raise ModelNotMatchingError("Not matching models") from e
+        self.invalidate_cache()
 
     def get_framework(self) -> str:
         """
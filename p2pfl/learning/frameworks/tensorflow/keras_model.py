@@ -28,6 +28,7 @@ from tensorflow.keras.optimizers import Adam  # type: ignore
 
 from p2pfl.learning.frameworks import Framework
 from p2pfl.learning.frameworks.exceptions import ModelNotMatchingError
+from p2pfl.learning.frameworks.model_encoding import BYTES_LIKE
 from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
 
 #####################
@@ -92,7 +93,7 @@ class KerasModel(P2PFLModel):
             ModelNotMatchingError: If parameters don't match the model.
 
         """
-        if isinstance(params, bytes):
+        if isinstance(params, BYTES_LIKE):
             params, additional_info = self.decode_parameters(params)
             self.additional_info.update(additional_info)
 
@@ -101,6 +102,7 @@ class KerasModel(P2PFLModel):
             self.model.set_weights(params)
         except ValueError as e:
             raise ModelNotMatchingError("Parameters don't match the model. Please check the model architecture and the parameters.") from e
+        self.invalidate_cache()
 
     def get_framework(self) -> str:
         """
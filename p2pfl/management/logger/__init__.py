@@ -20,9 +20,11 @@
 
 from p2pfl.management.logger.decorators.async_logger import AsyncLogger
 from p2pfl.management.logger.decorators.file_logger import FileLogger
+from p2pfl.management.logger.decorators.ring_buffer_logger import RingBufferLogger
 from p2pfl.management.logger.decorators.singleton_logger import SingletonLogger
 from p2pfl.management.logger.decorators.web_logger import WebP2PFLogger
 from p2pfl.management.logger.logger import P2PFLogger
+from p2pfl.settings import Settings
 from p2pfl.utils.check_ray import ray_installed
 
 # Check if 'ray' is installed in the Python environment
@@ -31,5 +33,9 @@ if ray_installed():
 
     # Logger actor singleton
     logger = SingletonLogger(RayP2PFLogger(WebP2PFLogger(FileLogger(P2PFLogger(disable_locks=True)))))
-else:
+elif Settings.LOG_ASYNC_BACKEND == "queue":
     logger = SingletonLogger(WebP2PFLogger(FileLogger(AsyncLogger(P2PFLogger(disable_locks=False)))))
+elif Settings.LOG_ASYNC_BACKEND == "ring_buffer":
+    logger = SingletonLogger(WebP2PFLogger(FileLogger(RingBufferLogger(P2PFLogger(disable_locks=False)))))
+else:
+    raise ValueError(f"Unknown async logging backend: {Settings.LOG_ASYNC_BACKEND}")
@@ -92,6 +92,16 @@ class LoggerDecorator(P2PFLogger):
         """
         return self._p2pfl_logger.get_level_name(lvl)
 
+    def is_enabled_for(self, level: int) -> bool:
+        """
+        Check if a level is going to be logged.
+
+        Args:
+            level: The log level.
+
+        """
+        return self._p2pfl_logger.is_enabled_for(level)
+
     def log(self, level: int, node: str, message: str) -> None:
         """
         Log a message.
@@ -17,9 +17,12 @@
 #
 """Ray logger decorator."""
 
+import atexit
 import datetime
 import logging
-from typing import Any, Dict, Union
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import ray
 
@@ -27,17 +30,47 @@ from p2pfl.experiment import Experiment
 from p2pfl.management.logger.decorators.logger_decorator import LoggerDecorator
 from p2pfl.management.logger.logger import P2PFLogger
 from p2pfl.management.metric_storage import GlobalLogsType, LocalLogsType
+from p2pfl.settings import Settings
+
+BufferedCall = Tuple[str, Tuple[Any, ...]]
 
 
 @ray.remote
 class RayP2PFLoggerActor(LoggerDecorator):
     """Actor to add remote logging capabilities to a logger class."""
 
-    pass
+    def log_batch(self, calls: List[BufferedCall]) -> int:
+        """
+        Apply a batch of buffered logging calls.
+
+        Args:
+            calls: Method names and arguments, in order.
+
+        Returns:
+            The logger level, so that the clients can filter locally.
+
+        """
+        for method, args in calls:
+            # One bad record must not drop the rest of the batch (as with independent remote calls), but it is reported
+            # through the standard logger of the actor (the wrapped logger may be the one failing)
+            try:
+                getattr(self, method)(*args)
+            except Exception:
+                logging.getLogger("p2pfl").exception(f"Ray logger actor failed to apply a buffered {method} call")
+        return self.get_level()
 
 
 class RayP2PFLogger(P2PFLogger):
-    """Wrapper to add remote logging capabilities to a logger class."""
+    """
+    Wrapper to add remote logging capabilities to a logger class.
+
+    Logs and metrics are filtered by level locally and buffered, and the buffer is flushed to the actor in a single
+    remote call every ``Settings.RAY_LOG_FLUSH_INTERVAL`` seconds or when it reaches ``Settings.RAY_LOG_BATCH_SIZE``
+    records. Any other call flushes the buffer first, so the actor sees every call in order.
+
+    The level is kept locally to filter the logs. It is fetched on first use and then refreshed with the level returned
+    by each batch (or every ``Settings.RAY_LOG_LEVEL_REFRESH_INTERVAL`` seconds without batches).
+    """
 
     def __init__(self, p2pflogger: P2PFLogger):
         """
@@ -51,6 +84,62 @@ class RayP2PFLogger(P2PFLogger):
             name="p2pfl_logger", lifetime="detached", get_if_exists=True
         ).remote(p2pflogger)
 
+        # Level (fetched on first use)
+        self._level: Optional[int] = None
+        self.__pending_level: Optional[ray.ObjectRef] = None
+        self.__level_requested = 0.0
+        self.__request_level()
+
+        # Buffer
+        self.__buffer: List[BufferedCall] = []
+        self.__buffer_lock = threading.Lock()
+
+        # Periodic flush
+        self.__flusher = threading.Thread(target=self.__flush_periodically, name="ray-logger-flusher", daemon=True)
+        self.__flusher.start()
+        atexit.register(self.flush)
+
+    def __enqueue(self, method: str, *args: Any) -> None:
+        with self.__buffer_lock:
+            self.__buffer.append((method, args))
+            full = len(self.__buffer) >= Settings.RAY_LOG_BATCH_SIZE
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """Send the buffered logs and metrics to the actor (without waiting)."""
+        with self.__buffer_lock:
+            if not self.__buffer:
+                return
+            batch, self.__buffer = self.__buffer, []
+            # Sent under the lock to keep the order between concurrent flushes
+            level_ref = self.ray_actor.log_batch.remote(batch)
+        self.__pending_level = level_ref
+        self.__level_requested = time.monotonic()
+
+    def __request_level(self) -> None:
+        self.__pending_level = self.ray_actor.get_level.remote()
+        self.__level_requested = time.monotonic()
+
+    def __update_level(self, wait: bool = False) -> None:
+        # Pick up the level returned by the last request (changes made from other processes)
+        pending = self.__pending_level
+        if pending is not None:
+            ready, _ = ray.wait([pending], timeout=None if wait else 0)
+            if ready:
+                self._level = ray.get(ready[0])
+                if self.__pending_level is pending:
+                    self.__pending_level = None
+
+    def __flush_periodically(self) -> None:
+        while True:
+            time.sleep(Settings.RAY_LOG_FLUSH_INTERVAL)
+            self.__update_level()
+            self.flush()
+            # Without batches, the level is refreshed from time to time
+            if self.__pending_level is None and time.monotonic() - self.__level_requested > Settings.RAY_LOG_LEVEL_REFRESH_INTERVAL:
+                self.__request_level()
+
     def connect_web(self, url: str, key: str) -> None:
         """
         Connect to the web services.
@@ -60,10 +149,12 @@ class RayP2PFLogger(P2PFLogger):
             key: The API key.
 
         """
+        self.flush()
         self.ray_actor.connect_web.remote(url, key)
 
     def cleanup(self) -> None:
         """Cleanup the logger."""
+        self.flush()
         self.ray_actor.cleanup.remote()
 
     def set_level(self, level: Union[int, str]) -> None:
@@ -74,7 +165,11 @@ class RayP2PFLogger(P2PFLogger):
             level: The logger level.
 
         """
+        self.flush()
         self.ray_actor.set_level.remote(level)
+        # The level returned by the previous requests is outdated
+        self.__pending_level = None
+        self._level = logging.getLevelName(level) if isinstance(level, str) else level
 
     def get_level(self) -> int:
         """
@@ -84,7 +179,10 @@ class RayP2PFLogger(P2PFLogger):
             The logger level.
 
         """
-        return ray.get(self.ray_actor.get_level.remote())
+        self.flush()
+        self._level = ray.get(self.ray_actor.get_level.remote())
+        self.__pending_level = None
+        return self._level
 
     def get_level_name(self, lvl: int) -> str:
         """
@@ -99,6 +197,18 @@ class RayP2PFLogger(P2PFLogger):
         """
         return ray.get(self.ray_actor.get_level_name.remote(lvl))
 
+    def is_enabled_for(self, level: int) -> bool:
+        """
+        Check if a level is going to be logged (with the local copy of the level, without remote calls).
+
+        Args:
+            level: The log level.
+
+        """
+        if self._level is None:
+            self.__update_level(wait=True)
+        return level >= (self._level if self._level is not None else logging.NOTSET)
+
     def log(self, level: int, node: str, message: str) -> None:
         """
         Log a message.
@@ -109,7 +219,9 @@ class RayP2PFLogger(P2PFLogger):
             message: The message to log.
 
         """
-        self.ray_actor.log.remote(level, node, message)
+        if not self.is_enabled_for(level):
+            return
+        self.__enqueue("log", level, node, message)
 
     def log_metric(self, addr: str, metric: str, value: float, round: int | None = None, step: int | None = None) -> None:
         """
@@ -123,7 +235,7 @@ class RayP2PFLogger(P2PFLogger):
             round: The round.
 
         """
-        self.ray_actor.log_metric.remote(addr, metric, value, round, step)
+        self.__enqueue("log_metric", addr, metric, value, round, step)
 
     def get_local_logs(self) -> LocalLogsType:
         """
@@ -137,6 +249,7 @@ class RayP2PFLogger(P2PFLogger):
             The logs.
 
         """
+        self.flush()
         return ray.get(self.ray_actor.get_local_logs.remote())
 
     def get_global_logs(self) -> GlobalLogsType:
@@ -151,6 +264,7 @@ class RayP2PFLogger(P2PFLogger):
             The logs.
 
         """
+        self.flush()
         return ray.get(self.ray_actor.get_global_logs.remote())
 
     def register_node(self, node: str, simulation: bool) -> None:
@@ -162,6 +276,7 @@ class RayP2PFLogger(P2PFLogger):
             simulation: If the node is a simulation.
 
         """
+        self.flush()
         self.ray_actor.register_node.remote(node, simulation)
 
     def unregister_node(self, node: str) -> None:
@@ -172,6 +287,7 @@ class RayP2PFLogger(P2PFLogger):
             node: The node address.
 
         """
+        self.flush()
         self.ray_actor.unregister_node.remote(node)
 
     def experiment_started(self, node: str, experiment: Experiment | None) -> None:
@@ -183,6 +299,7 @@ class RayP2PFLogger(P2PFLogger):
             experiment: The experiment.
 
         """
+        self.flush()
         self.ray_actor.experiment_started.remote(node, experiment)
 
     def experiment_finished(self, node: str) -> None:
@@ -193,6 +310,7 @@ class RayP2PFLogger(P2PFLogger):
             node: The node address.
 
         """
+        self.flush()
         self.ray_actor.experiment_finished.remote(node)
 
     def round_started(self, node: str, experiment: Experiment | None) -> None:
@@ -204,6 +322,7 @@ class RayP2PFLogger(P2PFLogger):
             experiment: The experiment.
 
         """
+        self.flush()
         self.ray_actor.round_started.remote(node, experiment)
 
     def round_finished(self, node: str) -> None:
@@ -214,6 +333,7 @@ class RayP2PFLogger(P2PFLogger):
             node: The node address.
 
         """
+        self.flush()
         self.ray_actor.round_finished.remote(node)
 
     def get_nodes(self) -> Dict[str, Dict[Any, Any]]:
@@ -224,6 +344,7 @@ class RayP2PFLogger(P2PFLogger):
             The registered nodes.
 
         """
+        self.flush()
         return ray.get(self.ray_actor.get_nodes.remote())
 
     def add_handler(self, handler: logging.Handler) -> None:
@@ -234,6 +355,7 @@ class RayP2PFLogger(P2PFLogger):
             handler: The handler to add.
 
         """
+        self.flush()
         self.ray_actor.add_handler.remote(handler)
 
     def log_system_metric(self, node: str, metric: str, value: float, time: datetime.datetime) -> None:
@@ -247,4 +369,4 @@ class RayP2PFLogger(P2PFLogger):
             time: The time.
 
         """
-        self.ray_actor.log_system_metric.remote(node, metric, value, time)
+        self.__enqueue("log_system_metric", node, metric, value, time)
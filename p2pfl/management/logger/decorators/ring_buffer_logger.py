@@ -0,0 +1,234 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+"""In-process async logger."""
+
+import atexit
+import contextlib
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Mapping, Optional
+
+from p2pfl.management.logger.decorators.logger_decorator import LoggerDecorator
+from p2pfl.management.logger.logger import P2PFLogger
+from p2pfl.settings import Settings
+
+OVERFLOW_POLICIES = ("block", "drop", "sample")
+
+# Arguments of the records formatted by the consumer thread (the rest are formatted by the producer)
+PRIMITIVE_TYPES = (str, int, float, bytes, type(None))
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Logging handler that puts the records in a bounded buffer, consumed by a thread of the same process.
+
+    Records are not copied nor pickled. ``handle`` does not take the handler lock: the producers only append to a
+    ``deque`` (atomic), so they do not contend on locks unless the buffer is full (or half full with the "sample"
+    policy), where a lock guards the counters and, with the "block" policy, the wait. As the size is checked without the
+    lock, the "block" policy may exceed the capacity by the number of concurrent producers.
+
+    Records with arguments that are not primitive values (str, numbers, bytes, None) are formatted by the producer, as
+    the consumer thread may format them later, when the objects could have changed. The rest stay lazy.
+
+    Overflow policies:
+
+    - "block": wait until the consumer makes room.
+    - "drop": drop the oldest records.
+    - "sample": once the buffer is half full, keep only one of every ``sample_every`` records below WARNING. If it gets
+      full, drop the oldest records.
+
+    Args:
+        capacity: Maximum records in the buffer.
+        overflow: Overflow policy.
+        sample_every: Records below WARNING kept when sampling (one of every ``sample_every``).
+
+    """
+
+    def __init__(self, capacity: int, overflow: str = "drop", sample_every: int = 10) -> None:
+        """Initialize the handler."""
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}. Use one of {OVERFLOW_POLICIES}")
+        super().__init__()
+        self.capacity = capacity
+        self.overflow = overflow
+        self.sample_every = sample_every
+        self.buffer: Deque[logging.LogRecord] = deque(maxlen=None if overflow == "block" else capacity)
+        self.not_empty = threading.Event()
+        self.not_full = threading.Condition()
+        # Counters (only updated on overflow)
+        self.dropped = 0
+        self.sampled_out = 0
+        self.__sample_count = 0
+        self.__counters_lock = threading.Lock()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        """
+        Filter and emit a record, without taking the handler lock (``emit`` is thread-safe).
+
+        Args:
+            record: The log record.
+
+        Returns:
+            Whether the record passed the filters.
+
+        """
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv
+        if rv:
+            self.emit(record)
+        return bool(rv)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Put a record in the buffer.
+
+        Args:
+            record: The log record.
+
+        """
+        self.__freeze_args(record)
+        size = len(self.buffer)
+        if self.overflow == "block":
+            if size >= self.capacity:
+                with self.not_full:
+                    self.not_full.wait_for(lambda: len(self.buffer) < self.capacity)
+                    self.buffer.append(record)
+                self.not_empty.set()
+                return
+        else:
+            if self.overflow == "sample" and size >= self.capacity // 2 and record.levelno < logging.WARNING:
+                with self.__counters_lock:
+                    self.__sample_count += 1
+                    if self.__sample_count % self.sample_every != 0:
+                        self.sampled_out += 1
+                        return
+            if size >= self.capacity:
+                with self.__counters_lock:
+                    self.dropped += 1
+        self.buffer.append(record)
+        if not self.not_empty.is_set():
+            self.not_empty.set()
+
+    @staticmethod
+    def __freeze_args(record: logging.LogRecord) -> None:
+        # Format the message now if the arguments may change before the consumer formats it
+        args = record.args
+        if not args:
+            return
+        values = args.values() if isinstance(args, Mapping) else args
+        if all(isinstance(v, PRIMITIVE_TYPES) for v in values):
+            return
+        record.msg = record.getMessage()
+        record.args = None
+
+
+class RingBufferLogger(LoggerDecorator):
+    """
+    Async logger decorator that keeps the records in the process (see ``RingBufferHandler``).
+
+    The handlers added to the logger run in a dedicated consumer thread, as with ``AsyncLogger``, but without the
+    pickling and pipe I/O of a ``multiprocessing.Queue``.
+
+    Args:
+        p2pflogger: The logger to wrap.
+        capacity: Maximum buffered records (``Settings.LOG_BUFFER_SIZE`` by default).
+        overflow: Overflow policy (``Settings.LOG_BUFFER_OVERFLOW`` by default).
+
+    """
+
+    def __init__(self, p2pflogger: P2PFLogger, capacity: Optional[int] = None, overflow: Optional[str] = None) -> None:
+        """Initialize the logger."""
+        super().__init__(p2pflogger)
+        self.__handlers: List[logging.Handler] = []
+
+        # Buffer
+        self.buffer_handler = RingBufferHandler(
+            capacity if capacity is not None else Settings.LOG_BUFFER_SIZE,
+            overflow if overflow is not None else Settings.LOG_BUFFER_OVERFLOW,
+            Settings.LOG_BUFFER_SAMPLE_EVERY,
+        )
+        self._p2pfl_logger.add_handler(self.buffer_handler)
+
+        # Consumer
+        self.__running = True
+        self.__consumer = threading.Thread(target=self.__consume, name="p2pfl-log-consumer", daemon=True)
+        self.__consumer.start()
+
+        # Register cleanup function to drain the buffer on exit
+        atexit.register(self.cleanup)
+
+    def __consume(self) -> None:
+        buffer = self.buffer_handler.buffer
+        while self.__running or buffer:
+            self.buffer_handler.not_empty.wait(timeout=1)
+            # Clear before draining, so that any record appended from now on sets it again
+            self.buffer_handler.not_empty.clear()
+            while buffer:
+                for record in self.__drain():
+                    for handler in self.__handlers:
+                        if record.levelno >= handler.level:
+                            handler.handle(record)
+
+    def __drain(self) -> List[logging.LogRecord]:
+        # Take all the buffered records at once (blocked producers are woken up once per batch)
+        buffer = self.buffer_handler.buffer
+        if self.buffer_handler.overflow == "block":
+            with self.buffer_handler.not_full:
+                batch = [buffer.popleft() for _ in range(len(buffer))]
+                self.buffer_handler.not_full.notify_all()
+            return batch
+        batch = []
+        # Producers may drop the oldest records meanwhile
+        with contextlib.suppress(IndexError):
+            for _ in range(len(buffer)):
+                batch.append(buffer.popleft())
+        return batch
+
+    def add_handler(self, handler: logging.Handler) -> None:
+        """
+        Add a handler (run by the consumer thread).
+
+        Args:
+            handler: The handler to add.
+
+        """
+        self.__handlers = self.__handlers + [handler]
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get the counters of the buffer.
+
+        Returns:
+            Buffered, dropped (overflow) and sampled out records.
+
+        """
+        return {
+            "buffered": len(self.buffer_handler.buffer),
+            "dropped": self.buffer_handler.dropped,
+            "sampled_out": self.buffer_handler.sampled_out,
+        }
+
+    def cleanup(self) -> None:
+        """Cleanup the logger (handling the buffered records)."""
+        if self.__running:
+            self.__running = False
+            self.buffer_handler.not_empty.set()
+            self.__consumer.join()
+        super().cleanup()
@@ -112,6 +112,12 @@ class WebP2PFLogger(LoggerDecorator):
         self._p2pfl_web_services = P2pflWebServices(url, key)
         self.add_handler(P2pflWebLogHandler(self._p2pfl_web_services))
 
+    def cleanup(self) -> None:
+        """Cleanup the logger (uploading the pending logs and metrics)."""
+        if self._p2pfl_web_services is not None:
+            self._p2pfl_web_services.close()
+        super().cleanup()
+
     def log_metric(self, addr: str, metric: str, value: float, round: int | None = None, step: int | None = None) -> None:
         """
         Log a metric.
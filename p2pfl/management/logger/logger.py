@@ -25,10 +25,19 @@ P2PFL Logger.
 
 import datetime
 import logging
-from typing import Any, Dict, Optional, Union
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Union
 
 from p2pfl.experiment import Experiment
-from p2pfl.management.metric_storage import GlobalLogsType, GlobalMetricStorage, LocalLogsType, LocalMetricStorage
+from p2pfl.management.metric_storage import (
+    ColumnarGlobalMetricStorage,
+    ColumnarLocalMetricStorage,
+    GlobalLogsType,
+    GlobalMetricStorage,
+    LocalLogsType,
+    LocalMetricStorage,
+)
 from p2pfl.settings import Settings
 
 ###################
@@ -79,6 +88,69 @@ class ColoredFormatter(logging.Formatter):
         return super().format(record)
 
 
+##########################
+#    Lazy log messages    #
+##########################
+
+LogMessage = Union[str, Callable[[], str]]
+"""A log message, or a callable that builds it (only called if the message is going to be logged)."""
+
+
+def format_message(message: LogMessage, args: tuple) -> str:
+    """
+    Build a lazy log message.
+
+    Args:
+        message: The message (%-style if args are given) or a callable that builds it.
+        args: The %-style arguments of the message.
+
+    """
+    if callable(message):
+        message = message()
+    return message % args if args else message
+
+
+class LogSampler:
+    """
+    Count the occurrences of messages to log only one of every N.
+
+    Only the counters of the ``max_keys`` most recently sampled messages are kept (a forgotten message starts again
+    from its first occurrence, which is logged).
+
+    Args:
+        max_keys: Maximum number of counters.
+
+    """
+
+    def __init__(self, max_keys: int = 1024) -> None:
+        """Initialize the sampler."""
+        self.max_keys = max_keys
+        self.__counts: OrderedDict[Hashable, int] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def sample(self, key: Hashable, every: int) -> bool:
+        """
+        Count an occurrence of a message.
+
+        Args:
+            key: Key of the message.
+            every: Log one of every ``every`` occurrences.
+
+        Returns:
+            True if the occurrence has to be logged.
+
+        """
+        with self.__lock:
+            count = self.__counts.get(key, 0)
+            self.__counts[key] = count + 1
+            self.__counts.move_to_end(key)
+            if len(self.__counts) > self.max_keys:
+                self.__counts.popitem(last=False)
+        return count % every == 0
+
+
+_sampler = LogSampler()
+
 ################
 #    Logger    #
 ################
@@ -99,8 +171,16 @@ class P2PFLogger:
         self._nodes: Dict[str, Dict[Any, Any]] = nodes if nodes else {}
 
         # Experiment Metrics
-        self.local_metrics = LocalMetricStorage(disable_locks=disable_locks)
-        self.global_metrics = GlobalMetricStorage(disable_locks=disable_locks)
+        self.local_metrics: Union[LocalMetricStorage, ColumnarLocalMetricStorage]
+        self.global_metrics: Union[GlobalMetricStorage, ColumnarGlobalMetricStorage]
+        if Settings.METRIC_STORAGE == "columnar":
+            self.local_metrics = ColumnarLocalMetricStorage(disable_locks=disable_locks)
+            self.global_metrics = ColumnarGlobalMetricStorage(disable_locks=disable_locks)
+        elif Settings.METRIC_STORAGE == "dict":
+            self.local_metrics = LocalMetricStorage(disable_locks=disable_locks)
+            self.global_metrics = GlobalMetricStorage(disable_locks=disable_locks)
+        else:
+            raise ValueError(f"Unknown metric storage: {Settings.METRIC_STORAGE}")
 
         # Python logging
         self._logger = logging.getLogger("p2pfl")
@@ -180,60 +260,101 @@ class P2PFLogger:
         """
         return logging.getLevelName(lvl)
 
-    def info(self, node: str, message: str) -> None:
+    def info(self, node: str, message: LogMessage, *args: Any, every: int = 1) -> None:
         """
         Log an info message.
 
         Args:
             node: The node name.
-            message: The message to log.
+            message: The message to log (see ``lazy_log``).
+            args: The %-style arguments of the message.
+            every: Log only one of every ``every`` occurrences of the message.
 
         """
-        self.log(logging.INFO, node, message)
+        self.lazy_log(logging.INFO, node, message, *args, every=every)
 
-    def debug(self, node: str, message: str) -> None:
+    def debug(self, node: str, message: LogMessage, *args: Any, every: int = 1) -> None:
         """
         Log a debug message.
 
         Args:
             node: The node name.
-            message: The message to log.
+            message: The message to log (see ``lazy_log``).
+            args: The %-style arguments of the message.
+            every: Log only one of every ``every`` occurrences of the message.
 
         """
-        self.log(logging.DEBUG, node, message)
+        self.lazy_log(logging.DEBUG, node, message, *args, every=every)
 
-    def warning(self, node: str, message: str) -> None:
+    def warning(self, node: str, message: LogMessage, *args: Any, every: int = 1) -> None:
         """
         Log a warning message.
 
         Args:
             node: The node name.
-            message: The message to log.
+            message: The message to log (see ``lazy_log``).
+            args: The %-style arguments of the message.
+            every: Log only one of every ``every`` occurrences of the message.
 
         """
-        self.log(logging.WARNING, node, message)
+        self.lazy_log(logging.WARNING, node, message, *args, every=every)
 
-    def error(self, node: str, message: str) -> None:
+    def error(self, node: str, message: LogMessage, *args: Any, every: int = 1) -> None:
         """
         Log an error message.
 
         Args:
             node: The node name.
-            message: The message to log.
+            message: The message to log (see ``lazy_log``).
+            args: The %-style arguments of the message.
+            every: Log only one of every ``every`` occurrences of the message.
 
         """
-        self.log(logging.ERROR, node, message)
+        self.lazy_log(logging.ERROR, node, message, *args, every=every)
 
-    def critical(self, node: str, message: str) -> None:
+    def critical(self, node: str, message: LogMessage, *args: Any, every: int = 1) -> None:
         """
         Log a critical message.
 
         Args:
             node: The node name.
-            message: The message to log.
+            message: The message to log (see ``lazy_log``).
+            args: The %-style arguments of the message.
+            every: Log only one of every ``every`` occurrences of the message.
+
+        """
+        self.lazy_log(logging.CRITICAL, node, message, *args, every=every)
 
+    def is_enabled_for(self, level: int) -> bool:
         """
-        self.log(logging.CRITICAL, node, message)
+        Check if a level is going to be logged.
+
+        Args:
+            level: The log level.
+
+        """
+        return self._logger.isEnabledFor(level)
+
+    def lazy_log(self, level: int, node: str, message: LogMessage, *args: Any, every: int = 1) -> None:
+        """
+        Log a message, building it only if the level is enabled.
+
+        Args:
+            level: The log level.
+            node: The node name.
+            message: The message (%-style if args are given) or a callable that builds it.
+            args: The %-style arguments of the message.
+            every: Log only one of every ``every`` occurrences of the message (per node and call site).
+
+        """
+        if not self.is_enabled_for(level):
+            return
+        if every > 1:
+            # Lambdas are created on each call, but they share the code object of their call site
+            key = (level, node, message if isinstance(message, str) else getattr(message, "__code__", message))
+            if not _sampler.sample(key, every):
+                return
+        self.log(level, node, format_message(message, args))
 
     def log(self, level: int, node: str, message: str) -> None:
         """
@@ -16,10 +16,18 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 #
 
-"""Metric storage."""
+"""
+Metric storage.
 
+There are two backends: nested dictionaries (``LocalMetricStorage`` and ``GlobalMetricStorage``) and NumPy columns
+(``ColumnarLocalMetricStorage`` and ``ColumnarGlobalMetricStorage``), selected with ``Settings.METRIC_STORAGE``.
+"""
+
+from contextlib import nullcontext
 from threading import Lock
-from typing import Dict, List, Tuple, Union
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
 
 MetricsType = Dict[str, List[Tuple[int, float]]]  # Metric name -> [(step, value)...]
 NodeLogsType = Dict[str, MetricsType]  # Node name -> MetricsType
@@ -249,3 +257,375 @@ class GlobalMetricStorage:
 
         """
         return self.exp_dicts[exp][node]
+
+
+##########################
+#    Columnar storage    #
+##########################
+
+
+class MetricSeries:
+    """
+    Growable columns (NumPy arrays) with the values of a metric and their integer keys (round, step...).
+
+    Appends go to a small buffer that is written to the arrays in chunks, and the arrays double their capacity when
+    full, so appends are amortized O(1).
+
+    Args:
+        keys: Names of the key columns.
+        capacity: Initial capacity.
+
+    """
+
+    CHUNK_SIZE = 1024
+    """Buffered appends written to the arrays at once."""
+
+    def __init__(self, keys: Sequence[str], capacity: int = 16) -> None:
+        """Initialize the series."""
+        self.keys = tuple(keys)
+        self.__size = 0
+        self.__keys = np.empty((capacity, len(self.keys)), dtype=np.int64)
+        self.__values = np.empty(capacity, dtype=np.float64)
+        self.__pending_keys: List[Sequence[int]] = []
+        self.__pending_values: List[Union[int, float]] = []
+
+    @property
+    def size(self) -> int:
+        """Number of entries."""
+        return self.__size + len(self.__pending_values)
+
+    def append(self, keys: Sequence[int], value: Union[int, float]) -> None:
+        """
+        Append a value.
+
+        Args:
+            keys: Value of each key column.
+            value: Value of the metric.
+
+        """
+        self.__pending_keys.append(keys)
+        self.__pending_values.append(value)
+        if len(self.__pending_values) >= self.CHUNK_SIZE:
+            self.__write_pending()
+
+    def __write_pending(self) -> None:
+        n = len(self.__pending_values)
+        if n == 0:
+            return
+        if self.__size + n > len(self.__values):
+            capacity = max(2 * len(self.__values), self.__size + n, 16)
+            self.__keys = np.resize(self.__keys, (capacity, len(self.keys)))
+            self.__values = np.resize(self.__values, capacity)
+        self.__keys[self.__size : self.__size + n] = self.__pending_keys
+        self.__values[self.__size : self.__size + n] = self.__pending_values
+        self.__size += n
+        self.__pending_keys = []
+        self.__pending_values = []
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get a column (a view, valid until the next append).
+
+        Args:
+            name: Name of a key column or "value".
+
+        """
+        self.__write_pending()
+        if name == "value":
+            return self.__values[: self.__size]
+        return self.__keys[: self.__size, self.keys.index(name)]
+
+    def query(self, **ranges: Tuple[int, int]) -> Dict[str, np.ndarray]:
+        """
+        Get the entries whose keys are in the given ranges.
+
+        Args:
+            ranges: Half-open range (start, stop) for some key columns, e.g. ``round=(0, 10)``.
+
+        Returns:
+            The columns (copies) of the selected entries.
+
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for name, (start, stop) in ranges.items():
+            col = self.column(name)
+            mask &= (col >= start) & (col < stop)
+        return {name: self.column(name)[mask] for name in (*self.keys, "value")}
+
+
+class _ColumnarMetricStorage:
+    """Metric storage with a ``MetricSeries`` per (experiment, node, metric)."""
+
+    KEYS: Tuple[str, ...] = ()
+
+    def __init__(self, disable_locks: bool = False) -> None:
+        self.series: Dict[Tuple[str, str, str], MetricSeries] = {}
+        self.lock = Lock() if not disable_locks else None
+
+    def _get_series(self, exp_name: str, node: str, metric: str) -> MetricSeries:
+        key = (exp_name, node, metric)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = MetricSeries(self.KEYS)
+        return series
+
+    def _select(
+        self, exp: Optional[str] = None, node: Optional[str] = None, **ranges: Tuple[int, int]
+    ) -> List[Tuple[Tuple[str, str, str], Dict[str, np.ndarray]]]:
+        # Copies of the selected entries of each series, taken under the lock (reading a series writes its appends)
+        with self.lock if self.lock else nullcontext():
+            return [
+                (k, s.query(**ranges)) for k, s in self.series.items() if (exp is None or k[0] == exp) and (node is None or k[1] == node)
+            ]
+
+    def query(self, exp: str, node: str, metric: str, **ranges: Tuple[int, int]) -> Dict[str, np.ndarray]:
+        """
+        Get the entries of a metric of a node with vectorized range filters.
+
+        Args:
+            exp: Experiment name.
+            node: Node name.
+            metric: Metric name.
+            ranges: Half-open range (start, stop) for some key columns, e.g. ``round=(0, 10)``.
+
+        Returns:
+            The columns of the selected entries (empty if the metric is not logged).
+
+        """
+        with self.lock if self.lock else nullcontext():
+            series = self.series.get((exp, node, metric))
+            if series is None:
+                series = MetricSeries(self.KEYS, capacity=0)
+            return series.query(**ranges)
+
+    def to_arrow(self) -> Any:
+        """
+        Export the metrics as a ``pyarrow.Table`` (one row per entry, with dictionary encoded names).
+
+        Requires ``pyarrow``.
+
+        """
+        import pyarrow as pa  # type: ignore
+
+        items = self._select()
+        sizes = np.array([len(columns["value"]) for _, columns in items], dtype=np.int64)
+        table: Dict[str, Any] = {}
+        for i, name in enumerate(("experiment", "node", "metric")):
+            names = sorted({k[i] for k, _ in items})
+            index = {n: code for code, n in enumerate(names)}
+            codes = np.array([index[k[i]] for k, _ in items], dtype=np.int32)
+            table[name] = pa.DictionaryArray.from_arrays(np.repeat(codes, sizes), pa.array(names, type=pa.string()))
+        for name in (*self.KEYS, "value"):
+            dtype = np.float64 if name == "value" else np.int64
+            table[name] = np.concatenate([columns[name] for _, columns in items]) if items else np.empty(0, dtype=dtype)
+        return pa.table(table)
+
+    def to_parquet(self, path: str) -> None:
+        """
+        Export the metrics to a Parquet file.
+
+        Requires ``pyarrow``.
+
+        Args:
+            path: Path of the file.
+
+        """
+        import pyarrow.parquet as pq  # type: ignore
+
+        pq.write_table(self.to_arrow(), path)
+
+
+class ColumnarLocalMetricStorage(_ColumnarMetricStorage):
+    """
+    Local metric storage backed by NumPy columns (``round``, ``step`` and ``value``) per node and metric.
+
+    It has the same interface as ``LocalMetricStorage`` (the logs are materialized in its format on demand), plus
+    vectorized range queries and Arrow/Parquet export.
+
+    Args:
+        disable_locks: Disable the locks (if the storage is not shared between threads).
+
+    """
+
+    KEYS = ("round", "step")
+
+    def add_log(
+        self,
+        exp_name: str,
+        round: int,
+        metric: str,
+        node: str,
+        val: Union[int, float],
+        step: int,
+    ) -> None:
+        """
+        Add a log entry.
+
+        Args:
+            exp_name: Experiment name.
+            round: Round number.
+            metric: Metric name.
+            node: Node name.
+            val: Value of the metric.
+            step: Step number.
+
+        """
+        if self.lock:
+            with self.lock:
+                self._get_series(exp_name, node, metric).append((round, step), val)
+        else:
+            self._get_series(exp_name, node, metric).append((round, step), val)
+
+    def __materialize(self, exp: Optional[str] = None, node: Optional[str] = None, round: Optional[int] = None) -> LocalLogsType:
+        logs: LocalLogsType = {}
+        ranges = {"round": (round, round + 1)} if round is not None else {}
+        for (exp_name, node_name, metric), columns in self._select(exp, node, **ranges):
+            rounds = columns["round"].tolist()
+            steps = columns["step"].tolist()
+            values = columns["value"].tolist()
+            round_logs = logs.setdefault(exp_name, {})
+            for r, s, v in zip(rounds, steps, values):
+                round_logs.setdefault(r, {}).setdefault(node_name, {}).setdefault(metric, []).append((s, v))
+        # Rounds in order
+        return {e: dict(sorted(rounds_logs.items())) for e, rounds_logs in logs.items()}
+
+    def get_all_logs(self) -> LocalLogsType:
+        """
+        Obtain all logs.
+
+        Returns:
+            All logs
+
+        """
+        return self.__materialize()
+
+    def get_experiment_logs(self, exp: str) -> RoundLogsType:
+        """
+        Obtain logs for an experiment.
+
+        Args:
+            exp: Experiment number
+
+        Returns:
+            Experiment logs
+
+        """
+        return self.__materialize(exp)[exp]
+
+    def get_experiment_round_logs(self, exp: str, round: int) -> NodeLogsType:
+        """
+        Obtain logs for a round in an experiment.
+
+        Args:
+            exp: Experiment number
+            round: Round number
+
+        Returns:
+            Round logs
+
+        """
+        return self.__materialize(exp, round=round)[exp][round]
+
+    def get_experiment_round_node_logs(self, exp: str, round: int, node: str) -> MetricsType:
+        """
+        Obtain logs for a node in an experiment.
+
+        Args:
+            exp: Experiment number
+            round: Round number
+            node: Node name
+
+        Returns:
+            Node logs
+
+        """
+        return self.__materialize(exp, node, round)[exp][round][node]
+
+
+class ColumnarGlobalMetricStorage(_ColumnarMetricStorage):
+    """
+    Global metric storage backed by NumPy columns (``round`` and ``value``) per node and metric.
+
+    It has the same interface as ``GlobalMetricStorage`` (the logs are materialized in its format on demand), plus
+    vectorized range queries and Arrow/Parquet export. Repeated rounds are discarded in O(1).
+
+    Args:
+        disable_locks: Disable the locks (if the storage is not shared between threads).
+
+    """
+
+    KEYS = ("round",)
+
+    def __init__(self, disable_locks: bool = False) -> None:
+        """Initialize the global metric storage."""
+        super().__init__(disable_locks)
+        self.__logged_rounds: Dict[Tuple[str, str, str], Set[int]] = {}
+
+    def add_log(self, exp_name: str, round: int, metric: str, node: str, val: Union[int, float]) -> None:
+        """
+        Add a log entry.
+
+        Args:
+            exp_name: Experiment name.
+            round: Round number.
+            metric: Metric name.
+            node: Node name.
+            val: Value of the metric.
+
+        """
+        if self.lock:
+            with self.lock:
+                self.__add_log(exp_name, round, metric, node, val)
+        else:
+            self.__add_log(exp_name, round, metric, node, val)
+
+    def __add_log(self, exp_name: str, round: int, metric: str, node: str, val: Union[int, float]) -> None:
+        # Log if not already logged
+        rounds = self.__logged_rounds.setdefault((exp_name, node, metric), set())
+        if round not in rounds:
+            rounds.add(round)
+            self._get_series(exp_name, node, metric).append((round,), val)
+
+    def __materialize(self, exp: Optional[str] = None, node: Optional[str] = None) -> GlobalLogsType:
+        logs: GlobalLogsType = {}
+        for (exp_name, node_name, metric), columns in self._select(exp, node):
+            entries = list(zip(columns["round"].tolist(), columns["value"].tolist()))
+            logs.setdefault(exp_name, {}).setdefault(node_name, {})[metric] = entries
+        return logs
+
+    def get_all_logs(self) -> GlobalLogsType:
+        """
+        Obtain all logs.
+
+        Returns:
+            All logs
+
+        """
+        return self.__materialize()
+
+    def get_experiment_logs(self, exp: str) -> NodeLogsType:
+        """
+        Obtain logs for an experiment.
+
+        Args:
+            exp: Experiment number
+
+        Returns:
+            Experiment logs
+
+        """
+        return self.__materialize(exp)[exp]
+
+    def get_experiment_node_logs(self, exp: str, node: str) -> MetricsType:
+        """
+        Obtain logs for a node in an experiment.
+
+        Args:
+            exp: Experiment number
+            node: Node name
+
+        Returns:
+            Node logs
+
+        """
+        return self.__materialize(exp, node)[exp][node]
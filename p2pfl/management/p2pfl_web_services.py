@@ -19,7 +19,8 @@
 """
 Communication with P2PFL Web Services (via REST API).
 
-.. todo:: Implement batch sending.
+Logs and metrics are uploaded in the background (see ``WebUploader``), so a slow or unreachable server does not slow
+down the nodes.
 
 .. todo:: Implement get_pending_actions.
 
@@ -28,11 +29,22 @@ Communication with P2PFL Web Services (via REST API).
 .. todo:: Implement get_experiment_id.
 """
 
+import atexit
 import datetime
-from typing import Dict
+import gzip
+import json
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
 
 import requests
 
+from p2pfl.settings import Settings
+
+# Diagnostics of the uploads. Not under the "p2pfl" logger, whose handlers expect node records and may upload them here.
+_logger = logging.getLogger("p2pfl_web_services")
+
 ##################################
 #    P2PFL Web Services (API)    #
 ##################################
@@ -55,6 +67,202 @@ class P2pflWebServicesError(Exception):
         super().__init__(f"Error {code}: {message}")
 
 
+class WebUploader:
+    """
+    Background uploader of records (logs and metrics) to a REST API.
+
+    Records are queued (dropping the oldest ones if the queue is full) and uploaded by a worker thread over a keep-alive
+    session. Records for the same endpoint are sent together as a JSON array (optionally gzipped). Failed uploads are
+    retried with exponential backoff and dropped after ``max_retries``. If the server rejects arrays or gzipped bodies,
+    the uploader falls back to single records or plain bodies (a gzipped request rejected with a client error is
+    retried once uncompressed before anything else).
+
+    Records dropped because the queue is full or their upload failed are counted (``dropped`` and ``failed``).
+    Fallbacks and failures are reported through the ``p2pfl_web_services`` logger.
+
+    Args:
+        url: Base URL of the API.
+        headers: Headers of every request.
+        queue_size: Maximum pending records.
+        batch_size: Maximum records per request.
+        flush_interval: Maximum time (seconds) a record waits to be uploaded.
+        max_retries: Retries of a failed upload.
+        retry_backoff: Initial wait (seconds) between retries (doubled on each retry).
+        compress: Gzip the request bodies.
+
+    """
+
+    REJECTED_STATUS = (400, 404, 405, 413, 415, 422)
+    """HTTP status codes meaning that the server does not support the format of the request."""
+
+    def __init__(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        compress: Optional[bool] = None,
+    ) -> None:
+        """Initialize the uploader and start its worker."""
+        self.url = url
+        self.batch_size = batch_size if batch_size is not None else Settings.WEB_SERVICES_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else Settings.WEB_SERVICES_FLUSH_INTERVAL
+        self.max_retries = max_retries if max_retries is not None else Settings.WEB_SERVICES_MAX_RETRIES
+        self.retry_backoff = retry_backoff if retry_backoff is not None else Settings.WEB_SERVICES_RETRY_BACKOFF
+        self.compress = compress if compress is not None else Settings.WEB_SERVICES_GZIP
+        self.batching = True
+        self.dropped = 0
+        self.failed = 0
+        self.__queue: Deque[Tuple[str, Dict[str, Any]]] = deque(
+            maxlen=queue_size if queue_size is not None else Settings.WEB_SERVICES_QUEUE_SIZE
+        )
+        self.__in_flight = 0
+        self.__flush_requested = False
+        self.__condition = threading.Condition()
+        self.__stop_event = threading.Event()
+        # Keep-alive session (only used by the worker)
+        self.__session = requests.Session()
+        self.__session.headers.update(headers)
+        self.__worker = threading.Thread(target=self.__run, name="p2pfl-web-uploader", daemon=True)
+        self.__worker.start()
+        atexit.register(self.close)
+
+    def enqueue(self, endpoint: str, record: Dict[str, Any]) -> None:
+        """
+        Queue a record to be uploaded.
+
+        Args:
+            endpoint: Endpoint (relative to the base URL).
+            record: JSON-serializable record.
+
+        """
+        with self.__condition:
+            if len(self.__queue) == self.__queue.maxlen:
+                self.dropped += 1
+            self.__queue.append((endpoint, record))
+            if len(self.__queue) >= self.batch_size:
+                self.__condition.notify_all()
+
+    def pending(self) -> int:
+        """Get the number of records not uploaded yet."""
+        with self.__condition:
+            return len(self.__queue) + self.__in_flight
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Upload the pending records now and wait for them.
+
+        Args:
+            timeout: Maximum time (seconds) to wait.
+
+        Returns:
+            True if every record was processed (uploaded or dropped), False on timeout.
+
+        """
+        with self.__condition:
+            self.__flush_requested = True
+            self.__condition.notify_all()
+            return self.__condition.wait_for(lambda: (not self.__queue and self.__in_flight == 0) or not self.__worker.is_alive(), timeout)
+
+    def close(self, timeout: Optional[float] = 10) -> None:
+        """
+        Upload the pending records and stop the worker.
+
+        Args:
+            timeout: Maximum time (seconds) to wait for the pending records.
+
+        """
+        if self.__stop_event.is_set():
+            return
+        self.flush(timeout)
+        with self.__condition:
+            self.__stop_event.set()
+            self.__condition.notify_all()
+        self.__worker.join(timeout)
+        self.__session.close()
+
+    def __run(self) -> None:
+        while True:
+            with self.__condition:
+                self.__condition.wait_for(
+                    lambda: self.__stop_event.is_set() or self.__flush_requested or len(self.__queue) >= self.batch_size,
+                    self.flush_interval,
+                )
+                if self.__stop_event.is_set() and not self.__queue:
+                    return
+                records = [self.__queue.popleft() for _ in range(min(len(self.__queue), self.batch_size))]
+                self.__in_flight = len(records)
+                if not self.__queue:
+                    self.__flush_requested = False
+
+            # Group by endpoint (keeping the order within each endpoint)
+            by_endpoint: Dict[str, List[Dict[str, Any]]] = {}
+            for endpoint, record in records:
+                by_endpoint.setdefault(endpoint, []).append(record)
+            for endpoint, endpoint_records in by_endpoint.items():
+                self.__send(endpoint, endpoint_records)
+
+            with self.__condition:
+                self.__in_flight = 0
+                self.__condition.notify_all()
+
+    def __send(self, endpoint: str, records: List[Dict[str, Any]]) -> None:
+        if self.batching and len(records) > 1:
+            if self.__post(endpoint, records) not in self.REJECTED_STATUS:
+                return
+            _logger.warning("%s does not accept batches, sending records one by one", endpoint)
+            self.batching = False
+        for record in records:
+            self.__post(endpoint, record)
+
+    def __post(self, endpoint: str, payload: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Optional[int]:
+        # Returns the last status code (None if the server is unreachable)
+        body = json.dumps(payload, default=str).encode()
+        status: Optional[int] = None
+        error = ""
+        attempt = 0
+        compress = self.compress
+        while True:
+            headers = {}
+            data = body
+            if compress:
+                data = gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+            try:
+                response = self.__session.post(self.url + endpoint, data=data, headers=headers, timeout=5)
+                status, error = response.status_code, response.text
+            except requests.exceptions.RequestException as e:
+                status, error = None, str(e)
+
+            if status is not None and status < 400:
+                if compress != self.compress:
+                    _logger.warning("gzip not supported by the server, sending uncompressed requests")
+                    self.compress = False
+                return status
+            if compress and status is not None and status < 500 and status not in (401, 429):
+                # The server may not understand gzipped bodies (not always answered with 415), retry once uncompressed
+                compress = False
+                continue
+            if status == 401:
+                _logger.error("Unauthorized, please check the API key or the node registration in the p2pfl-web services.")
+            if status is not None and status < 500 and status != 429:
+                # Not transient, retrying will not help
+                break
+            if attempt >= self.max_retries or self.__stop_event.wait(self.retry_backoff * 2**attempt):
+                break
+            attempt += 1
+
+        if status not in self.REJECTED_STATUS or not isinstance(payload, list):
+            n = len(payload) if isinstance(payload, list) else 1
+            with self.__condition:
+                self.failed += n
+            _logger.error("Dropping %d records for %s (status %s): %s", n, endpoint, status, error)
+        return status
+
+
 class P2pflWebServices:
     """
     Class that manages the communication with the p2pfl-web services.
@@ -73,6 +281,7 @@ class P2pflWebServices:
             print("P2pflWebServices Warning: Connection must be over https, traffic will not be encrypted")
         self.__key = key
         self.node_id: Dict[str, int] = {}
+        self.uploader = WebUploader(url, self.__build_headers())
         # TODO: Check connection
 
     def __build_headers(self) -> Dict[str, str]:
@@ -137,19 +346,7 @@ class P2pflWebServices:
             "level": level,
             "message": message,
         }
-        try:
-            response = requests.post(
-                self.__url + "/node-log",
-                json=data,
-                headers=self.__build_headers(),
-                timeout=5,
-            )
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            print(node, f"Error logging message: {message}")
-            if hasattr(e, "response") and e.response is not None and e.response.status_code == 401:
-                print("Please check the API key or the node registration in the p2pfl-web services.")
-            raise e
+        self.uploader.enqueue("/node-log", data)
 
     def send_local_metric(self, exp: str, round: int, metric: str, node: str, value: float, step: int) -> None:
         """
@@ -181,16 +378,7 @@ class P2pflWebServices:
             "step": step,
             "value": value,
         }
-        try:
-            response = requests.post(
-                self.__url + "/node-metric/local",
-                json=data,
-                headers=self.__build_headers(),
-                timeout=5,
-            )
-            response.raise_for_status()
-        except Exception as e:
-            raise P2pflWebServicesError(response.status_code, response.text) from e
+        self.uploader.enqueue("/node-metric/local", data)
 
     def send_global_metric(self, exp: str, round: int, metric: str, node: str, value: float):
         """
@@ -220,16 +408,7 @@ class P2pflWebServices:
             "round": round,
             "value": value,
         }
-        try:
-            response = requests.post(
-                self.__url + "/node-metric/global",
-                json=data,
-                headers=self.__build_headers(),
-                timeout=5,
-            )
-            response.raise_for_status()
-        except Exception as e:
-            raise P2pflWebServicesError(response.status_code, response.text) from e
+        self.uploader.enqueue("/node-metric/global", data)
 
     def send_system_metric(self, node: str, metric: str, value: float, time: datetime.datetime):
         """
@@ -254,16 +433,24 @@ class P2pflWebServices:
             "time": time.strftime("%Y-%m-%d %H:%M:%S"),
             "value": value,
         }
-        try:
-            response = requests.post(
-                self.__url + "/node-metric/system",
-                json=data,
-                headers=self.__build_headers(),
-                timeout=5,
-            )
-            response.raise_for_status()
-        except Exception as e:
-            raise P2pflWebServicesError(response.status_code, response.text) from e
+        self.uploader.enqueue("/node-metric/system", data)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the queued logs and metrics are uploaded.
+
+        Args:
+            timeout: Maximum time (seconds) to wait.
+
+        Returns:
+            True if every record was processed, False on timeout.
+
+        """
+        return self.uploader.flush(timeout)
+
+    def close(self) -> None:
+        """Upload the queued logs and metrics and stop the uploader."""
+        self.uploader.close()
 
     def get_pending_actions(self):
         """Get pending actions from the p2pfl-web services."""
@@ -17,11 +17,10 @@
 
 """P2PFL Node."""
 
-import contextlib
 import os
 import threading
 import traceback
-from typing import Any, Dict, Optional, Type
+from typing import Any, Mapping, Optional, Type
 
 from p2pfl.communication.commands.message.metrics_command import MetricsCommand
 from p2pfl.communication.commands.message.model_initialized_command import ModelInitializedCommand
@@ -156,7 +155,7 @@ class Node:
         # Connect
         return self._communication_protocol.connect(addr)
 
-    def get_neighbors(self, only_direct: bool = False) -> Dict[str, Any]:
+    def get_neighbors(self, only_direct: bool = False) -> Mapping[str, Any]:
         """
         Return the neighbors of the node.
 
@@ -405,9 +404,7 @@ class Node:
         self.learner.interrupt_fit()
         # Aggregator
         self.aggregator.clear()
-        # State
+        # State (wake up the vote aggregation)
+        self.state.train_set_votes.interrupt()
         self.state.clear()
         logger.experiment_finished(self.addr)
-        # Try to free wait locks
-        with contextlib.suppress(Exception):
-            self.state.wait_votes_ready_lock.release()
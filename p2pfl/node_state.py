@@ -17,12 +17,117 @@
 #
 """Node state."""
 
+import heapq
 import threading
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
 from p2pfl.experiment import Experiment
 
 
+class VoteTally:
+    """
+    Train set votes, tallied as they arrive.
+
+    Waiters are woken up as soon as a vote is received, so the quorum is detected without polling.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the tally."""
+        self.__votes: Dict[str, Dict[str, int]] = {}
+        self.__totals: Dict[str, int] = {}
+        self.__counts: Dict[str, int] = {}  # number of votes of each candidate
+        self.__interrupted = False
+        self.__condition = threading.Condition()
+
+    def add_vote(self, voter: str, votes: Dict[str, int]) -> None:
+        """
+        Add (or replace) the vote of a node.
+
+        Args:
+            voter: Address of the voting node.
+            votes: Votes (weight of each candidate).
+
+        """
+        with self.__condition:
+            self.__update_totals(self.__votes.get(voter, {}), -1)
+            self.__votes[voter] = votes
+            self.__update_totals(votes, 1)
+            self.__condition.notify_all()
+
+    def __update_totals(self, votes: Dict[str, int], sign: int) -> None:
+        for candidate, weight in votes.items():
+            self.__totals[candidate] = self.__totals.get(candidate, 0) + sign * weight
+            self.__counts[candidate] = self.__counts.get(candidate, 0) + sign
+            if self.__counts[candidate] == 0:
+                del self.__totals[candidate]
+                del self.__counts[candidate]
+
+    def wait_for_voters(self, voters: Set[str], timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every node in a set has voted.
+
+        Args:
+            voters: Nodes whose vote is needed.
+            timeout: Maximum time (seconds) to wait.
+
+        Returns:
+            True if all the votes have been received, False if the timeout expired or the wait was interrupted.
+
+        """
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.__interrupted or voters.issubset(self.__votes), timeout)
+            return not self.__interrupted and voters.issubset(self.__votes)
+
+    def get_voters(self) -> Set[str]:
+        """Get the nodes that have voted."""
+        with self.__condition:
+            return set(self.__votes)
+
+    def get_top(self, k: int, voters: Optional[Set[str]] = None) -> List[str]:
+        """
+        Get the most voted candidates (draws are resolved in descending order of address).
+
+        Args:
+            k: Number of candidates.
+            voters: Nodes whose votes are counted. All by default.
+
+        """
+        with self.__condition:
+            totals = self.__totals
+            excluded = [] if voters is None else [v for v in self.__votes if v not in voters]
+            if excluded:
+                totals = totals.copy()
+                counts = self.__counts.copy()
+                for voter in excluded:
+                    for candidate, weight in self.__votes[voter].items():
+                        totals[candidate] -= weight
+                        counts[candidate] -= 1
+                        if counts[candidate] == 0:
+                            del totals[candidate]
+            return [c for c, _ in heapq.nlargest(k, totals.items(), key=lambda x: (x[1], x[0]))]
+
+    def interrupt(self) -> None:
+        """Wake up the waiting threads (e.g. when learning is stopped)."""
+        with self.__condition:
+            self.__interrupted = True
+            self.__condition.notify_all()
+
+    def clear(self) -> None:
+        """Clear the votes."""
+        with self.__condition:
+            self.__votes = {}
+            self.__totals = {}
+            self.__counts = {}
+
+    def __len__(self) -> int:
+        """Get the number of votes."""
+        return len(self.__votes)
+
+    def __repr__(self) -> str:
+        """Return a String representation of the votes."""
+        return repr(self.__votes)
+
+
 class NodeState:
     """
     Class to store the main state of a learning node.
@@ -35,10 +140,8 @@ class NodeState:
         models_aggregated(Dict[str, List[str]]): The models aggregated by the node.
         nei_status(Dict[str, int]): The status of the neighbors.
         train_set(List[str]): The train set of the node.
-        train_set_votes(Dict[str, Dict[str, int]]): The votes of the train set.
-        train_set_votes_lock(threading.Lock): The lock for the train set votes.
+        train_set_votes(VoteTally): The votes of the train set.
         start_thread_lock(threading.Lock): The lock for the start thread.
-        wait_votes_ready_lock(threading.Lock): The lock for the wait votes ready.
         model_initialized_lock(threading.Lock): The lock for the model initialized.
 
     Args:
@@ -65,15 +168,13 @@ class NodeState:
 
         # Train Set
         self.train_set: List[str] = []
-        self.train_set_votes: Dict[str, Dict[str, int]] = {}
+        self.train_set_votes = VoteTally()
 
         # Actual experiment
         self.experiment: Optional[Experiment] = None
 
         # Locks
-        self.train_set_votes_lock = threading.Lock()
         self.start_thread_lock = threading.Lock()
-        self.wait_votes_ready_lock = threading.Lock()
         self.model_initialized_lock = threading.Lock()
         self.model_initialized_lock.acquire()
         self.aggregated_model_event = threading.Event()
@@ -19,6 +19,7 @@
 """Module to define constants for the p2pfl system."""
 
 import os
+from typing import Dict, List, Optional
 
 ###################
 # Global Settings #
@@ -35,6 +36,53 @@ class Settings:
     """
     Maximum time (seconds) to wait for a gRPC request.
     """
+    GRPC_CHUNK_SIZE: int = 1024 * 1024
+    """
+    Size (bytes) of the chunks used to stream models. Larger models are sent with the send_weights streaming RPC.
+    """
+    GRPC_TRANSFER_RETRIES: int = 3
+    """
+    Number of times an interrupted model transfer is resumed before giving up.
+    """
+    GRPC_TRANSFER_TIMEOUT: float = 60
+    """
+    Time (seconds) an incomplete model transfer is kept by the receiver to be resumed.
+    """
+    GRPC_MAX_MODEL_SIZE: int = 1024 * 1024 * 1024
+    """
+    Maximum size (bytes) of a model received in chunks. Larger transfers are rejected before allocating their buffer.
+    """
+    GRPC_CHANNEL_POOL_SIZE: int = 64
+    """
+    Maximum number of pooled channels to non-direct neighbors (least recently used are closed first).
+    """
+    GRPC_CHANNEL_IDLE_TIMEOUT: float = 60
+    """
+    Time (seconds) after which an unused pooled channel is closed.
+    """
+    GRPC_SERVER_WORKERS: int = 16
+    """
+    Maximum concurrent model transfers of the gRPC server (threads are created on demand). Transfers beyond this limit
+    are rejected and retried later by their senders.
+    """
+    GRPC_SERVER_CONTROL_WORKERS: int = 4
+    """
+    Maximum threads of the gRPC server reserved to control-plane messages (heartbeats, votes...), so they are never
+    delayed by model transfers.
+    """
+    BROADCAST_WORKERS: int = 32
+    """
+    Threads (shared by all the nodes of the process) used to send broadcasts concurrently when the protocol has no
+    asynchronous calls (in-memory).
+    """
+    BROADCAST_LATENCY_WINDOW: int = 1000
+    """
+    Number of per-peer broadcast latencies kept to compute percentiles.
+    """
+    BROADCAST_LATENCY_REPORT_PERIOD: float = 30
+    """
+    Period (seconds) to report the broadcast latency percentiles as system metrics.
+    """
     LOG_LEVEL: str = "INFO"
     """
     Log level for the system.
@@ -47,10 +95,51 @@ class Settings:
     """
     Exclude heartbeat logs.
     """
+    LOG_ASYNC_BACKEND: str = "queue"
+    """
+    Async logging when Ray is not used: "queue" (multiprocessing queue) or "ring_buffer" (in-process buffer and thread).
+    Read when the logger is imported.
+    """
+    LOG_BUFFER_SIZE: int = 10000
+    """
+    Maximum records buffered by the "ring_buffer" async logging.
+    """
+    LOG_BUFFER_OVERFLOW: str = "drop"
+    """
+    What the "ring_buffer" async logging does when the buffer is full: "block", "drop" (the oldest records) or "sample".
+    """
+    LOG_BUFFER_SAMPLE_EVERY: int = 10
+    """
+    With the "sample" overflow policy, one of every N records below WARNING is kept once the buffer is half full.
+    """
+    METRIC_STORAGE: str = "dict"
+    """
+    Backend to store the logged metrics: "dict" (nested dictionaries) or "columnar" (NumPy arrays, with vectorized range
+    queries and Arrow/Parquet export).
+    """
     DISABLE_RAY: bool = False
     """
     Disable Ray for debugging (even if installed).
     """
+    RAY_LOG_FLUSH_INTERVAL: float = 0.5
+    """
+    Period (seconds) to flush the buffered logs and metrics to the Ray logger actor.
+    """
+    RAY_LOG_BATCH_SIZE: int = 200
+    """
+    Number of buffered logs and metrics that triggers a flush to the Ray logger actor.
+    """
+    RAY_LOG_LEVEL_REFRESH_INTERVAL: float = 30
+    """
+    Period (seconds) to fetch the level of the Ray logger actor (changed from other processes) when no batch has been
+    flushed (each batch returns it).
+    """
+    MODEL_ENCODING: str = "binary"
+    """
+    Default encoding for model weights ("binary" or "pickle"). Received models are decoded in any format. Models are
+    only sent as "binary" to the neighbors that advertised it in the handshake, the rest (peers running older versions
+    or non-direct neighbors) receive "pickle".
+    """
 
     ######
     # HEARTBEAT
@@ -61,7 +150,21 @@ class Settings:
     """
     HEARTBEAT_TIMEOUT: float = 5
     """
-    Timeout (seconds) for a node to be considered dead.
+    Expected maximum time (seconds) between heartbeats of a node. The failure detector tolerates longer pauses on
+    links with jitter.
+    """
+    HEARTBEAT_PHI_THRESHOLD: float = 8
+    """
+    Suspicion level (phi) for a node to be considered dead by the failure detector.
+    """
+    HEARTBEAT_PHI_WINDOW: int = 100
+    """
+    Number of heartbeat intervals per node used by the failure detector.
+    """
+    HEARTBEAT_MODE: str = "gossip"
+    """
+    Heartbeat dissemination: "gossip" (heartbeats are gossiped to the whole network) or "digest" (heartbeats are only
+    sent to direct neighbors, carrying a digest of the recently seen nodes).
     """
 
     ######
@@ -95,6 +198,41 @@ class Settings:
     """
     Amount of equal rounds to exit gossiping. Careful, a low value can cause an early stop of gossiping.
     """
+    GOSSIP_PEER_SELECTION: str = "random"
+    """
+    Policy to select the neighbors to gossip models to ("random" or "bandwidth", which prefers the neighbors that close
+    the largest gap per second of the observed links).
+    """
+    GOSSIP_PEER_STATS_ALPHA: float = 0.3
+    """
+    Weight of the new samples in the observed latency and throughput of each neighbor.
+    """
+    GOSSIP_MAX_MESSAGES_PER_SECOND: Optional[float] = None
+    """
+    Maximum messages per second sent by the gossip protocol (messages and models). None means unlimited.
+    """
+    GOSSIP_MAX_BYTES_PER_SECOND: Optional[float] = None
+    """
+    Maximum bytes per second sent by the gossip protocol (messages and models). None means unlimited.
+    """
+    GOSSIP_MAX_IN_FLIGHT_PER_PEER: int = 1
+    """
+    Maximum gossip sends to the same neighbor not yet completed. With asynchronous clients, further sends wait for one
+    of them to complete, so the rate limiting and the link stats measure real transfers instead of enqueued ones.
+    Small messages and models are bounded separately.
+    """
+    GOSSIP_RATE_REPORT_PERIOD: float = 30
+    """
+    Period (seconds) to report the achieved gossip rates.
+    """
+    GOSSIP_COALESCE_COMMANDS: List[str] = ["beat", "models_aggregated"]
+    """
+    Commands whose pending gossip messages are superseded by a newer message from the same source.
+    """
+    GOSSIP_PRIORITIES: Dict[str, int] = {"beat": 1, "metrics": 2}
+    """
+    Priority of the pending gossip messages of each command (lower is sent first). Other commands have priority 0.
+    """
 
     ######
     # SSL
@@ -139,6 +277,14 @@ class Settings:
     """
     Timeout (seconds) for a node to wait for other models. Timeout starts when the first model is added.
     """
+    AGGREGATION_WORKERS: int = os.cpu_count() or 1
+    """
+    Number of threads (shared by all the aggregators of the process) used to aggregate shards of the parameters in parallel.
+    """
+    AGGREGATION_MIN_SHARD_SIZE: int = 1 << 18
+    """
+    Minimum number of parameters per shard. Smaller models are aggregated in a single thread.
+    """
     WAIT_HEARTBEATS_CONVERGENCE: float = 0.2 * HEARTBEAT_TIMEOUT
     """
     Time (seconds) to wait for the heartbeats to converge before a learning round starts.
@@ -151,3 +297,28 @@ class Settings:
     """
     Period (seconds) to send resource monitor information.
     """
+    WEB_SERVICES_QUEUE_SIZE: int = 10000
+    """
+    Maximum logs and metrics waiting to be uploaded to the web services. The oldest are dropped when it is full.
+    """
+    WEB_SERVICES_BATCH_SIZE: int = 100
+    """
+    Maximum logs and metrics uploaded to the web services in a single request.
+    """
+    WEB_SERVICES_FLUSH_INTERVAL: float = 1.0
+    """
+    Period (seconds) to upload the pending logs and metrics to the web services.
+    """
+    WEB_SERVICES_MAX_RETRIES: int = 3
+    """
+    Number of times a failed upload to the web services is retried (with exponential backoff) before dropping it.
+    """
+    WEB_SERVICES_RETRY_BACKOFF: float = 0.5
+    """
+    Initial time (seconds) to wait before retrying a failed upload to the web services.
+    """
+    WEB_SERVICES_GZIP: bool = False
+    """
+    Compress (gzip) the uploads to the web services. Only enable it if the server accepts gzipped bodies (otherwise,
+    the rejected uploads are sent again uncompressed until one of them succeeds).
+    """
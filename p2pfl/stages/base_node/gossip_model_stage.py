@@ -23,6 +23,7 @@ from p2pfl.communication.commands.weights.full_model_command import FullModelCom
 from p2pfl.communication.protocols.communication_protocol import CommunicationProtocol
 from p2pfl.learning.aggregators.aggregator import Aggregator
 from p2pfl.learning.frameworks.learner import Learner
+from p2pfl.learning.frameworks.model_encoding import negotiate_encoding
 from p2pfl.management.logger import logger
 from p2pfl.node_state import NodeState
 from p2pfl.stages.stage import Stage, check_early_stop
@@ -73,10 +74,17 @@ class GossipModelStage(Stage):
             return get_candidates_fn()
 
         def model_fn(node: str) -> Any:
-            if state.round is None:
+            current_round = state.round
+            if current_round is None:
                 raise Exception("Round not initialized")
-            encoded_model = learner.get_model().encode_parameters()
-            return communication_protocol.build_weights(FullModelCommand.get_name(), state.round, encoded_model)
+            model = learner.get_model()
+            encoding = negotiate_encoding(model.get_encoding(), communication_protocol.get_neighbor_encodings(node))
+            # The same message is sent to every neighbor (per encoding) while the model and the round do not change
+            return model.get_encoded_message(
+                (FullModelCommand.get_name(), current_round),
+                lambda data: communication_protocol.build_weights(FullModelCommand.get_name(), current_round, data),
+                encoding,
+            )
 
         # Gossip
         communication_protocol.gossip_weights(
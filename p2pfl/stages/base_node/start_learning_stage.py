@@ -25,6 +25,7 @@ from p2pfl.communication.commands.weights.init_model_command import InitModelCom
 from p2pfl.communication.protocols.communication_protocol import CommunicationProtocol
 from p2pfl.learning.aggregators.aggregator import Aggregator
 from p2pfl.learning.frameworks.learner import Learner
+from p2pfl.learning.frameworks.model_encoding import negotiate_encoding
 from p2pfl.management.logger import logger
 from p2pfl.node_state import NodeState
 from p2pfl.settings import Settings
@@ -97,11 +98,18 @@ class StartLearningStage(Stage):
         def status_fn() -> Any:
             return get_candidates_fn()
 
-        def model_fn(_: str) -> Any:
-            if state.round is None:
+        def model_fn(node: str) -> Any:
+            current_round = state.round
+            if current_round is None:
                 raise Exception("Round not initialized.")
-            encoded_model = learner.get_model().encode_parameters()
-            return communication_protocol.build_weights(InitModelCommand.get_name(), state.round, encoded_model)
+            model = learner.get_model()
+            encoding = negotiate_encoding(model.get_encoding(), communication_protocol.get_neighbor_encodings(node))
+            # The same message is sent to every neighbor (per encoding) while the model and the round do not change
+            return model.get_encoded_message(
+                (InitModelCommand.get_name(), current_round),
+                lambda data: communication_protocol.build_weights(InitModelCommand.get_name(), current_round, data),
+                encoding,
+            )
 
         # Gossip
         communication_protocol.gossip_weights(
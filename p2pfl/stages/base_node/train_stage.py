@@ -26,6 +26,7 @@ from p2pfl.communication.commands.weights.partial_model_command import PartialMo
 from p2pfl.communication.protocols.communication_protocol import CommunicationProtocol
 from p2pfl.learning.aggregators.aggregator import Aggregator, NoModelsToAggregateError
 from p2pfl.learning.frameworks.learner import Learner
+from p2pfl.learning.frameworks.model_encoding import negotiate_encoding
 from p2pfl.management.logger import logger
 from p2pfl.node_state import NodeState
 from p2pfl.stages.stage import EarlyStopException, Stage, check_early_stop
@@ -150,20 +151,29 @@ class TrainStage(Stage):
                 if (n in state.train_set)
             ]
 
+        def gap_fn(node: str) -> int:
+            # Contributors that the node would get from our partial aggregation
+            return len(set(aggregator.get_aggregated_models()) - set(TrainStage.__get_aggregated_models(node, state)))
+
         def model_fn(node: str) -> Any:
             try:
                 model = aggregator.get_model(TrainStage.__get_aggregated_models(node, state))
             except NoModelsToAggregateError:
                 logger.info(state.addr, f"❔ No models to aggregate from {node}.")
                 return None
-            if state.round is None:
+            current_round = state.round
+            if current_round is None:
                 raise Exception("Round not initialized.")
-            return communication_protocol.build_weights(
-                PartialModelCommand.get_name(),
-                state.round,
-                model.encode_parameters(),
-                model.get_contributors(),
-                model.get_num_samples(),
+            encoding = negotiate_encoding(model.get_encoding(), communication_protocol.get_neighbor_encodings(node))
+            contributors = model.get_contributors()
+            num_samples = model.get_num_samples()
+            # Partial aggregations are memoized, so the same message is sent to the neighbors that need the same one
+            return model.get_encoded_message(
+                (PartialModelCommand.get_name(), current_round, tuple(contributors), num_samples),
+                lambda data: communication_protocol.build_weights(
+                    PartialModelCommand.get_name(), current_round, data, contributors, num_samples
+                ),
+                encoding,
             )
 
         # Gossip
@@ -173,6 +183,7 @@ class TrainStage(Stage):
             status_fn,
             model_fn,
             create_connection=True,
+            gap_fn=gap_fn,
         )
 
     @staticmethod
@@ -20,7 +20,7 @@
 import math
 import random
 import time
-from typing import Dict, List, Optional, Type, Union
+from typing import List, Optional, Type, Union
 
 from p2pfl.communication.commands.message.vote_train_set_command import VoteTrainSetCommand
 from p2pfl.communication.protocols.communication_protocol import CommunicationProtocol
@@ -82,7 +82,7 @@ class VoteTrainSetStage(Stage):
         candidates = list(communication_protocol.get_neighbors(only_direct=False))
         if state.addr not in candidates:
             candidates.append(state.addr)
-        logger.debug(state.addr, f"{len(candidates)} candidates to train set")
+        logger.debug(state.addr, "%d candidates to train set", len(candidates))
 
         # Send vote
         samples = min(Settings.TRAIN_SET_SIZE, len(candidates))
@@ -91,13 +91,11 @@ class VoteTrainSetStage(Stage):
         votes = list(zip(nodes_voted, weights))
 
         # Adding votes
-        state.train_set_votes_lock.acquire()
-        state.train_set_votes[state.addr] = dict(votes)
-        state.train_set_votes_lock.release()
+        state.train_set_votes.add_vote(state.addr, dict(votes))
 
         # Send and wait for votes
         logger.info(state.addr, "Sending train set vote.")
-        logger.debug(state.addr, f"Self Vote: {votes}")
+        logger.debug(state.addr, "Self Vote: %s", votes)
         communication_protocol.broadcast(
             communication_protocol.build_msg(
                 VoteTrainSetCommand.get_name(),
@@ -110,65 +108,30 @@ class VoteTrainSetStage(Stage):
     def __aggregate_votes(state: NodeState, communication_protocol: CommunicationProtocol) -> List[str]:
         logger.debug(state.addr, "Waiting other node votes.")
 
-        # Get time
-        count = 0.0
-        begin = time.time()
-
+        deadline = time.monotonic() + Settings.VOTE_TIMEOUT
         while True:
             # If the trainning has been interrupted, stop waiting
             check_early_stop(state)
 
-            # Update time counters (timeout)
-            count = count + (time.time() - begin)
-            begin = time.time()
-            timeout = count > Settings.VOTE_TIMEOUT
-
-            # Clear non candidate votes
-            state.train_set_votes_lock.acquire()
-            nc_votes = {
-                k: v
-                for k, v in state.train_set_votes.items()
-                if k in list(communication_protocol.get_neighbors(only_direct=False)) or k == state.addr
-            }
-            state.train_set_votes_lock.release()
-
-            # Determine if all votes are received
-            needed_votes = set(list(communication_protocol.get_neighbors(only_direct=False)) + [state.addr])
-            votes_ready = needed_votes == set(nc_votes.keys())
+            # Wait for the votes of the candidates (woken up by every vote, refresh the candidates every 2 seconds)
+            needed_votes = set(communication_protocol.get_neighbors(only_direct=False)) | {state.addr}
+            remaining = deadline - time.monotonic()
+            votes_ready = state.train_set_votes.wait_for_voters(needed_votes, timeout=max(0, min(remaining, 2)))
+            timeout = not votes_ready and time.monotonic() >= deadline
 
             if votes_ready or timeout:
-                if timeout and not votes_ready:
-                    missing_votes = set(list(communication_protocol.get_neighbors(only_direct=False)) + [state.addr]) - set(nc_votes.keys())
-                    logger.info(
-                        state.addr,
-                        f"Timeout for vote aggregation. Missing votes from {missing_votes}",
-                    )
-
-                results: Dict[str, int] = {}
-                for node_vote in list(nc_votes.values()):
-                    for i in range(len(node_vote)):
-                        k = list(node_vote.keys())[i]
-                        v = list(node_vote.values())[i]
-                        if k in results:
-                            results[k] += v
-                        else:
-                            results[k] = v
-
-                # Order by votes and get TOP X
-                results_ordered = sorted(
-                    results.items(), key=lambda x: x[0], reverse=True
-                )  # to equal solve of draw (node name alphabetical order)
-                results_ordered = sorted(results_ordered, key=lambda x: x[1], reverse=True)
-                top = min(len(results_ordered), Settings.TRAIN_SET_SIZE)
-                results_ordered = results_ordered[0:top]
+                if timeout:
+                    missing_votes = needed_votes - state.train_set_votes.get_voters()
+                    logger.info(state.addr, "Timeout for vote aggregation. Missing votes from %s", missing_votes)
 
-                # Clear votes
-                state.train_set_votes = {}
-                logger.info(state.addr, f"Computed {len(nc_votes)} votes.")
-                return [i[0] for i in results_ordered]
+                # Count the votes of the candidates and get the TOP X
+                voters = needed_votes & state.train_set_votes.get_voters()
+                train_set = state.train_set_votes.get_top(Settings.TRAIN_SET_SIZE, voters)
 
-            # Wait for votes or refresh every 2 seconds
-            state.wait_votes_ready_lock.acquire(timeout=2)
+                # Clear votes
+                state.train_set_votes.clear()
+                logger.info(state.addr, "Computed %d votes.", len(voters))
+                return train_set
 
     @staticmethod
     def __validate_train_set(
@@ -178,7 +141,8 @@ class VoteTrainSetStage(Stage):
     ) -> List[str]:
         # Verify if node set is valid
         # (can happend that a node was down when the votes were being processed)
+        neighbors = communication_protocol.get_neighbors(only_direct=False)
         for tsn in train_set:
-            if tsn not in list(communication_protocol.get_neighbors(only_direct=False)) and (tsn != state.addr):
+            if tsn not in neighbors and (tsn != state.addr):
                 train_set.remove(tsn)
         return train_set
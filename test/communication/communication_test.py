@@ -17,9 +17,13 @@
 #
 """P2PFL communication tests."""
 
+import os
+import threading
 import time
-from typing import Type
+from concurrent import futures
+from typing import Any, List, Type
 
+import grpc
 import pytest
 
 from p2pfl.communication.commands.command import Command
@@ -29,8 +33,19 @@ from p2pfl.communication.protocols.exceptions import (
     NeighborNotConnectedError,
     ProtocolNotStartedError,
 )
+from p2pfl.communication.protocols.failure_detector import PhiAccrualFailureDetector
+from p2pfl.communication.protocols.gossiper import Gossiper, PendingMessages
+from p2pfl.communication.protocols.grpc.async_grpc_communication_protocol import AsyncGrpcCommunicationProtocol
+from p2pfl.communication.protocols.grpc.channel_pool import ChannelPool
+from p2pfl.communication.protocols.grpc.credentials import CredentialsProvider
 from p2pfl.communication.protocols.grpc.grpc_communication_protocol import GrpcCommunicationProtocol
+from p2pfl.communication.protocols.grpc.weights_transfer import TransferError, WeightsReassembler, build_header, iter_chunks
+from p2pfl.communication.protocols.heartbeater import Heartbeater
 from p2pfl.communication.protocols.memory.memory_communication_protocol import InMemoryCommunicationProtocol
+from p2pfl.communication.protocols.neighbors import Neighbors
+from p2pfl.communication.protocols.peer_selection import BandwidthAwarePeerSelection, PeerStats, get_peer_selection_policy
+from p2pfl.communication.protocols.rate_limiter import RateLimiter, TokenBucket
+from p2pfl.learning.frameworks.model_encoding import SUPPORTED_ENCODINGS
 from p2pfl.settings import Settings
 from p2pfl.utils.utils import set_test_settings, wait_convergence
 
@@ -52,9 +67,19 @@ class MockCommand(Command):
     def execute(self, *args, **kwargs) -> None:
         """Execute the command."""
         self.flag = True
+        self.kwargs = kwargs
 
 
-@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, InMemoryCommunicationProtocol])
+class SlowCommand(MockCommand):
+    """Mock command that takes some time to execute."""
+
+    def execute(self, *args, **kwargs) -> None:
+        """Execute the command."""
+        time.sleep(0.3)
+        super().execute(*args, **kwargs)
+
+
+@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, AsyncGrpcCommunicationProtocol, InMemoryCommunicationProtocol])
 def test_connect_invalid_node(protocol_class):
     """Test that a node can't connect to an invalid node."""
     protocol1 = protocol_class()
@@ -65,7 +90,7 @@ def test_connect_invalid_node(protocol_class):
     protocol1.stop()
 
 
-@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, InMemoryCommunicationProtocol])
+@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, AsyncGrpcCommunicationProtocol, InMemoryCommunicationProtocol])
 def test_basic_communication(protocol_class: Type[CommunicationProtocol]):
     """Test the start and stop methods."""
     # Create 2 communication protocols
@@ -122,7 +147,7 @@ def test_basic_communication(protocol_class: Type[CommunicationProtocol]):
     protocol2.stop()
 
 
-@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, InMemoryCommunicationProtocol])
+@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, AsyncGrpcCommunicationProtocol, InMemoryCommunicationProtocol])
 def test_neightboor_management_and_gossip(protocol_class: Type[CommunicationProtocol]):
     """Test the neighbor management."""
     # Create the protocols
@@ -192,7 +217,7 @@ def test_neightboor_management_and_gossip(protocol_class: Type[CommunicationProt
     protocol5.stop()
 
 
-@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, InMemoryCommunicationProtocol])
+@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, AsyncGrpcCommunicationProtocol, InMemoryCommunicationProtocol])
 def test_node_abrupt_down(protocol_class: Type[CommunicationProtocol]):
     """Test that a node abruptly down is removed from the neighbors list."""
     # Create 2 communication protocols
@@ -224,3 +249,706 @@ def test_node_abrupt_down(protocol_class: Type[CommunicationProtocol]):
 
     # Stop the protocol 1
     protocol1.stop()
+
+
+@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, AsyncGrpcCommunicationProtocol, InMemoryCommunicationProtocol])
+def test_handshake_encodings(protocol_class: Type[CommunicationProtocol]):
+    """Test that the model encodings are advertised in the handshake (both directions)."""
+    protocol1 = protocol_class()
+    protocol2 = protocol_class()
+    try:
+        protocol1.start()
+        protocol2.start()
+        assert protocol1.connect(protocol2.get_address()) is True
+        wait_convergence([protocol1, protocol2], 1, wait=5, only_direct=True)
+        assert protocol1.get_neighbor_encodings(protocol2.get_address()) == SUPPORTED_ENCODINGS
+        assert protocol2.get_neighbor_encodings(protocol1.get_address()) == SUPPORTED_ENCODINGS
+        # Unknown peers
+        assert protocol1.get_neighbor_encodings("unknown") == []
+        # Forgotten on disconnection
+        protocol1.disconnect(protocol2.get_address())
+        assert protocol1.get_neighbor_encodings(protocol2.get_address()) == []
+    finally:
+        protocol1.stop()
+        protocol2.stop()
+
+
+def test_chunked_transfer_reassembly():
+    """Test the reassembly of chunked transfers (checksums, resume and ordering)."""
+    protocol = GrpcCommunicationProtocol()
+    data = bytes(range(256)) * 40
+    msg = protocol.build_weights("mock_command", 1, data, ["a", "b"], 7)
+    header = build_header(msg)
+    chunks = list(iter_chunks("t1", header, data, 1000))
+    assert len(chunks) == 11
+    assert chunks[0].HasField("header") and not chunks[1].HasField("header")
+
+    reassembler = WeightsReassembler(timeout=10)
+
+    # Unknown transfer (no header)
+    with pytest.raises(TransferError):
+        reassembler.add_chunk(chunks[1])
+
+    # Corrupted chunk
+    assert reassembler.add_chunk(chunks[0]) is None
+    corrupted = type(chunks[1])()
+    corrupted.CopyFrom(chunks[1])
+    corrupted.data = b"x" * len(corrupted.data)
+    with pytest.raises(TransferError):
+        reassembler.add_chunk(corrupted)
+
+    # Out of order
+    with pytest.raises(TransferError):
+        reassembler.add_chunk(chunks[3])
+
+    # Resume from the received bytes
+    assert reassembler.add_chunk(chunks[1]) is None
+    assert reassembler.received("t1") == 2000
+    completed = None
+    for chunk in iter_chunks("t1", header, data, 1000, start=reassembler.received("t1")):
+        completed = reassembler.add_chunk(chunk)
+    assert completed is not None
+    received_header, weights = completed
+    assert weights == data
+    assert received_header.round == 1
+    assert list(received_header.weights.contributors) == ["a", "b"]
+    assert received_header.weights.num_samples == 7
+    assert reassembler.received("t1") == 0
+
+    # Transfers larger than the limit are rejected before allocating the buffer
+    small_reassembler = WeightsReassembler(timeout=10, max_size=len(data) - 1)
+    with pytest.raises(TransferError):
+        small_reassembler.add_chunk(chunks[0])
+    assert small_reassembler.received("t1") == 0
+
+
+@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, AsyncGrpcCommunicationProtocol])
+def test_chunked_weights_grpc(protocol_class: Type[CommunicationProtocol]):
+    """Test that large models are streamed in chunks between gRPC nodes."""
+    chunk_size = Settings.GRPC_CHUNK_SIZE
+    Settings.GRPC_CHUNK_SIZE = 1000
+    protocol1 = protocol_class()
+    protocol2 = protocol_class()
+    command = MockCommand()
+    protocol2.add_command(command)
+    try:
+        protocol1.start()
+        protocol2.start()
+        assert protocol1.connect(protocol2.get_address()) is True
+
+        data = bytes(range(256)) * 100
+        msg = protocol1.build_weights(command.get_name(), 3, data, ["c"], 5)
+        protocol1.send(protocol2.get_address(), msg, raise_error=True)
+
+        assert command.flag is True
+        assert command.kwargs["weights"] == data
+        assert list(command.kwargs["contributors"]) == ["c"]
+        assert command.kwargs["num_samples"] == 5
+    finally:
+        Settings.GRPC_CHUNK_SIZE = chunk_size
+        protocol1.stop()
+        protocol2.stop()
+
+
+def test_channel_pool():
+    """Test the reuse and the LRU/idle eviction of pooled channels."""
+    created = []
+    closed = []
+
+    class TrackedChannel:
+        def __init__(self, addr):
+            self.addr = addr
+            self.channel = grpc.insecure_channel(addr)
+
+        def __getattr__(self, name):
+            return getattr(self.channel, name)
+
+        def close(self):
+            closed.append(self.addr)
+            self.channel.close()
+
+    def factory(addr):
+        created.append(addr)
+        return TrackedChannel(addr)
+
+    pool = ChannelPool(factory, max_size=2, idle_timeout=60)
+
+    # Reuse
+    stub = pool.get_stub("127.0.0.1:1")
+    assert pool.get_stub("127.0.0.1:1") is stub
+    assert created == ["127.0.0.1:1"]
+
+    # LRU eviction
+    pool.get_stub("127.0.0.1:2")
+    pool.get_stub("127.0.0.1:1")
+    pool.get_stub("127.0.0.1:3")
+    assert closed == ["127.0.0.1:2"]
+    assert len(pool) == 2 and "127.0.0.1:1" in pool and "127.0.0.1:3" in pool
+
+    # Idle eviction
+    pool.idle_timeout = 0
+    time.sleep(0.01)
+    pool.get_stub("127.0.0.1:4")
+    assert sorted(closed) == ["127.0.0.1:1", "127.0.0.1:2", "127.0.0.1:3"]
+    assert len(pool) == 1
+
+    # Remove and close
+    pool.remove("127.0.0.1:4")
+    assert len(pool) == 0
+    pool.get_stub("127.0.0.1:5")
+    pool.close()
+    assert len(pool) == 0 and closed[-1] == "127.0.0.1:5"
+
+
+def test_credentials_provider(tmp_path):
+    """Test that SSL credentials are loaded once and reloaded when the files change."""
+    paths = {}
+    for name in ["CLIENT_KEY", "CLIENT_CRT", "SERVER_KEY", "SERVER_CRT", "CA_CRT"]:
+        path = tmp_path / name.lower()
+        path.write_text(name)
+        paths[name] = getattr(Settings, name)
+        setattr(Settings, name, str(path))
+    try:
+        provider = CredentialsProvider()
+        channel_creds = provider.get_channel_credentials()
+        server_creds = provider.get_server_credentials()
+        assert provider.get_channel_credentials() is channel_creds
+        assert provider.get_server_credentials() is server_creds
+
+        # Rotation
+        stat = os.stat(Settings.CA_CRT)
+        os.utime(Settings.CA_CRT, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert provider.get_channel_credentials() is not channel_creds
+        assert provider.get_server_credentials() is not server_creds
+
+        # Missing files
+        os.remove(Settings.CLIENT_KEY)
+        with pytest.raises(OSError):
+            provider.get_channel_credentials()
+    finally:
+        for name, path in paths.items():
+            setattr(Settings, name, path)
+
+
+def test_async_grpc_non_blocking():
+    """Test that the asynchronous gRPC protocol sends and broadcasts without blocking (returning futures)."""
+    protocol1 = AsyncGrpcCommunicationProtocol()
+    protocol2 = AsyncGrpcCommunicationProtocol()
+    command = MockCommand()
+    protocol2.add_command(command)
+    try:
+        protocol1.start()
+        protocol2.start()
+        assert protocol1.connect(protocol2.get_address()) is True
+
+        # Send
+        future = protocol1.send(protocol2.get_address(), protocol1.build_msg(command.get_name()))
+        future.result(timeout=Settings.GRPC_TIMEOUT)
+        assert command.flag is True
+
+        # Broadcast
+        command.flag = False
+        latencies = len(protocol1._client.broadcast_latency)
+        future = protocol1.broadcast(protocol1.build_msg(command.get_name()))
+        future.result(timeout=Settings.GRPC_TIMEOUT)
+        assert command.flag is True
+
+        # Broadcast latencies (same metrics as the synchronous protocol)
+        assert len(protocol1._client.broadcast_latency) > latencies
+    finally:
+        protocol1.stop()
+        protocol2.stop()
+
+
+def test_async_grpc_periodic_tasks():
+    """Test that the asynchronous gRPC protocol gossips and sends heartbeats without threads of its own."""
+    protocols = [AsyncGrpcCommunicationProtocol() for _ in range(3)]
+    commands = [MockCommand() for _ in protocols]
+    for p, c in zip(protocols, commands):
+        p.add_command(c)
+    command = commands[2]
+    try:
+        for p in protocols:
+            p.start()
+        assert protocols[0].connect(protocols[1].get_address()) is True
+        assert protocols[1].connect(protocols[2].get_address()) is True
+
+        # Relayed by the gossip of the node in the middle
+        protocols[0].broadcast(protocols[0].build_msg(command.get_name())).result(timeout=Settings.GRPC_TIMEOUT)
+        deadline = time.monotonic() + 5
+        while not command.flag and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert command.flag is True
+
+        # Heartbeats keep the neighbors
+        time.sleep(Settings.HEARTBEAT_PERIOD * 2)
+        assert protocols[2].get_address() in protocols[1].get_neighbors(only_direct=True)
+
+        # No heartbeater nor gossiper threads per node
+        names = [t.name for t in threading.enumerate()]
+        assert not [n for n in names if n.startswith(("heartbeater-thread", "gossiper-thread"))]
+    finally:
+        for p in protocols:
+            p.stop()
+
+
+@pytest.mark.parametrize("protocol_class", [GrpcCommunicationProtocol, InMemoryCommunicationProtocol])
+def test_concurrent_broadcast(protocol_class: Type[CommunicationProtocol]):
+    """Test that broadcasts are sent to all the neighbors concurrently."""
+    protocols = [protocol_class() for _ in range(4)]
+    commands = [SlowCommand() for _ in range(3)]
+    for p, c in zip(protocols[1:], commands):
+        p.add_command(c)
+    try:
+        for p in protocols:
+            p.start()
+        for p in protocols[1:]:
+            assert protocols[0].connect(p.get_address()) is True
+
+        # 3 slow neighbors (0.3s each)
+        t = time.time()
+        protocols[0].broadcast(protocols[0].build_msg(SlowCommand.get_name()))
+        assert time.time() - t < 0.75
+        assert all(c.flag for c in commands)
+
+        # Latencies
+        latency = protocols[0]._client.broadcast_latency
+        assert len(latency) >= 3
+        assert set(latency.percentiles()) == {"p50", "p90", "p99"}
+        assert latency.percentiles([100])["p100"] >= 0.3
+    finally:
+        for p in protocols:
+            p.stop()
+
+
+def test_grpc_control_lane():
+    """Test that control-plane messages are not delayed by busy model transfers, and busy neighbors are kept."""
+
+    class SlowWeightsCommand(MockCommand):
+        @staticmethod
+        def get_name() -> str:
+            return "slow_weights"
+
+        def execute(self, *args, **kwargs) -> None:
+            super().execute(*args, **kwargs)
+            time.sleep(1)
+
+    bulk_workers, control_workers = Settings.GRPC_SERVER_WORKERS, Settings.GRPC_SERVER_CONTROL_WORKERS
+    Settings.GRPC_SERVER_WORKERS = 1
+    Settings.GRPC_SERVER_CONTROL_WORKERS = 1
+    protocol1 = GrpcCommunicationProtocol()
+    protocol2 = GrpcCommunicationProtocol()
+    command = MockCommand()
+    weights_command = SlowWeightsCommand()
+    protocol2.add_command([command, weights_command])
+    try:
+        protocol1.start()
+        protocol2.start()
+        assert protocol1.connect(protocol2.get_address()) is True
+
+        # Overflow the bulk lane
+        for _ in range(5):
+            msg = protocol1.build_weights(SlowWeightsCommand.get_name(), 1, b"weights")
+            threading.Thread(target=protocol1.send, args=(protocol2.get_address(), msg)).start()
+        time.sleep(0.1)
+
+        # Control-plane message (it would wait behind the transfers)
+        start = time.monotonic()
+        protocol1.send(protocol2.get_address(), protocol1.build_msg(command.get_name()), raise_error=True)
+        assert time.monotonic() - start < 0.5
+        assert command.flag is True
+
+        # Rejected transfers do not disconnect the busy neighbor
+        assert weights_command.flag is True
+        assert protocol2.get_address() in protocol1.get_neighbors(only_direct=True)
+    finally:
+        Settings.GRPC_SERVER_WORKERS = bulk_workers
+        Settings.GRPC_SERVER_CONTROL_WORKERS = control_workers
+        protocol1.stop()
+        protocol2.stop()
+
+
+def test_gossiper_duplicate_detection():
+    """Test the bounded duplicate message detection of the gossiper."""
+    saved = Settings.AMOUNT_LAST_MESSAGES_SAVED
+    Settings.AMOUNT_LAST_MESSAGES_SAVED = 3
+    try:
+        gossiper = Gossiper("node", InMemoryCommunicationProtocol()._client)
+        assert all(gossiper.check_and_set_processed(h) for h in range(5))
+        # The oldest ones have been forgotten
+        assert gossiper.check_and_set_processed(4) is False
+        assert gossiper.check_and_set_processed(2) is False
+        assert gossiper.check_and_set_processed(1) is True
+        assert gossiper.get_processed_stats() == {"hits": 2, "misses": 6, "size": 3}
+        # Adding 1 evicted 2
+        assert gossiper.check_and_set_processed(2) is True
+    finally:
+        Settings.AMOUNT_LAST_MESSAGES_SAVED = saved
+
+
+def test_pending_messages_priority_and_coalescing():
+    """Test that pending gossip messages are prioritized and superseded messages are coalesced."""
+    queue = PendingMessages()
+    queue.push("metrics", ["a", "b"], "metrics", "n1")
+    queue.push("beat-1", ["a"], "beat", "n1")
+    queue.push("vote", ["a", "b"], "vote_train_set", "n1")
+    queue.push("beat-2", ["b"], "beat", "n1")  # supersedes beat-1
+    queue.push("beat-n2", ["a"], "beat", "n2")
+    assert len(queue) == 4
+    assert queue.coalesced == 1
+
+    # Budget of 3 messages: the vote first, then the latest beat of n1 (partially)
+    assert queue.pop(3) == [("vote", ["a", "b"]), ("beat-2", ["a"])]
+    assert queue.pop(10) == [("beat-2", ["b"]), ("beat-n2", ["a"]), ("metrics", ["a", "b"])]
+    assert len(queue) == 0
+
+    # Once sent, a beat is no longer coalesced
+    queue.push("beat-3", ["a"], "beat", "n1")
+    assert queue.pop(10) == [("beat-3", ["a"])]
+
+
+def test_rate_limiter():
+    """Test the message and byte rates of the gossip rate limiter."""
+    # Unlimited
+    assert TokenBucket(None).reserve(1e9) == 0
+
+    # Messages: 100 msg/s with a burst of 100, so 150 messages take 0.5s
+    limiter = RateLimiter("node", messages_per_second=100, report_period=60)
+    t = time.monotonic()
+    for _ in range(150):
+        assert limiter.acquire()
+    assert 0.4 < time.monotonic() - t < 1
+    rates = limiter.get_rates()
+    assert rates["target_messages_per_second"] == 100
+    assert rates["target_bytes_per_second"] == 0
+    assert rates["messages_per_second"] < 300
+
+    # Bytes: a message larger than the burst is sent, but the next ones pay its debt
+    limiter = RateLimiter("node", bytes_per_second=1000, report_period=60)
+    t = time.monotonic()
+    assert limiter.acquire(1, 1500)
+    assert time.monotonic() - t < 0.1
+    assert limiter.acquire(1, 100)
+    assert time.monotonic() - t > 0.5
+
+    # Interrupted wait
+    stop = threading.Event()
+    stop.set()
+    assert limiter.acquire(1, 1000, stop) is False
+
+
+def test_gossip_period_not_exceeded():
+    """Test that the time spent gossiping is not slept again at the end of each period."""
+    rounds = iter(range(5))
+
+    def get_candidates():
+        time.sleep(0.05)  # work
+        return ["nei"] if next(rounds, None) is not None else []
+
+    gossiper = Gossiper("node", InMemoryCommunicationProtocol()._client)
+    t = time.monotonic()
+    gossiper.gossip_weights(lambda: False, get_candidates, time.monotonic, lambda _: None, 0.1, False)
+    # 5 periods of 0.1s + the last round (5 * 0.15s + 0.05s if the work was slept again)
+    assert time.monotonic() - t < 0.7
+
+
+def test_gossip_weights_interrupted_by_stop():
+    """Test that the model gossip stops waiting for the rate limiter when the gossiper is stopped."""
+    client = InMemoryCommunicationProtocol()._client
+    gossiper = Gossiper("node", client)
+    gossiper.rate_limiter = RateLimiter("node", bytes_per_second=1)
+    model = client.build_weights("cmd", 0, b"x" * 1000)
+    thread = threading.Thread(
+        target=gossiper.gossip_weights, args=(lambda: False, lambda: ["nei"], time.monotonic, lambda _: model, 0.1, False)
+    )
+    thread.start()
+    time.sleep(0.2)
+    gossiper.stop()
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+
+
+def test_gossip_in_flight_backpressure():
+    """Test that the gossiper waits for the sends of asynchronous clients to complete (per neighbor)."""
+
+    class FutureClient:
+        def __init__(self):
+            self.sent = []
+
+        def get_message_size(self, msg):
+            return 1
+
+        def send(self, nei, msg, **kwargs):
+            future = futures.Future()
+            self.sent.append((nei, msg, future))
+            return future
+
+    client = FutureClient()
+    gossiper = Gossiper("node", client, period=0.01)  # type: ignore
+    gossiper.start()
+    try:
+        gossiper.add_message("m1", ["a", "b"])
+        gossiper.add_message("m2", ["a", "b"])
+        time.sleep(0.2)
+        # One send in flight per neighbor
+        assert [(nei, msg) for nei, msg, _ in client.sent] == [("a", "m1"), ("b", "m1")]
+        client.sent[0][2].set_result(None)
+        time.sleep(0.2)
+        assert [(nei, msg) for nei, msg, _ in client.sent] == [("a", "m1"), ("b", "m1"), ("a", "m2")]
+        # Timed when completed
+        assert gossiper.peer_stats.latency("a") is not None
+        assert gossiper.peer_stats.latency("b") is None
+        client.sent[1][2].set_result(None)
+    finally:
+        gossiper.stop()
+        gossiper.join(timeout=5)
+    assert not gossiper.is_alive()
+
+
+def test_gossip_model_send_does_not_block_messages():
+    """Test that a blocked model send to a neighbor does not delay the small messages to it or to others."""
+
+    class BlockingClient:
+        def __init__(self):
+            self.release = threading.Event()
+            self.sent = []
+
+        def get_message_size(self, msg):
+            return 1000 if msg == "model" else 1
+
+        def send(self, nei, msg, **kwargs):
+            if msg == "model":
+                self.release.wait()
+            self.sent.append((nei, msg))
+
+    client = BlockingClient()
+    gossiper = Gossiper("node", client, period=0.01)  # type: ignore
+    gossiper.start()
+    model_thread = threading.Thread(
+        target=gossiper.gossip_weights,
+        args=(lambda: False, lambda: [] if ("a", "model") in client.sent else ["a"], time.monotonic, lambda _: "model", 0.01, False),
+    )
+    model_thread.start()
+    try:
+        time.sleep(0.1)
+        gossiper.add_message("beat", ["a", "b"])
+        time.sleep(0.2)
+        assert ("a", "beat") in client.sent
+        assert ("b", "beat") in client.sent
+        assert ("a", "model") not in client.sent
+    finally:
+        client.release.set()
+        model_thread.join(timeout=5)
+        gossiper.stop()
+        gossiper.join(timeout=5)
+    assert not model_thread.is_alive()
+    assert not gossiper.is_alive()
+
+
+def test_bandwidth_aware_peer_selection():
+    """Test that model gossip targets are selected by the gap closed per second."""
+    stats = PeerStats(alpha=0.5)
+    stats.record_latency("fast", 0.01)
+    stats.record_transfer("fast", 1000, 0.11)  # 10 KB/s
+    stats.record_latency("slow", 0.01)
+    stats.record_transfer("slow", 1000, 1.01)  # 1 KB/s
+    assert stats.throughput("fast") == pytest.approx(10000)
+    assert stats.estimate_send_time("slow", 2000) == pytest.approx(2.01)
+    assert stats.estimate_send_time("unknown", 2000) is None
+
+    # EWMA
+    stats.record_latency("fast", 0.03)
+    assert stats.latency("fast") == pytest.approx(0.02)
+
+    policy = BandwidthAwarePeerSelection()
+    assert policy.select(["slow", "fast"], 1, stats, nbytes=1000) == ["fast"]
+    # The slow link closes a gap big enough to be worth it
+    assert policy.select(["slow", "fast"], 1, stats, gaps={"slow": 20, "fast": 1}, nbytes=1000) == ["slow"]
+    # Unknown links are explored (as fast as the fastest known one)
+    assert policy.select(["slow", "fast", "new"], 2, stats, gaps={"slow": 1, "fast": 1, "new": 2}, nbytes=1000) == ["new", "fast"]
+
+    stats.remove("fast")
+    assert stats.latency("fast") is None
+
+    assert len(get_peer_selection_policy("random").select(["a", "b", "c"], 2, stats)) == 2
+    with pytest.raises(ValueError):
+        get_peer_selection_policy("unknown")
+
+
+def test_gossip_gaps_only_for_policies_that_need_them():
+    """Test that the gaps of the candidates are only computed if the peer selection policy reads them."""
+    gaps: List[str] = []
+
+    def gap_fn(nei: str) -> int:
+        gaps.append(nei)
+        return 1
+
+    for policy, computed in [("random", False), ("bandwidth", True)]:
+        gaps.clear()
+        rounds = iter(range(2))
+        gossiper = Gossiper("node", InMemoryCommunicationProtocol()._client)
+        gossiper.peer_selection = get_peer_selection_policy(policy)
+        gossiper.gossip_weights(
+            lambda: False,
+            lambda: ["a", "b"] if next(rounds, None) is not None else [],
+            time.monotonic,
+            lambda _: None,
+            0.01,
+            False,
+            gap_fn=gap_fn,
+        )
+        assert bool(gaps) is computed
+
+
+def test_phi_accrual_failure_detector():
+    """Test that the suspicion level adapts to the heartbeat intervals of each node."""
+    detector = PhiAccrualFailureDetector(threshold=8, acceptable_pause=0, min_std=0.1)
+    assert detector.phi("unknown") == 0
+    for t in range(10):
+        detector.heartbeat("regular", float(t))
+        detector.heartbeat("jittery", float(t) * 1.5 if t % 2 else float(t))
+    assert detector.heartbeat("regular", 5.0) is False  # older heartbeats are ignored
+
+    # The suspicion grows with the silence
+    assert detector.phi("regular", 10) < 1 < detector.phi("regular", 11) < detector.phi("regular", 12)
+    assert detector.is_available("regular", 10)
+    assert not detector.is_available("regular", 12)
+    # Links with jitter tolerate longer silences
+    assert detector.phi("jittery", 14.5) < detector.phi("regular", 11.5)
+
+    detector.remove("regular")
+    assert "regular" not in detector
+    assert detector.get_nodes() == ["jittery"]
+
+
+def test_heartbeat_digest():
+    """Test that nodes are discovered and removed with heartbeats only sent to direct neighbors."""
+    saved = Settings.HEARTBEAT_MODE
+    Settings.HEARTBEAT_MODE = "digest"
+    try:
+        protocols = [InMemoryCommunicationProtocol() for _ in range(3)]
+        for p in protocols:
+            p.start()
+        # Line: 0 - 1 - 2
+        protocols[0].connect(protocols[1].get_address())
+        protocols[1].connect(protocols[2].get_address())
+
+        # Nodes 0 and 2 know each other through the digests of node 1
+        wait_convergence(protocols, 2, wait=5, only_direct=False)
+        assert len(protocols[0].get_neighbors(only_direct=True)) == 1
+
+        # Node 2 down
+        protocols[2].stop()
+        wait_convergence(protocols[:2], 1, wait=Settings.HEARTBEAT_TIMEOUT * 3, only_direct=False)
+        for p in protocols[:2]:
+            p.stop()
+    finally:
+        Settings.HEARTBEAT_MODE = saved
+
+
+class TableNeighbors(Neighbors):
+    """Neighbors without connections."""
+
+    def connect(self, addr: str, non_direct: bool = False, last_time: float = 0) -> Any:
+        """Connect to a neighbor."""
+        return (None, None if non_direct else "stub", last_time)
+
+    def disconnect(self, addr: str) -> None:
+        """Disconnect from a neighbor."""
+        pass
+
+    def refresh_or_add(self, addr: str, time: float) -> None:
+        """Refresh a neighbor."""
+        with self.neis_lock:
+            nei = self.neis[addr]
+            self._set(addr, (nei[0], nei[1], time))
+
+
+def test_neighbor_table():
+    """Test the indexes, snapshots and expiry of the neighbor table."""
+    neighbors = TableNeighbors("self")
+    neighbors.add("a", last_time=1)
+    neighbors.add("b", non_direct=True, last_time=2)
+    neighbors.add("c", last_time=3)
+
+    # Indexes and snapshots
+    direct = neighbors.get_all(only_direct=True)
+    assert set(direct) == {"a", "c"}
+    assert set(neighbors.get_all()) == {"a", "b", "c"}
+    assert neighbors.is_direct("a") and not neighbors.is_direct("b")
+    with pytest.raises(TypeError):
+        direct["d"] = None  # type: ignore
+    # Refreshes do not alter the previous snapshots
+    neighbors.refresh_or_add("a", 10)
+    assert direct["a"][2] == 1
+    assert set(neighbors.get_all(only_direct=True)) == set(direct)
+    assert neighbors.get_all(only_direct=True)["a"][2] == 10
+    assert neighbors.get_all()["a"][2] == 10
+
+    # Encodings
+    encodings = ["binary", "pickle"]
+    neighbors.set_encodings("a", encodings)
+    encodings.clear()
+    assert neighbors.get_encodings("a") == ["binary", "pickle"]
+    assert neighbors.get_encodings("b") == []
+
+    # Expiry
+    assert neighbors.get_expired(2.5) == ["b"]
+    assert sorted(neighbors.get_expired(5)) == ["b", "c"]
+    neighbors.refresh_or_add("b", 11)
+    assert neighbors.get_expired(5) == ["c"]
+
+    # Membership changes do not alter the previous snapshots
+    version = neighbors.version
+    neighbors.remove("c")
+    assert neighbors.version == version + 1
+    assert set(direct) == {"a", "c"}
+    assert set(neighbors.get_all(only_direct=True)) == {"a"}
+    assert neighbors.get_expired(20) == ["a", "b"]
+
+    # Removal callbacks (only for known neighbors)
+    removed = []
+    neighbors.add_removal_callback(removed.append)
+    neighbors.remove("b")
+    neighbors.remove("unknown")
+    assert removed == ["b"]
+
+
+def test_traffic_liveness():
+    """Test that messages other than heartbeats only refresh the known neighbors that sent them."""
+    neighbors = TableNeighbors("self")
+    neighbors.add("a", last_time=1)
+    heartbeater = Heartbeater("self", neighbors, InMemoryCommunicationProtocol()._client)
+    heartbeater.notify_received("a")
+    assert neighbors.get_expired(time.time() - 60) == []
+    # Not a heartbeat sample
+    assert "a" not in heartbeater.failure_detector
+    # Unknown (or removed) nodes are not added
+    heartbeater.notify_received("unknown")
+    assert not neighbors.exists("unknown")
+
+
+def test_relayed_messages_liveness():
+    """Test that a relayed message is a proof of life of the neighbor that relayed it, not of its source."""
+    protocols = [InMemoryCommunicationProtocol() for _ in range(2)]
+    for p in protocols:
+        p.start()
+    try:
+        protocols[0].connect(protocols[1].get_address())
+        wait_convergence(protocols, 1, wait=5)
+        msg = protocols[1]._client.build_message("unknown_cmd")
+        msg["source"] = "relayed-source"
+        protocols[1]._client.send(protocols[0].get_address(), msg)
+        assert not protocols[0]._neighbors.exists("relayed-source")
+    finally:
+        for p in protocols:
+            p.stop()
+
+
+def test_peer_stats_removed_with_neighbor():
+    """Test that the gossiper forgets the link stats of a removed neighbor."""
+    protocol = InMemoryCommunicationProtocol()
+    protocol._neighbors.add("nei", non_direct=True)
+    protocol._gossiper.peer_stats.record_latency("nei", 0.1)
+    protocol._neighbors.remove("nei")
+    assert protocol._gossiper.peer_stats.latency("nei") is None
@@ -24,8 +24,12 @@ from typing import Any, Dict, List, Optional, Union
 import numpy as np
 import pytest
 
+from p2pfl.learning.aggregators.aggregator import NoModelsToAggregateError, get_aggregation_executor
 from p2pfl.learning.aggregators.fedavg import FedAvg
+from p2pfl.learning.aggregators.fedmedian import FedMedian
+from p2pfl.learning.aggregators.trimmed_mean import TrimmedMean
 from p2pfl.learning.frameworks.p2pfl_model import P2PFLModel
+from p2pfl.settings import Settings
 
 # Import PyTorch models if available
 with contextlib.suppress(ImportError):
@@ -41,12 +45,13 @@ class P2PFLModelMock(P2PFLModel):
         params: Optional[Union[List[np.ndarray], bytes]] = None,
         num_samples: Optional[int] = None,
         contributors: Optional[List[str]] = None,
-        aditional_info: Optional[Dict[str, str]] = None,
+        additional_info: Optional[Dict[str, str]] = None,
     ) -> None:
         """Initialize the model."""
         self.params = params
         self.num_samples = num_samples  # type: ignore
         self.contributors = contributors  # type: ignore
+        self.additional_info = additional_info if additional_info is not None else {}
 
     def get_parameters(self):
         """Get the model parameters."""
@@ -153,10 +158,235 @@ def test_aggregator_lifecycle():
     assert aggregator.get_aggregated_models() == []
 
 
-"""
-def test_median_simple():
-    raise NotImplementedError
+def test_partial_aggregation_memoized():
+    """Test that partial aggregations are reused until the models change."""
+    aggregator = FedAvg()
+    aggregator.set_nodes_to_aggregate(["node1", "node2", "node3"])
+    aggregator.add_model(P2PFLModelMock(None, params=[np.array([1.0, 2.0])], num_samples=1, contributors=["node1"]))
+    aggregator.add_model(P2PFLModelMock(None, params=[np.array([3.0, 4.0])], num_samples=1, contributors=["node2"]))
+
+    # Same contributors included, same aggregation
+    partial_model = aggregator.get_model(["node3"])
+    assert aggregator.get_model(["node3"]) is partial_model
+    assert aggregator.get_model([]) is partial_model
+    assert np.array_equal(partial_model.get_parameters()[0], np.array([2.0, 3.0]))
+    assert aggregator.get_model(["node2"]) is not partial_model
+
+    # Adding a model invalidates the cache
+    aggregator.add_model(P2PFLModelMock(None, params=[np.array([5.0, 6.0])], num_samples=1, contributors=["node3"]))
+    full_model = aggregator.get_model([])
+    assert full_model is not partial_model
+    assert np.array_equal(full_model.get_parameters()[0], np.array([3.0, 4.0]))
+    assert aggregator.get_model(["node3"]) is not partial_model
+
+    # Clearing invalidates the cache
+    aggregator.clear()
+    aggregator.set_nodes_to_aggregate(["node1"])
+    aggregator.add_model(P2PFLModelMock(None, params=[np.array([1.0, 1.0])], num_samples=1, contributors=["node1"]))
+    assert np.array_equal(aggregator.get_model([]).get_parameters()[0], np.array([1.0, 1.0]))
+
+
+def test_avg_incremental():
+    """Test that the incremental FedAvg matches the regular one and releases the models."""
+    params = [
+        [np.array([1.0, 2.0, 3.0], dtype=np.float32), np.array([[1, 2]])],
+        [np.array([4.0, 5.0, 6.0], dtype=np.float32), np.array([[3, 4]])],
+        [np.array([7.0, 8.0, 9.0], dtype=np.float32), np.array([[5, 6]])],
+    ]
+    models = [P2PFLModelMock(None, params=p, num_samples=i + 1, contributors=[f"node{i}"]) for i, p in enumerate(params)]
+    expected = FedAvg().aggregate(models)
+
+    aggregator = FedAvg(incremental=True)
+    aggregator.set_nodes_to_aggregate(["node0", "node1", "node2"])
+    for m in models[:2]:
+        aggregator.add_model(m)
+
+    # node0 is folded, node1 (last received) is kept
+    partial_model = aggregator.get_model(["node2"])
+    assert aggregator.get_model([]) is partial_model
+    assert set(partial_model.get_contributors()) == {"node0", "node1"}
+    assert np.allclose(partial_model.get_parameters()[0], np.array([3.0, 4.0, 5.0]))
+    assert aggregator.get_model(["node1"]).get_contributors() == ["node0"]
+    assert aggregator.get_model(["node0"]).get_contributors() == ["node1"]
+    with pytest.raises(NoModelsToAggregateError):
+        aggregator.get_model(["node0", "node1"])
+
+    aggregator.add_model(models[2])
+    res = aggregator.wait_and_get_aggregation(timeout=1)
+    for layer, expected_layer in zip(res.get_parameters(), expected.get_parameters()):
+        assert layer.dtype == expected_layer.dtype
+        assert np.allclose(layer, expected_layer)
+    assert res.get_num_samples() == 6
+    assert set(res.get_contributors()) == {"node0", "node1", "node2"}
+    assert aggregator.get_missing_models() == set()
+
+    # Changes made by the node to the aggregated model do not alter the cached aggregation sent to neighbors
+    cached = aggregator.get_model([])
+    assert res is not cached
+    res.get_parameters()[0][:] = 0
+    res.add_info("callback", "info")
+    assert np.allclose(cached.get_parameters()[0], expected.get_parameters()[0])
+    assert cached.get_info() == {}
+
+    # Clear resets the running sum
+    aggregator.clear()
+    with pytest.raises(NoModelsToAggregateError):
+        aggregator.get_running_aggregation(models[0])
+
+
+def test_avg_incremental_ring():
+    """Test that a ring of incremental FedAvg aggregators completes the round by gossiping partial aggregations."""
+    nodes = ["A", "B", "C"]
+    aggregators = {n: FedAvg(node_name=n, incremental=True) for n in nodes}
+    for i, n in enumerate(nodes):
+        aggregators[n].set_nodes_to_aggregate(nodes)
+        aggregators[n].add_model(P2PFLModelMock(None, params=[np.array([float(i)])], num_samples=1, contributors=[n]))
+
+    def gossip(src: str, dst: str) -> None:
+        with contextlib.suppress(NoModelsToAggregateError):
+            aggregators[dst].add_model(aggregators[src].get_model(aggregators[dst].get_aggregated_models()))
+
+    gossip("A", "B")  # B = {A, B}
+    gossip("B", "C")  # C = {A, B, C}
+    for _ in range(3):
+        for src, dst in [("A", "B"), ("B", "C"), ("C", "A"), ("B", "A"), ("C", "B"), ("A", "C")]:
+            gossip(src, dst)
+
+    for n in nodes:
+        assert aggregators[n].get_missing_models() == set()
+        t = time.time()
+        res = aggregators[n].wait_and_get_aggregation(timeout=1)
+        assert time.time() - t < 1
+        assert np.allclose(res.get_parameters()[0], np.array([1.0]))
+        assert set(res.get_contributors()) == set(nodes)
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 4])
+def test_median_simple(chunk_size):
+    """Test median aggregation (odd and even number of models, chunked)."""
+    models = [
+        P2PFLModelMock(None, params=[np.array([1.0, 20.0, 3.0]), np.array([[1.0], [5.0]])], num_samples=1, contributors=["1"]),
+        P2PFLModelMock(None, params=[np.array([4.0, 5.0, 600.0]), np.array([[2.0], [4.0]])], num_samples=1, contributors=["2"]),
+        P2PFLModelMock(None, params=[np.array([-70.0, 8.0, 9.0]), np.array([[3.0], [3.0]])], num_samples=1, contributors=["3"]),
+        P2PFLModelMock(None, params=[np.array([2.0, 6.0, 4.0]), np.array([[4.0], [2.0]])], num_samples=1, contributors=["4"]),
+    ]
+    aggregator = FedMedian(chunk_size=chunk_size)
+
+    res = aggregator.aggregate(models[:3])
+    assert np.array_equal(res.get_parameters()[0], np.array([1.0, 8.0, 9.0]))
+    assert np.array_equal(res.get_parameters()[1], np.array([[2.0], [4.0]]))
+    assert set(res.get_contributors()) == {"1", "2", "3"}
+
+    res = aggregator.aggregate(models)
+    for layer, expected in zip(res.get_parameters(), [np.median([m.get_parameters()[i] for m in models], axis=0) for i in range(2)]):
+        assert np.array_equal(layer, expected)
+    assert res.get_num_samples() == 4
+
+    with pytest.raises(NoModelsToAggregateError):
+        aggregator.aggregate([])
+
+
+@pytest.mark.parametrize("chunk_size", [None, 3])
+def test_trimmed_mean_simple(chunk_size):
+    """Test trimmed mean aggregation."""
+    values = [1.0, 2.0, 3.0, 4.0, 1000.0, -1000.0, 5.0, 6.0, 7.0, 8.0]
+    models = [
+        P2PFLModelMock(None, params=[np.full(5, v, dtype=np.float32)], num_samples=1, contributors=[str(i)]) for i, v in enumerate(values)
+    ]
+    res = TrimmedMean(beta=0.1, chunk_size=chunk_size).aggregate(models)
+    assert res.get_parameters()[0].dtype == np.float32
+    assert np.allclose(res.get_parameters()[0], np.mean(sorted(values)[1:-1]))
+
+    # Without trimming, it is the mean
+    res = TrimmedMean(beta=0.0, chunk_size=chunk_size).aggregate(models)
+    assert np.allclose(res.get_parameters()[0], np.mean(values))
+
+    with pytest.raises(ValueError):
+        TrimmedMean(beta=0.5)
+
 
 def test_median_complex():
-    raise NotImplementedError
-"""
+    """Test median aggregation (models)."""
+    model = LightningModel(MLP(), num_samples=1, contributors=["1"])
+    params = model.get_parameters()
+    res = FedMedian(chunk_size=1000).aggregate(
+        [
+            model,
+            LightningModel(MLP(), params=[layer + 1.0 for layer in params], num_samples=2, contributors=["2"]),
+            LightningModel(MLP(), params=[layer - 1.0 for layer in params], num_samples=2, contributors=["3"]),
+        ]
+    )
+    for i, layer in enumerate(res.get_parameters()):
+        assert np.allclose(layer, model.get_parameters()[i], atol=1e-7), f"Layer {i} does not match"
+
+
+@pytest.mark.parametrize("aggregator_class", [FedAvg, FedMedian, TrimmedMean])
+def test_sharded_aggregation(aggregator_class):
+    """Test that aggregating in parallel shards gives the same result as in a single thread."""
+    rng = np.random.default_rng(0)
+    models = [
+        P2PFLModelMock(
+            None,
+            params=[rng.normal(size=(7, 3)).astype(np.float32), rng.normal(size=5), rng.normal(size=())],
+            num_samples=i + 1,
+            contributors=[str(i)],
+        )
+        for i in range(5)
+    ]
+    expected = aggregator_class().aggregate(models)
+
+    workers, min_shard_size = Settings.AGGREGATION_WORKERS, Settings.AGGREGATION_MIN_SHARD_SIZE
+    Settings.AGGREGATION_WORKERS, Settings.AGGREGATION_MIN_SHARD_SIZE = 4, 2
+    try:
+        shards = []
+        aggregator = aggregator_class()
+        aggregator.map_shards(27, lambda start, stop: shards.append((start, stop)))
+        assert sorted(shards) == [(0, 6), (6, 13), (13, 20), (20, 27)]
+
+        res = aggregator.aggregate(models)
+
+        # Resizing the pool while shards are running must not break the aggregation in progress
+        old_executor = get_aggregation_executor()
+
+        def resize(start, stop):
+            Settings.AGGREGATION_WORKERS = 3
+            get_aggregation_executor()
+            shards.append((start, stop))
+
+        shards.clear()
+        aggregator.map_shards(27, resize)
+        assert len(shards) == 4
+
+        # The replaced pool has been shut down
+        assert get_aggregation_executor() is not old_executor
+        with pytest.raises(RuntimeError):
+            old_executor.submit(print)
+    finally:
+        Settings.AGGREGATION_WORKERS, Settings.AGGREGATION_MIN_SHARD_SIZE = workers, min_shard_size
+
+    for layer, expected_layer in zip(res.get_parameters(), expected.get_parameters()):
+        assert layer.shape == expected_layer.shape
+        assert np.allclose(layer, expected_layer)
+
+
+def test_weighted_sum_blocks():
+    """Test the blocked weighted sum of the flat parameters and the flat vectors cached by the models."""
+    rng = np.random.default_rng(0)
+    models = [
+        P2PFLModelMock(None, params=[rng.normal(size=(4, 5)), rng.normal(size=3)], num_samples=1, contributors=[str(i)]) for i in range(3)
+    ]
+
+    # Flat vectors are cached (read-only) until the parameters change
+    flat, layout = models[0].get_flat_parameters()
+    assert models[0].get_flat_parameters()[0] is flat
+    assert not flat.flags.writeable
+    assert layout.size == 23
+    models[0].invalidate_cache()
+    assert models[0].get_flat_parameters()[0] is not flat
+
+    # Blocks (including a last partial one) give the same result as a single product
+    flats = [m.get_flat_parameters()[0] for m in models]
+    weights = [1.0, 2.0, 3.0]
+    aggregator = FedAvg()
+    aggregator.WEIGHTED_SUM_BLOCK_SIZE = 5
+    assert np.allclose(aggregator.weighted_sum(flats, weights), np.dot(weights, np.stack(flats)))
@@ -26,7 +26,15 @@ from datasets import DatasetDict, load_dataset  # type: ignore
 
 from p2pfl.experiment import Experiment
 from p2pfl.learning.dataset.p2pfl_dataset import P2PFLDataset
-from p2pfl.learning.frameworks.exceptions import ModelNotMatchingError
+from p2pfl.learning.frameworks.exceptions import DecodingParamsError, ModelNotMatchingError
+from p2pfl.learning.frameworks.model_encoding import (
+    SUPPORTED_ENCODINGS,
+    ModelEncoding,
+    decode_binary,
+    encode_binary,
+    is_binary,
+    negotiate_encoding,
+)
 from p2pfl.management.logger import logger
 
 with contextlib.suppress(ImportError):
@@ -177,6 +185,127 @@ def test_encoding_flax():
         assert p2pfl_model1.additional_info == p2pfl_model2.additional_info
 
 
+def test_binary_encoding_zero_copy():
+    """Test that the binary format roundtrips and decodes into views over the received buffer."""
+    params = [
+        np.arange(12, dtype=np.float32).reshape(3, 4),
+        np.array(3.5, dtype=np.float64),
+        np.zeros((0, 5), dtype=np.int64),
+        np.arange(10, dtype=np.int16)[::2],  # non-contiguous
+    ]
+    data = encode_binary(params, {"callback": {"key": [1, 2]}})
+    assert is_binary(data)
+
+    decoded, additional_info = decode_binary(data)
+    assert additional_info == {"callback": {"key": [1, 2]}}
+    for og, new in zip(params, decoded):
+        assert og.dtype == new.dtype
+        assert np.array_equal(og, new)
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    assert all(np.shares_memory(layer, buffer) for layer in decoded if layer.size > 0)
+
+    # Truncated frames must fail
+    with pytest.raises(DecodingParamsError):
+        decode_binary(data[:40])
+
+
+def test_negotiate_encoding():
+    """Test that models are only sent as binary to the peers that advertised it."""
+    assert negotiate_encoding(ModelEncoding.BINARY, SUPPORTED_ENCODINGS) == ModelEncoding.BINARY
+    # Older or unknown peers
+    assert negotiate_encoding(ModelEncoding.BINARY, []) == ModelEncoding.PICKLE
+    assert negotiate_encoding(ModelEncoding.BINARY, ["pickle"]) == ModelEncoding.PICKLE
+    assert negotiate_encoding(ModelEncoding.PICKLE, SUPPORTED_ENCODINGS) == ModelEncoding.PICKLE
+
+
+def test_encoding_formats_interoperate_torch():
+    """Test that a model decodes weights encoded with any format."""
+    p2pfl_model1 = LightningModel(MLP_PT())
+    p2pfl_model1.set_encoding(ModelEncoding.PICKLE)
+    pickle_params = p2pfl_model1.encode_parameters()
+    p2pfl_model1.set_encoding(ModelEncoding.BINARY)
+    binary_params = p2pfl_model1.encode_parameters()
+    assert not is_binary(pickle_params)
+    assert is_binary(binary_params)
+
+    # The encoding is kept on copies
+    assert p2pfl_model1.build_copy().get_encoding() == ModelEncoding.BINARY
+
+    for encoded_params in [pickle_params, binary_params]:
+        p2pfl_model2 = LightningModel(MLP_PT())
+        p2pfl_model2.set_parameters(encoded_params)
+        for layer1, layer2 in zip(p2pfl_model1.get_parameters(), p2pfl_model2.get_parameters()):
+            assert np.array_equal(layer1, layer2)
+
+
+def test_encoded_parameters_cache_torch():
+    """Test that the encoded parameters are cached until the model changes."""
+    p2pfl_model = LightningModel(MLP_PT())
+    version = p2pfl_model.get_version()
+    encoded_params = p2pfl_model.get_encoded_parameters()
+    assert p2pfl_model.get_encoded_parameters() is encoded_params
+
+    # Changing the encoding does not reuse the cache
+    p2pfl_model.set_encoding(ModelEncoding.PICKLE)
+    assert not is_binary(p2pfl_model.get_encoded_parameters())
+    p2pfl_model.set_encoding(ModelEncoding.BINARY)
+
+    # Setting parameters invalidates the cache
+    new_params = [np.ones_like(layer) for layer in p2pfl_model.get_parameters()]
+    p2pfl_model.set_parameters(new_params)
+    assert p2pfl_model.get_version() != version
+    new_encoded_params, _ = p2pfl_model.decode_parameters(p2pfl_model.get_encoded_parameters())
+    for layer1, layer2 in zip(new_params, new_encoded_params):
+        assert np.array_equal(layer1, layer2)
+
+    # Adding info invalidates the cache
+    version = p2pfl_model.get_version()
+    p2pfl_model.add_info("callback", {"key": 1})
+    assert p2pfl_model.get_version() != version
+    assert p2pfl_model.decode_parameters(p2pfl_model.get_encoded_parameters())[1] == {"callback": {"key": 1}}
+
+    # Messages are built once per key and encoding, until the parameters change
+    built = []
+
+    def build(data: bytes) -> bytes:
+        built.append(data)
+        return data
+
+    msg = p2pfl_model.get_encoded_message(("cmd", 1), build)
+    assert msg is p2pfl_model.get_encoded_parameters()
+    assert p2pfl_model.get_encoded_message(("cmd", 1), build) is msg
+    assert not is_binary(p2pfl_model.get_encoded_message(("cmd", 1), build, ModelEncoding.PICKLE))
+    assert p2pfl_model.get_encoded_message(("cmd", 2), build) is msg  # same encoded parameters
+    assert len(built) == 3
+    p2pfl_model.add_info("callback", {"key": 2})
+    assert p2pfl_model.get_encoded_message(("cmd", 2), build) is not msg
+
+    # Copies get their own version
+    assert p2pfl_model.build_copy(params=new_params).get_version() != p2pfl_model.get_version()
+
+
+def test_flat_parameters_torch():
+    """Test the flat parameter vector and its layout."""
+    p2pfl_model = LightningModel(MLP_PT())
+    params = [layer.copy() for layer in p2pfl_model.get_parameters()]
+    flat, layout = p2pfl_model.get_flat_parameters()
+    assert flat.ndim == 1 and flat.dtype == np.float64
+    assert layout.size == flat.size == sum(p.size for p in params)
+    assert len(layout) == len(params)
+    for i, layer in enumerate(params):
+        assert np.array_equal(flat[layout.layer_slice(i)], layer.reshape(-1))
+
+    # Set from a flat vector
+    p2pfl_model.set_flat_parameters(flat + 1, layout)
+    for layer, new_layer in zip(params, p2pfl_model.get_parameters()):
+        assert new_layer.dtype == layer.dtype
+        assert np.allclose(new_layer, layer + 1)
+
+    # Layout mismatch
+    with pytest.raises(ValueError):
+        layout.flatten(params[:-1])
+
+
 def test_wrong_encoding_torch():
     """Test wrong encoding of parameters."""
     p2pfl_model1 = LightningModel(MLP_PT())
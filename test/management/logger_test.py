@@ -0,0 +1,164 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+"""Logger tests."""
+
+import logging
+import threading
+from unittest.mock import MagicMock, patch
+
+from p2pfl.management.logger import logger
+from p2pfl.management.logger.decorators.ring_buffer_logger import RingBufferHandler, RingBufferLogger
+from p2pfl.management.logger.logger import LogSampler, format_message
+
+
+def test_format_message():
+    """Test the lazy message formatting."""
+    assert format_message("plain %s", ()) == "plain %s"
+    assert format_message("%s of %d", ("one", 2)) == "one of 2"
+    assert format_message(lambda: "built", ()) == "built"
+
+
+def test_log_sampler():
+    """Test that one of every N occurrences is logged."""
+    sampler = LogSampler()
+    assert [sampler.sample("a", 3) for _ in range(6)] == [True, False, False, True, False, False]
+    assert sampler.sample("b", 3)
+
+    # Bounded (least recently sampled counters are forgotten)
+    sampler = LogSampler(max_keys=2)
+    for key in ["a", "b", "a", "c"]:
+        sampler.sample(key, 3)
+    assert not sampler.sample("a", 3)  # third occurrence of "a"
+    assert sampler.sample("b", 3)  # "b" was forgotten
+
+
+def test_lazy_log():
+    """Test that lazy messages are only built (and sent) if the level is enabled."""
+    level = logger.get_level()
+    try:
+        with patch.object(logger, "log") as log:
+            build = MagicMock(return_value="built")
+
+            # Disabled level
+            logger.set_level(logging.INFO)
+            assert not logger.is_enabled_for(logging.DEBUG)
+            logger.debug("node", build)
+            logger.debug("node", "%s", build)
+            build.assert_not_called()
+            log.assert_not_called()
+
+            # Enabled level
+            logger.set_level(logging.DEBUG)
+            assert logger.is_enabled_for(logging.DEBUG)
+            logger.debug("node", build)
+            logger.debug("node", "%s-%d", "a", 1)
+            log.assert_any_call(logging.DEBUG, "node", "built")
+            log.assert_any_call(logging.DEBUG, "node", "a-1")
+
+            # Sampling (per call site)
+            log.reset_mock()
+            for i in range(10):
+                logger.debug("node", lambda i=i: f"sampled {i}", every=5)
+            assert [c.args[2] for c in log.call_args_list] == ["sampled 0", "sampled 5"]
+    finally:
+        logger.set_level(level)
+
+
+def make_record(level=logging.DEBUG, msg="message"):
+    """Create a log record."""
+    return logging.LogRecord("p2pfl", level, __file__, 0, msg, None, None)
+
+
+def test_ring_buffer_overflow():
+    """Test the overflow policies of the ring buffer."""
+    # Drop the oldest
+    handler = RingBufferHandler(3, "drop")
+    for i in range(5):
+        handler.emit(make_record(msg=str(i)))
+    assert [r.msg for r in handler.buffer] == ["2", "3", "4"]
+    assert handler.dropped == 2
+
+    # Sample (once half full, only below WARNING)
+    handler = RingBufferHandler(4, "sample", sample_every=2)
+    for i in range(6):
+        handler.emit(make_record(msg=str(i)))
+    handler.emit(make_record(logging.ERROR, "error"))
+    assert handler.sampled_out > 0
+    assert handler.buffer[-1].msg == "error"
+
+
+def test_ring_buffer_handle():
+    """Test that the ring buffer does not take the handler lock and freezes the mutable arguments of the records."""
+    handler = RingBufferHandler(10, "drop")
+    handler.acquire()
+    try:
+        # Held by another thread
+        thread = threading.Thread(target=handler.handle, args=(make_record(),))
+        thread.start()
+        thread.join(timeout=2)
+        assert not thread.is_alive()
+    finally:
+        handler.release()
+
+    neis = ["a"]
+    lazy = logging.LogRecord("p2pfl", logging.INFO, __file__, 0, "%s of %d", ("round", 1), None)
+    frozen = logging.LogRecord("p2pfl", logging.INFO, __file__, 0, "neighbors: %s", (neis,), None)
+    handler.handle(lazy)
+    handler.handle(frozen)
+    neis.append("b")
+    assert lazy.args == ("round", 1)
+    assert frozen.getMessage() == "neighbors: ['a']"
+
+
+def test_ring_buffer_logger():
+    """Test that the consumer thread runs the handlers with every record, in order."""
+    ring_logger = RingBufferLogger(MagicMock(), capacity=10, overflow="block")
+    received = []
+    handler = logging.Handler()
+    handler.handle = received.append
+    ring_logger.add_handler(handler)
+
+    records = [make_record(msg=str(i)) for i in range(100)]
+    for record in records:
+        ring_logger.buffer_handler.handle(record)
+    ring_logger.cleanup()
+    assert received == records
+    assert ring_logger.get_stats() == {"buffered": 0, "dropped": 0, "sampled_out": 0}
+
+
+def test_ring_buffer_logger_blocked_producers():
+    """Test that the consumer wakes up the producers blocked on a full buffer (no record lost)."""
+    ring_logger = RingBufferLogger(MagicMock(), capacity=10, overflow="block")
+    received = []
+    handler = logging.Handler()
+    handler.handle = received.append
+    ring_logger.add_handler(handler)
+
+    def produce(n):
+        for i in range(500):
+            ring_logger.buffer_handler.handle(make_record(msg=f"{n}-{i}"))
+
+    producers = [threading.Thread(target=produce, args=(n,)) for n in range(4)]
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join(timeout=10)
+    ring_logger.cleanup()
+    assert len(received) == 4 * 500
+    # In order per producer
+    assert [r.msg for r in received if r.msg.startswith("0-")] == [f"0-{i}" for i in range(500)]
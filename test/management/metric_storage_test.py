@@ -0,0 +1,105 @@
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+"""Metric storage tests."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from p2pfl.management.metric_storage import (
+    ColumnarGlobalMetricStorage,
+    ColumnarLocalMetricStorage,
+    GlobalMetricStorage,
+    LocalMetricStorage,
+)
+
+
+def fill_local(storage):
+    """Log local metrics of 2 nodes for 3 rounds."""
+    for r in range(3):
+        for node in ["node1", "node2"]:
+            for step in range(20):
+                storage.add_log("exp", r, "loss", node, 1.0 / (step + 1), step)
+
+
+def fill_global(storage):
+    """Log global metrics of 2 nodes for 3 rounds (with repeated rounds)."""
+    for r in [0, 1, 1, 2, 0]:
+        for node in ["node1", "node2"]:
+            storage.add_log("exp", r, "accuracy", node, r / 10)
+
+
+def test_columnar_storage_matches_dict_storage():
+    """Test that the columnar backends materialize the same logs as the dict backends."""
+    local, columnar_local = LocalMetricStorage(), ColumnarLocalMetricStorage()
+    fill_local(local)
+    fill_local(columnar_local)
+    assert columnar_local.get_all_logs() == local.get_all_logs()
+    assert columnar_local.get_experiment_round_node_logs("exp", 1, "node2") == local.get_experiment_round_node_logs("exp", 1, "node2")
+    assert columnar_local.get_experiment_round_logs("exp", 2) == local.get_experiment_round_logs("exp", 2)
+    with pytest.raises(KeyError):
+        columnar_local.get_experiment_round_logs("exp", 3)
+
+    glob, columnar_glob = GlobalMetricStorage(), ColumnarGlobalMetricStorage()
+    fill_global(glob)
+    fill_global(columnar_glob)
+    assert columnar_glob.get_all_logs() == glob.get_all_logs()
+    assert columnar_glob.get_experiment_node_logs("exp", "node1")["accuracy"] == [(0, 0.0), (1, 0.1), (2, 0.2)]
+
+
+def test_columnar_storage_concurrent_reads():
+    """Test that the logs can be read while they are being added."""
+    storage = ColumnarLocalMetricStorage()
+
+    def write():
+        for step in range(20000):
+            storage.add_log("exp", 0, "loss", "node1", float(step), step)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    while writer.is_alive():
+        steps = [s for s, _ in storage.get_all_logs().get("exp", {}).get(0, {}).get("node1", {}).get("loss", [])]
+        assert steps == list(range(len(steps)))
+    writer.join()
+    assert storage.query("exp", "node1", "loss")["value"].size == 20000
+
+
+def test_columnar_storage_query():
+    """Test the vectorized range queries."""
+    storage = ColumnarLocalMetricStorage()
+    fill_local(storage)
+    result = storage.query("exp", "node1", "loss", round=(1, 3), step=(0, 2))
+    assert result["round"].tolist() == [1, 1, 2, 2]
+    assert result["step"].tolist() == [0, 1, 0, 1]
+    assert np.allclose(result["value"], [1.0, 0.5, 1.0, 0.5])
+    assert storage.query("exp", "unknown", "loss")["value"].size == 0
+
+
+def test_columnar_storage_arrow(tmp_path):
+    """Test the Arrow and Parquet exports."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    storage = ColumnarLocalMetricStorage()
+    fill_local(storage)
+    table = storage.to_arrow()
+    assert table.num_rows == 3 * 2 * 20
+    assert table.column_names == ["experiment", "node", "metric", "round", "step", "value"]
+    assert table.column("node").to_pylist()[59:61] == ["node1", "node2"]
+
+    storage.to_parquet(str(tmp_path / "metrics.parquet"))
+    assert pq.read_table(str(tmp_path / "metrics.parquet")).num_rows == table.num_rows
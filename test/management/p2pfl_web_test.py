@@ -1,5 +1,165 @@
-"""
-Test the P2PFL web services.
+#
+# This file is part of the federated_learning_p2p (p2pfl) distribution
+# (see https://github.com/pguijas/p2pfl).
+# Copyright (c) 2024 Pedro Guijas Bravo.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+"""Test the P2PFL web services (against a local stand-in server)."""
 
-Note: Not tested yet.
-"""
+import datetime
+import gzip
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from p2pfl.management.p2pfl_web_services import P2pflWebServices, WebUploader
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Local HTTP server recording the requests."""
+
+    def __init__(self, accept_batches: bool = True, failures: int = 0, accept_gzip: bool = True) -> None:
+        """Start the server."""
+        self.requests = []
+        self.accept_batches = accept_batches
+        self.accept_gzip = accept_gzip
+        self.failures = failures
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def records(self, path):
+        """Get the records received for a path (flattening batches)."""
+        records = []
+        for p, body in self.requests:
+            if p == path:
+                records += body if isinstance(body, list) else [body]
+        return records
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Handler of the stand-in server."""
+
+    def do_POST(self):
+        """Record the request."""
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        gzipped = self.headers.get("Content-Encoding") == "gzip"
+        if gzipped and not self.server.accept_gzip:
+            # Body not decoded: a bad request (not a 415)
+            status = 400
+        else:
+            payload = json.loads(gzip.decompress(body) if gzipped else body)
+            if self.server.failures > 0:
+                self.server.failures -= 1
+                status = 503
+            elif isinstance(payload, list) and not self.server.accept_batches:
+                status = 400
+            else:
+                status = 200
+                self.server.requests.append((self.path, payload))
+        response = json.dumps({"node_id": 1}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        """Silence the server logs."""
+        pass
+
+
+@pytest.fixture
+def server():
+    """Stand-in server."""
+    server = StandInServer()
+    yield server
+    server.shutdown()
+
+
+def test_batched_upload(server):
+    """Test that logs and metrics are uploaded in batches, in order."""
+    web = P2pflWebServices(server.url, "key")
+    web.register_node("node1", True)
+    for i in range(5):
+        web.send_log(datetime.datetime.now(), "node1", 20, f"log {i}")
+    web.send_system_metric("node1", "cpu", 0.5, datetime.datetime.now())
+    assert web.flush(timeout=10)
+
+    assert [r["message"] for r in server.records("/node-log")] == [f"log {i}" for i in range(5)]
+    assert len(server.records("/node-metric/system")) == 1
+    # The logs were sent in a single request
+    assert sum(1 for p, _ in server.requests if p == "/node-log") == 1
+    web.close()
+
+
+def test_upload_fallbacks():
+    """Test the fallback to single records and the retries."""
+    server = StandInServer(accept_batches=False, failures=1)
+    uploader = WebUploader(server.url, {}, retry_backoff=0.01)
+    for i in range(3):
+        uploader.enqueue("/node-log", {"message": i})
+    assert uploader.flush(timeout=10)
+    assert not uploader.batching
+    assert server.records("/node-log") == [{"message": i} for i in range(3)]
+    uploader.close()
+    server.shutdown()
+
+
+def test_upload_gzip_rejected():
+    """Test that records rejected because of gzip are sent again uncompressed (not dropped)."""
+    server = StandInServer(accept_batches=False, accept_gzip=False)
+    uploader = WebUploader(server.url, {}, retry_backoff=0.01, compress=True)
+    for i in range(3):
+        uploader.enqueue("/node-log", {"message": i})
+    assert uploader.flush(timeout=10)
+    assert not uploader.compress
+    assert not uploader.batching
+    assert server.records("/node-log") == [{"message": i} for i in range(3)]
+    assert uploader.dropped == 0
+    uploader.close()
+    server.shutdown()
+
+
+def test_upload_drop_oldest(server):
+    """Test that the oldest records are dropped when the queue is full."""
+    uploader = WebUploader(server.url, {}, queue_size=3, flush_interval=60)
+    for i in range(5):
+        uploader.enqueue("/node-log", {"message": i})
+    assert uploader.dropped == 2
+    assert uploader.flush(timeout=10)
+    assert server.records("/node-log") == [{"message": i} for i in range(2, 5)]
+    uploader.close()
+
+
+def test_upload_failures_counted(caplog):
+    """Test that the records dropped after failed uploads are counted and logged (not printed)."""
+    server = StandInServer(failures=100)
+    uploader = WebUploader(server.url, {}, max_retries=1, retry_backoff=0.01)
+    with caplog.at_level(logging.ERROR, logger="p2pfl_web_services"):
+        for i in range(3):
+            uploader.enqueue("/node-log", {"message": i})
+        assert uploader.flush(timeout=10)
+    assert uploader.failed == 3
+    assert uploader.dropped == 0
+    assert any("Dropping 3 records" in r.getMessage() for r in caplog.records)
+    uploader.close()
+    server.shutdown()
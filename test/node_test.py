@@ -18,6 +18,7 @@
 """Node tests."""
 
 import contextlib
+import threading
 import time
 
 import pytest
@@ -26,6 +27,7 @@ from p2pfl.learning.dataset.p2pfl_dataset import P2PFLDataset
 from p2pfl.learning.dataset.partition_strategies import RandomIIDPartitionStrategy
 from p2pfl.management.logger import logger
 from p2pfl.node import Node
+from p2pfl.node_state import VoteTally
 from p2pfl.utils.utils import (
     check_equal_models,
     set_test_settings,
@@ -315,3 +317,34 @@ def test_flax_node():
 
 def __test_model_is_learning():
     pass
+
+
+def test_vote_tally():
+    """Test the incremental tally of the train set votes."""
+    tally = VoteTally()
+    tally.add_vote("a", {"a": 10, "b": 5})
+    tally.add_vote("b", {"b": 10, "c": 3})
+    tally.add_vote("c", {"c": 1, "a": 1})
+    assert tally.get_top(2) == ["b", "a"]
+    # Replaced votes and votes of non-candidates are not counted
+    tally.add_vote("c", {"c": 20})
+    assert tally.get_top(3) == ["c", "b", "a"]
+    assert tally.get_top(3, voters={"a", "b"}) == ["b", "a", "c"]
+    assert tally.get_top(3, voters={"a"}) == ["a", "b"]
+    # Draws in descending order of address
+    tally.clear()
+    tally.add_vote("a", {"a": 1, "b": 1})
+    assert tally.get_top(1) == ["b"]
+
+    # Waiters are woken up as soon as the quorum is reached
+    threading.Timer(0.2, tally.add_vote, args=("b", {"a": 1})).start()
+    t = time.time()
+    assert tally.wait_for_voters({"a", "b"}, timeout=5)
+    assert time.time() - t < 1
+    assert not tally.wait_for_voters({"a", "b", "c"}, timeout=0.1)
+
+    # Interrupted
+    threading.Timer(0.2, tally.interrupt).start()
+    t = time.time()
+    assert not tally.wait_for_voters({"a", "b", "c"}, timeout=5)
+    assert time.time() - t < 1